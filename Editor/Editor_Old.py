@@ -1,12 +1,13 @@
-import struct
 import os
 from tkinter import Tk, filedialog, Label, Button, Entry, messagebox
+from spec_schema import LEGACY_SCHEMA
 
-# Global constants
-START_OFFSET = 0x120
-STEP = 0x30
-NUM_SENSORS = 20
-SENSOR_DATA_SIZE = 24  # 6 floats * 4 bytes each
+# Global constants (24-byte >6f records, see spec_schema.LEGACY_SCHEMA)
+START_OFFSET = LEGACY_SCHEMA.start_offset
+STEP = LEGACY_SCHEMA.stride
+NUM_SENSORS = LEGACY_SCHEMA.count
+SENSOR_DATA_SIZE = LEGACY_SCHEMA.fields_size
+SENSOR_STRUCT = LEGACY_SCHEMA.record_struct
 
 DEFAULT_SENSOR_VALUE = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
 SENSOR_POSITIONS = [
@@ -21,10 +22,10 @@ def read_sensor_data(filepath):
     try:
         with open(filepath, "rb") as f:
             for i in range(NUM_SENSORS):
-                offset = START_OFFSET + i * (STEP + 0x10)
+                offset = START_OFFSET + i * STEP
                 f.seek(offset)
                 data = f.read(SENSOR_DATA_SIZE)
-                sensors.append(struct.unpack(">6f", data))
+                sensors.append(SENSOR_STRUCT.unpack(data))
         return sensors
     except Exception as e:
         print(f"Error reading file {filepath}: {e}")
@@ -34,9 +35,9 @@ def write_sensor_data(filepath, sensors):
     try:
         with open(filepath, "r+b") as f:
             for i, sensor in enumerate(sensors):
-                offset = START_OFFSET + i * (STEP + 0x10)
+                offset = START_OFFSET + i * STEP
                 f.seek(offset)
-                f.write(struct.pack(">6f", *sensor))
+                f.write(SENSOR_STRUCT.pack(*sensor))
         return True
     except Exception as e:
         print(f"Error writing file {filepath}: {e}")
@@ -0,0 +1,277 @@
+"""Parallel batch engine for folder-wide sensor edits.
+
+Runs read -> transform -> patch over many StreamedDeformationSpec files in a
+bounded worker pool (threads by default, processes optionally). Files are
+handed to workers in chunks so the NumPy backend can transform a whole chunk
+with one vectorized operation. Nothing here imports Tk, so the GUI and
+headless callers drive it the same way.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from sensor_io import SENSOR_BLOCK_SIZE, decode_sensor_block, read_sensor_block, write_sensor_block
+from manifest import block_hash
+from spec_schema import CURRENT_SCHEMA, detect_schema, changes_missing_fields
+import tracing
+
+DEFAULT_CHUNK_SIZE = 32
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_SKIPPED = "skipped"
+
+class MultiplyDirectionParams:
+    """Batch transform multiplying every sensor's maDirectionParams by a factor.
+
+    Transforms take a list of raw sensor blocks, plus the files they were read
+    from, and return a list of new blocks, with None for any file whose result
+    cannot be stored. They are plain module-level classes so they pickle across
+    process boundaries. Their key identifies the edit in the manifest. A transform
+    that reads fields other than maDirectionParams lists them in reads_fields, and
+    files whose layout lacks one of them are failed before it runs.
+    """
+
+    def __init__(self, factor):
+        self.factor = factor
+        self.key = f"multiply maDirectionParams by {factor!r}"
+
+    def __call__(self, blocks, filepaths=None):
+        import sensor_np
+        if sensor_np.NUMPY_AVAILABLE:
+            stacked = sensor_np.stack_sensor_blocks(blocks)
+            multiplied = sensor_np.multiply_direction_params(stacked, self.factor)
+            overflowed = sensor_np.has_non_finite(multiplied) & ~sensor_np.has_non_finite(stacked)
+            return [None if overflowed[row] else sensor_np.encode_sensor_array(multiplied[row])
+                    for row in range(len(blocks))]
+
+        results = []
+        for block in blocks:
+            sensor_file = decode_sensor_block(block)
+            try:
+                for sensor in sensor_file:
+                    sensor.maDirectionParams = tuple(val * self.factor for val in sensor.maDirectionParams)
+            except Exception:
+                results.append(None)
+                continue
+            results.append(sensor_file.tobytes())
+        return results
+
+def check_output(blocks, transformed, schemas=None):
+    """Validation rules each transformed block breaks that its original did not (see validate.py).
+
+    Args:
+        schemas (list): Layout of each block; only the rules its fields allow are run.
+
+    Returns:
+        list: One list of rule names per block; always empty without NumPy.
+    """
+    import sensor_np
+    import validate
+    broken = [[] for _ in blocks]
+    rows = [row for row, new_block in enumerate(transformed) if new_block is not None]
+    if not sensor_np.NUMPY_AVAILABLE or not rows:
+        return broken
+    old = sensor_np.stack_sensor_blocks([blocks[row] for row in rows])
+    new = sensor_np.stack_sensor_blocks([transformed[row] for row in rows])
+    row_schemas = None if schemas is None else [schemas[row] for row in rows]
+    for row, rules in zip(rows, validate.introduced_issues(old, new, row_schemas)):
+        broken[row] = rules
+    return broken
+
+def make_result(filepath, status, bytes_modified=0, error=None):
+    """Build the per-file report entry returned by run_batch."""
+    return {"filepath": filepath, "status": status, "bytes_modified": bytes_modified, "error": error}
+
+def screen_blocks(filepaths, blocks, transform, manifest=None):
+    """Transform sensor blocks already read and keep the results that may be written.
+
+    Each block's layout is detected (see spec_schema). With a manifest, blocks that
+    already carry the transform are skipped. Results the transform would make invalid
+    (see validate.py), or that change fields missing from the block's layout, are failed,
+    as are blocks whose layout lacks fields the transform reads (reads_fields).
+
+    Returns:
+        tuple: (result dicts of the files that will not be written,
+        list of (filepath, block, new block, schema) to write)
+    """
+    results = []
+    kept = []
+    schemas = []
+    reads_fields = getattr(transform, "reads_fields", ())
+    for filepath, block in zip(filepaths, blocks):
+        schema = detect_schema(block)
+        if schema is None:
+            results.append(make_result(filepath, STATUS_FAILED, error="Unknown sensor layout"))
+        elif any(field not in schema.fields for field in reads_fields):
+            results.append(make_result(filepath, STATUS_FAILED,
+                                       error=f"Transform reads fields the {schema.name} layout does not have"))
+        elif manifest is not None and transform.key in manifest.applied(filepath, block_hash(block)):
+            results.append(make_result(filepath, STATUS_SKIPPED))
+        else:
+            kept.append((filepath, block))
+            schemas.append(schema)
+    if not kept:
+        return results, []
+    readable = [filepath for filepath, _ in kept]
+    blocks = [block for _, block in kept]
+
+    try:
+        with tracing.span("batch.transform", "batch", files=len(blocks)):
+            transformed = transform(blocks, readable)
+    except Exception as e:
+        return results + [make_result(filepath, STATUS_FAILED, error=f"Transform failed: {e}") for filepath in readable], []
+
+    writable = []
+    broken = check_output(blocks, transformed, schemas)
+    for filepath, block, new_block, rules, schema in zip(readable, blocks, transformed, broken, schemas):
+        if new_block is None:
+            results.append(make_result(filepath, STATUS_FAILED, error="Transformed values cannot be stored"))
+        elif rules:
+            results.append(make_result(filepath, STATUS_FAILED, error=f"Validation failed: {', '.join(rules)}"))
+        elif schema is not CURRENT_SCHEMA and changes_missing_fields(schema, block, new_block):
+            results.append(make_result(filepath, STATUS_FAILED,
+                                       error=f"Transform changes fields the {schema.name} layout does not have"))
+        else:
+            writable.append((filepath, block, new_block, schema))
+    return results, writable
+
+def process_chunk(filepaths, transform, manifest=None):
+    """Read, transform and patch one chunk of files. Runs inside a worker.
+
+    With a manifest, every file is recorded in the manifest before it is patched
+    (see screen_blocks for what is skipped or failed). Only the fields of each
+    file's layout are written.
+
+    Returns:
+        list: One result dict per file in the chunk.
+    """
+    results = []
+    blocks = []
+    readable = []
+    for filepath in filepaths:
+        try:
+            block = read_sensor_block(filepath)
+            if len(block) < SENSOR_BLOCK_SIZE:
+                raise ValueError("Unexpected end of file")
+        except Exception as e:
+            results.append(make_result(filepath, STATUS_FAILED, error=f"Read failed: {e}"))
+            continue
+        blocks.append(block)
+        readable.append(filepath)
+
+    screened, writable = screen_blocks(readable, blocks, transform, manifest)
+    results += screened
+    if manifest is not None and writable:
+        try:
+            manifest.record([(filepath, transform.key, block_hash(block), block_hash(new_block))
+                             for filepath, block, new_block, _ in writable])
+        except OSError as e:
+            return results + [make_result(filepath, STATUS_FAILED, error=f"Manifest write failed: {e}")
+                              for filepath, _, _, _ in writable]
+
+    for filepath, _, new_block, schema in writable:
+        modified = write_sensor_block(filepath, new_block, schema)
+        if modified is None:
+            results.append(make_result(filepath, STATUS_FAILED, error="Write failed"))
+        else:
+            results.append(make_result(filepath, STATUS_OK, bytes_modified=modified))
+    return results
+
+def process_chunk_traced(filepaths, transform, manifest=None, processor=process_chunk):
+    """processor (process_chunk by default) for a worker process while tracing is on.
+
+    Returns:
+        tuple: (result dicts, spans recorded in the worker) so the spans reach the main process.
+    """
+    tracing.enable()
+    tracing.clear()  # Spans inherited from the parent when the pool forks
+    with tracing.span("batch.chunk", "batch", files=len(filepaths)):
+        results = processor(filepaths, transform, manifest)
+    return results, tracing.take_events()
+
+def run_chunk(filepaths, transform, manifest=None, processor=process_chunk):
+    with tracing.span("batch.chunk", "batch", files=len(filepaths)):
+        return processor(filepaths, transform, manifest)
+
+def default_workers(use_processes=False):
+    cpus = os.cpu_count() or 1
+    return cpus if use_processes else min(32, cpus + 4)
+
+def run_batch(filepaths, transform, max_workers=None, use_processes=False,
+              chunk_size=DEFAULT_CHUNK_SIZE, on_result=None, cancel_event=None, manifest=None,
+              processor=process_chunk):
+    """Apply transform to every file with bounded parallelism.
+
+    At most two chunks per worker are in flight at any time. When cancel_event is
+    set, chunks already running finish (so no file is left half-written) and every
+    file not yet started is reported as cancelled.
+
+    Args:
+        filepaths (list): Files to process.
+        transform (callable): Blocks-in, blocks-out transform (see MultiplyDirectionParams).
+        max_workers (int): Pool size; defaults to default_workers().
+        use_processes (bool): Use a process pool instead of threads.
+        chunk_size (int): Files handed to a worker at once.
+        on_result (callable): Called with each result dict as soon as it is known.
+        cancel_event (threading.Event): Stops scheduling new chunks once set.
+        manifest (Manifest): Loaded manifest of the tree; files already transformed are skipped.
+        processor (callable): processor(paths, transform, manifest) -> result dicts, run per chunk in a
+            worker; repack.process_bundles edits bundles instead of extracted files.
+
+    Returns:
+        list: One result dict per file, in completion order.
+    """
+    max_workers = max_workers or default_workers(use_processes)
+    chunks = [filepaths[i:i + chunk_size] for i in range(0, len(filepaths), chunk_size)]
+    results = []
+
+    def report(result):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    # Worker processes do not share the span list; their spans come back with the results
+    ship_spans = use_processes and tracing.enabled
+    worker = process_chunk_traced if ship_spans else run_chunk
+    next_chunk = 0
+    with tracing.span("batch.run", "batch", files=len(filepaths), processes=use_processes), \
+            executor_class(max_workers=max_workers) as executor:
+        pending = {}
+        while True:
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            while not cancelled and next_chunk < len(chunks) and len(pending) < max_workers * 2:
+                chunk_manifest = manifest.subset(chunks[next_chunk]) if manifest is not None else None
+                future = executor.submit(worker, chunks[next_chunk], transform, chunk_manifest, processor)
+                pending[future] = chunks[next_chunk]
+                next_chunk += 1
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    chunk_results = future.result()
+                    if ship_spans:
+                        chunk_results, spans = chunk_results
+                        tracing.add_events(spans)
+                except Exception as e:
+                    # The worker itself died (e.g. a killed process); fail the whole chunk
+                    chunk_results = [make_result(filepath, STATUS_FAILED, error=f"Worker failed: {e}")
+                                     for filepath in chunk]
+                for result in chunk_results:
+                    report(result)
+
+    for chunk in chunks[next_chunk:]:
+        for filepath in chunk:
+            report(make_result(filepath, STATUS_CANCELLED))
+    return results
+
+def summarize(results):
+    """Count results per status and total the bytes modified."""
+    summary = {STATUS_OK: 0, STATUS_SKIPPED: 0, STATUS_FAILED: 0, STATUS_CANCELLED: 0, "bytes_modified": 0}
+    for result in results:
+        summary[result["status"]] += 1
+        summary["bytes_modified"] += result["bytes_modified"]
+    return summary
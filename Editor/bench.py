@@ -0,0 +1,231 @@
+"""Headless benchmark harness for the sensor I/O, discovery and batch paths.
+
+Generates a synthetic corpus (see synth.py) in a temporary folder, or uses an
+existing one, and times:
+
+    read       read_sensor_data, per file
+    write      write_sensor_data with every sensor changed, per file
+    discovery  the open_folder walk: find_spec_files, a cold SpecIndex refresh and a warm one, per walk
+    batch      the folder batch (run_batch with MultiplyDirectionParams, as batch_apply_multiplier), per run
+    repack     with --bundles, the same batch run over bundles repacked in place (see repack.py), per run
+
+and reports throughput and latency percentiles. Results can be saved as JSON
+and compared against an earlier run; any throughput drop beyond the threshold
+is flagged and makes the exit code non-zero:
+
+    python bench.py --files 10000 --json bench.json
+    python bench.py --files 10000 --compare bench.json
+
+A corpus passed with --corpus is copied to a temporary folder first, so the
+write and batch benchmarks never modify it.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from sensor_io import read_sensor_data, write_sensor_data, find_spec_files
+from spec_index import SpecIndex
+from batch import MultiplyDirectionParams, run_batch, summarize, STATUS_OK
+from synth import generate_corpus, generate_bundles
+from repack import process_bundles
+
+PERCENTILES = (50, 90, 99)
+DEFAULT_THRESHOLD = 0.2  # Flag a benchmark whose throughput dropped by more than 20%
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize_timings(name, timings, items_per_timing):
+    """Throughput and latency percentiles of one benchmark.
+
+    Args:
+        name (str): Benchmark name.
+        timings (list): Seconds per measured operation.
+        items_per_timing (int): Files handled by each operation.
+    """
+    ordered = sorted(timings)
+    total = sum(timings)
+    result = {
+        "name": name,
+        "operations": len(timings),
+        "files_per_second": round(items_per_timing * len(timings) / total, 1) if total else None,
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(percentile(ordered, p) * 1000, 4)
+    result["max_ms"] = round(ordered[-1] * 1000, 4)
+    return result
+
+def bench_read(filepaths):
+    timings = []
+    for filepath in filepaths:
+        started = time.perf_counter()
+        read_sensor_data(filepath)
+        timings.append(time.perf_counter() - started)
+    return summarize_timings("read", timings, 1)
+
+def bench_write(filepaths):
+    """Write every sensor of every file.
+
+    Direction params are doubled when the first one is below 1 and halved otherwise,
+    so repeated runs over the same corpus stay bounded.
+    """
+    timings = []
+    for filepath in filepaths:
+        sensors = read_sensor_data(filepath)
+        factor = 2.0 if sensors[0].maDirectionParams[0] < 1.0 else 0.5
+        updates = [sensor.replace(maDirectionParams=tuple(v * factor for v in sensor.maDirectionParams))
+                   for sensor in sensors]
+        started = time.perf_counter()
+        write_sensor_data(filepath, updates)
+        timings.append(time.perf_counter() - started)
+    return summarize_timings("write", timings, 1)
+
+def bench_discovery(root, repeat):
+    """Time each discovery strategy `repeat` times over the whole tree."""
+    results = []
+    walk = []
+    cold = []
+    warm = []
+    count = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for i in range(repeat):
+            started = time.perf_counter()
+            count = len(find_spec_files(root))
+            walk.append(time.perf_counter() - started)
+
+            cache_path = os.path.join(cache_dir, f"index-{i}.json")
+            started = time.perf_counter()
+            SpecIndex(root, cache_path).refresh()
+            cold.append(time.perf_counter() - started)
+
+            index = SpecIndex(root, cache_path)
+            started = time.perf_counter()
+            index.load()
+            index.refresh()
+            warm.append(time.perf_counter() - started)
+    results.append(summarize_timings("discovery_walk", walk, count))
+    results.append(summarize_timings("discovery_index_cold", cold, count))
+    results.append(summarize_timings("discovery_index_warm", warm, count))
+    return results
+
+def bench_batch(filepaths, repeat, workers, use_processes):
+    """Time whole folder batch runs, alternating x2 and x0.5 so values stay bounded."""
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        results = run_batch(filepaths, MultiplyDirectionParams(2.0 if i % 2 == 0 else 0.5),
+                            max_workers=workers, use_processes=use_processes)
+        timings.append(time.perf_counter() - started)
+        summary = summarize(results)
+        if summary[STATUS_OK] != len(filepaths):
+            print(f"Batch run {i}: only {summary[STATUS_OK]} of {len(filepaths)} files succeeded")
+    name = "batch_processes" if use_processes else "batch_threads"
+    return summarize_timings(name, timings, len(filepaths))
+
+def bench_repack(bundle_paths, repeat, workers):
+    """Time batch runs that edit and repack bundles in a process pool, alternating x2 and x0.5."""
+    timings = []
+    resources = 0
+    for i in range(repeat):
+        started = time.perf_counter()
+        results = run_batch(bundle_paths, MultiplyDirectionParams(2.0 if i % 2 == 0 else 0.5), max_workers=workers,
+                            use_processes=True, chunk_size=1, processor=process_bundles)
+        timings.append(time.perf_counter() - started)
+        resources = len(results)
+        summary = summarize(results)
+        if summary[STATUS_OK] != resources:
+            print(f"Repack run {i}: only {summary[STATUS_OK]} of {resources} resources succeeded")
+    return summarize_timings("repack", timings, resources)
+
+def run_benchmarks(root, args):
+    filepaths = find_spec_files(root)
+    sample = filepaths[:args.sample] if args.sample else filepaths
+    results = [bench_read(sample), bench_write(sample)]
+    results += bench_discovery(root, args.repeat)
+    results.append(bench_batch(filepaths, args.repeat, args.workers, False))
+    if args.processes:
+        results.append(bench_batch(filepaths, args.repeat, args.workers, True))
+    if args.bundles:
+        with tempfile.TemporaryDirectory() as bundle_root:
+            bundle_paths = generate_bundles(bundle_root, vehicles=max(1, len(filepaths) // 2), seed=args.seed)
+            results.append(bench_repack(bundle_paths, args.repeat, args.workers))
+    return {"files": len(filepaths), "sample": len(sample), "repeat": args.repeat, "results": results}
+
+def compare(report, baseline, threshold):
+    """Names of benchmarks whose throughput dropped more than threshold against baseline."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["name"])
+        if not old or not old["files_per_second"] or not result["files_per_second"]:
+            continue
+        change = result["files_per_second"] / old["files_per_second"] - 1
+        result["change"] = round(change, 3)
+        if change < -threshold:
+            regressions.append(result["name"])
+    return regressions
+
+def format_cell(value):
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+def format_report(report):
+    columns = ["name", "operations", "files_per_second"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms", "change"]
+    rows = [[format_cell(result.get(column, "")) for column in columns] for result in report["results"]]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark sensor I/O, discovery and batch runs on a synthetic corpus.")
+    parser.add_argument("--corpus", help="Use a copy of this tree instead of generating one")
+    parser.add_argument("--files", type=int, default=2000, help="Spec files to generate (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample", type=int, default=1000,
+                        help="Files timed individually by the read/write benchmarks (0 = all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of the discovery and batch benchmarks")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--processes", action="store_true", help="Also benchmark the process pool")
+    parser.add_argument("--bundles", action="store_true",
+                        help="Also benchmark repacking synthetic bundles holding as many spec resources")
+    parser.add_argument("--json", metavar="PATH", help="Save the report as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved JSON report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative throughput drop reported as a regression (default: 0.2)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, "corpus")
+        if args.corpus:
+            shutil.copytree(args.corpus, root)
+        else:
+            files_per_vehicle = 2
+            generate_corpus(root, vehicles=max(1, args.files // files_per_vehicle),
+                            files_per_vehicle=files_per_vehicle, seed=args.seed)
+        report = run_benchmarks(root, args)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+    print(f"{report['files']} files, {report['sample']} timed individually, {report['repeat']} runs per tree-wide benchmark")
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if regressions:
+        print(f"Regressions (> {args.threshold:.0%} slower): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Read StreamedDeformationSpec resources straight from BND2 bundles.
+
+A bundle (e.g. VEH_<ID>_AT.BIN) is a header, a table of resource entries and
+up to three data sections. Each resource has one memory block per section;
+a StreamedDeformationSpec keeps everything the editor reads in block 0,
+which is what YAP extracts to StreamedDeformationSpec/<n>.dat.
+
+    header (0x30 bytes)   magic "bnd2", version 2, platform, debug data offset,
+                          entry count, entries offset, 3 data section offsets,
+                          flags (FLAG_COMPRESSED: every block is zlib data)
+    entry (0x40 bytes)    resource id, import hash, per block: uncompressed
+                          size and alignment, size on disk, offset in its
+                          section; import offset, type id, import count,
+                          flags, stream index
+
+The byte order follows the platform and is told apart by the version field.
+Headers and entry tables are read in either order, but the sensor decoders
+(sensor_io, spec_schema, sensor_np) are big-endian, so the spec resources of
+little-endian bundles are refused with an error rather than misread.
+Only the entry table is read when a bundle is opened; a resource is read and
+inflated on demand, and a decompressobj stops as soon as the requested prefix
+(e.g. just the sensor table) has come out, so the rest of it is never
+inflated. Nothing is extracted to disk.
+
+Resources are named "<bundle path>#<resource id>" wherever a file path would
+appear (reports, validation).
+
+    python bundle.py <bundle or folder>    lists the StreamedDeformationSpec resources
+"""
+import fnmatch
+import io
+import os
+import struct
+import sys
+import zlib
+
+from sensor_io import START_OFFSET, SENSOR_BLOCK_SIZE
+from spec_file import SpecFile
+from spec_schema import detect_schema
+from manifest import RESOURCE_SEPARATOR
+from tracing import traced
+import sensor_np
+
+BUNDLE_MAGIC = b"bnd2"
+BUNDLE_VERSION = 2
+BUNDLE_PATTERN = "VEH_*.BIN"
+HEADER_SIZE = 0x30
+ENTRY_SIZE = 0x40
+BLOCK_COUNT = 3  # Memory blocks per resource, one per data section
+FLAG_COMPRESSED = 0x1
+SPEC_TYPE_ID = 0x1001C  # StreamedDeformationSpec
+SIZE_MASK = 0x0FFFFFFF  # Low bits of a block size; the top 4 bits are log2 of its alignment
+READ_CHUNK_SIZE = 0x4000  # Compressed bytes fed to the decompressor at a time
+SPEC_PREFIX_SIZE = START_OFFSET + SENSOR_BLOCK_SIZE  # Bytes of a spec resource needed for its sensor table
+SENSOR_BYTE_ORDER = ">"  # Byte order the sensor decoders read
+
+def _structs(order):
+    return (struct.Struct(f"{order}4sIIIII{BLOCK_COUNT}II"),
+            struct.Struct(f"{order}QQ{BLOCK_COUNT}I{BLOCK_COUNT}I{BLOCK_COUNT}IIIHBB"))
+
+STRUCTS = {"<": _structs("<"), ">": _structs(">")}  # Byte order -> (header struct, entry struct)
+
+class BundleEntry:
+    __slots__ = ("index", "resource_id", "import_hash", "sizes_and_alignments", "disk_sizes", "disk_offsets",
+                 "import_offset", "type_id", "import_count", "flags", "stream_index")
+
+    def __init__(self, index, values):
+        """Wrap one unpacked entry (index in the entry table, then the entry struct values)."""
+        n = BLOCK_COUNT
+        self.index = index
+        self.resource_id, self.import_hash = values[0], values[1]
+        self.sizes_and_alignments = list(values[2:2 + n])
+        self.disk_sizes = list(values[2 + n:2 + 2 * n])
+        self.disk_offsets = list(values[2 + 2 * n:2 + 3 * n])
+        (self.import_offset, self.type_id, self.import_count,
+         self.flags, self.stream_index) = values[2 + 3 * n:]
+
+    def size(self, block=0):
+        """Uncompressed size of one memory block."""
+        return self.sizes_and_alignments[block] & SIZE_MASK
+
+    def disk_size(self, block=0):
+        return self.disk_sizes[block] & SIZE_MASK
+
+    def alignment(self, block=0):
+        return 1 << (self.sizes_and_alignments[block] >> 28)
+
+    def values(self):
+        """Entry struct values, the inverse of the constructor."""
+        return (self.resource_id, self.import_hash, *self.sizes_and_alignments, *self.disk_sizes,
+                *self.disk_offsets, self.import_offset, self.type_id, self.import_count,
+                self.flags, self.stream_index)
+
+    def __repr__(self):
+        return f"BundleEntry(0x{self.resource_id:08X}, type=0x{self.type_id:X}, size=0x{self.size():X})"
+
+class Bundle:
+    def __init__(self, filepath, data=None):
+        """Read the header and entry table of a bundle.
+
+        Args:
+            filepath (str): The bundle file.
+            data (bytes): Its whole contents, if already read; resources are then read from memory.
+
+        Raises:
+            ValueError: If the file is not a version 2 bundle.
+            OSError: If it cannot be read.
+        """
+        self.filepath = filepath
+        self.data = data
+        with self._open() as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:4] != BUNDLE_MAGIC:
+                raise ValueError("Not a BND2 bundle")
+            for order in STRUCTS:
+                if struct.unpack_from(f"{order}I", header, 4)[0] == BUNDLE_VERSION:
+                    break
+            else:
+                raise ValueError("Unsupported bundle version")
+            self.byte_order = order
+            header_struct, entry_struct = STRUCTS[order]
+            values = header_struct.unpack_from(header)
+            (_, self.version, self.platform, self.debug_data_offset,
+             entry_count, self.entries_offset) = values[:6]
+            self.data_offsets = list(values[6:6 + BLOCK_COUNT])
+            self.flags = values[-1]
+            f.seek(self.entries_offset)
+            table = f.read(entry_count * ENTRY_SIZE)
+        if len(table) < entry_count * ENTRY_SIZE:
+            raise ValueError("Unexpected end of file in the entry table")
+        self.entries = [BundleEntry(i, entry_struct.unpack_from(table, i * ENTRY_SIZE)) for i in range(entry_count)]
+
+    def _open(self):
+        return open(self.filepath, "rb") if self.data is None else io.BytesIO(self.data)
+
+    @classmethod
+    def open(cls, filepath):
+        """Bundle at filepath, or None (with the error printed) if it cannot be read."""
+        try:
+            return cls(filepath)
+        except Exception as e:
+            print(f"Error reading bundle {filepath}: {e}")
+            return None
+
+    @property
+    def compressed(self):
+        return bool(self.flags & FLAG_COMPRESSED)
+
+    @property
+    def sensor_data_supported(self):
+        return self.byte_order == SENSOR_BYTE_ORDER
+
+    def check_sensor_data(self):
+        """Raise ValueError if the spec resources of this bundle cannot be decoded (little-endian)."""
+        if not self.sensor_data_supported:
+            raise ValueError("Little-endian bundle: only big-endian sensor data is supported")
+
+    def entries_of_type(self, type_id):
+        return [entry for entry in self.entries if entry.type_id == type_id]
+
+    def spec_entries(self):
+        return self.entries_of_type(SPEC_TYPE_ID)
+
+    def resource_name(self, entry):
+        return f"{self.filepath}{RESOURCE_SEPARATOR}{entry.resource_id:08X}"
+
+    def read_block(self, f, entry, block=0, size=None):
+        """Bytes of one memory block of a resource, read from the open bundle file f.
+
+        Args:
+            size (int): Only return (and only inflate) this many leading bytes; None reads the whole block.
+        """
+        wanted = entry.size(block) if size is None else min(size, entry.size(block))
+        remaining = entry.disk_size(block)
+        f.seek(self.data_offsets[block] + entry.disk_offsets[block])
+        if not self.compressed:
+            return f.read(min(wanted, remaining))
+        inflater = zlib.decompressobj()
+        parts = []
+        produced = 0
+        while produced < wanted and not inflater.eof:
+            chunk = inflater.unconsumed_tail
+            if not chunk:
+                if remaining <= 0:
+                    break
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+            part = inflater.decompress(chunk, wanted - produced)
+            parts.append(part)
+            produced += len(part)
+        return b"".join(parts)
+
+    @traced("bundle.read_resources", "io")
+    def read_resources(self, entries, block=0, size=None):
+        """(entry, bytes) of several resources, read with the bundle opened once (see read_block)."""
+        with self._open() as f:
+            return [(entry, self.read_block(f, entry, block, size)) for entry in entries]
+
+    def read_resource(self, entry, block=0, size=None):
+        return self.read_resources([entry], block, size)[0][1]
+
+    def spec_file(self, entry):
+        """Whole spec resource as a SpecFile (see spec_file.py)."""
+        self.check_sensor_data()
+        return SpecFile(self.read_resource(entry), self.resource_name(entry))
+
+    def sensor_blocks(self):
+        """Sensor table of every StreamedDeformationSpec resource, inflating only up to its end.
+
+        Returns:
+            list: (resource name, sensor block bytes) tuples; resources too short for a sensor table are skipped.
+
+        Raises:
+            ValueError: If the bundle is little-endian (see check_sensor_data).
+        """
+        self.check_sensor_data()
+        blocks = []
+        for entry, data in self.read_resources(self.spec_entries(), size=SPEC_PREFIX_SIZE):
+            if len(data) < SPEC_PREFIX_SIZE:
+                print(f"Error reading {self.resource_name(entry)}: Unexpected end of file")
+                continue
+            blocks.append((self.resource_name(entry), data[START_OFFSET:]))
+        return blocks
+
+def find_bundles(folderpath):
+    """Every vehicle bundle (VEH_*.BIN, any case) under folderpath, or folderpath itself if it is a file."""
+    if os.path.isfile(folderpath):
+        return [folderpath]
+    bundles = []
+    for root_dir, dirs, files in os.walk(folderpath):
+        for file in files:
+            if fnmatch.fnmatchcase(file.upper(), BUNDLE_PATTERN):
+                bundles.append(os.path.join(root_dir, file))
+    return bundles
+
+def read_bundle_sensor_blocks(bundle_paths):
+    """Sensor tables of every spec resource in many bundles.
+
+    Returns:
+        tuple: (list of sensor blocks, list of resource names in the same order,
+        list of the bundle paths that could not be read)
+    """
+    blocks = []
+    names = []
+    unreadable = []
+    for filepath in bundle_paths:
+        bundle = Bundle.open(filepath)
+        if bundle is None:
+            unreadable.append(filepath)
+            continue
+        try:
+            resources = bundle.sensor_blocks()
+        except (OSError, ValueError, zlib.error) as e:
+            print(f"Error reading bundle {filepath}: {e}")
+            unreadable.append(filepath)
+            continue
+        for name, block in resources:
+            names.append(name)
+            blocks.append(block)
+    return blocks, names, unreadable
+
+def stack_bundle_files(bundle_paths):
+    """Like sensor_np.stack_sensor_files, for the spec resources inside bundles.
+
+    Every row is stacked with the current layout's dtype, whatever its layout; use
+    validate.detect_schemas to tell them apart before reading fields other than
+    maDirectionParams.
+
+    Returns:
+        tuple: (array, resource names in row order, unreadable bundle paths)
+    """
+    blocks, names, unreadable = read_bundle_sensor_blocks(bundle_paths)
+    return sensor_np.stack_sensor_blocks(blocks), names, unreadable
+
+def describe(bundle):
+    """Text listing of a bundle's StreamedDeformationSpec resources."""
+    entries = bundle.spec_entries()
+    order = "big" if bundle.byte_order == ">" else "little"
+    lines = [f"{bundle.filepath}: {len(bundle.entries)} resources, {len(entries)} StreamedDeformationSpec, "
+             f"platform {bundle.platform}, {order}-endian{', compressed' if bundle.compressed else ''}"]
+    if not bundle.sensor_data_supported:
+        lines.append("  sensor data not supported (little-endian)")
+        return "\n".join(lines)
+    for entry, data in bundle.read_resources(entries, size=SPEC_PREFIX_SIZE):
+        schema = detect_schema(data[START_OFFSET:])
+        lines.append(f"  0x{entry.resource_id:08X}  {entry.size():8d} bytes  "
+                     f"sensor layout: {schema.name if schema else 'unknown'}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python bundle.py <bundle or folder>")
+        return 2
+    bundle_paths = find_bundles(argv[0])
+    failed = 0
+    for filepath in bundle_paths:
+        bundle = Bundle.open(filepath)
+        if bundle is None:
+            failed += 1
+            continue
+        print(describe(bundle))
+    if not bundle_paths:
+        print(f"No {BUNDLE_PATTERN} bundles under {argv[0]}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
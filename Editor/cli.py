@@ -0,0 +1,168 @@
+"""Headless batch entry point.
+
+Runs the same folder batch as the GUI's "Apply to All Files" without loading
+customtkinter or tkinter, and prints a JSON summary on stdout:
+
+    python cli.py <root folder> --multiply 2.0 --workers 8
+    python cli.py <root folder> --transform "Front *: maDirectionParams[2] *= 1.5"
+    python cli.py <root folder> --smooth 0.5 --iterations 2
+    python cli.py <game folder> --bundles --multiply 2.0    (edits VEH_*.BIN bundles, see repack.py)
+"""
+import os
+import argparse
+import json
+import sys
+import time
+
+from batch import (
+    MultiplyDirectionParams, run_batch, summarize, default_workers, STATUS_OK, STATUS_SKIPPED, STATUS_FAILED,
+    STATUS_CANCELLED
+)
+from manifest import Manifest
+from vehicles import KINDS, FINISHES
+import tracing
+
+# Bundle, graph, script and folder index modules are imported by the actions that use
+# them, so a plain --multiply run does not load them (or NumPy on their account)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch edit StreamedDeformationSpec files without the GUI.")
+    parser.add_argument("root", help="Root folder of the extracted bundles")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--multiply", type=float, metavar="FACTOR",
+                        help="Multiply every sensor's maDirectionParams by FACTOR")
+    action.add_argument("--transform", metavar="SCRIPT",
+                        help="Run a transform script, e.g. \"Door *: mu8AbsorbtionLevel += 1\"")
+    action.add_argument("--transform-file", metavar="PATH",
+                        help="Run the transform script stored in PATH")
+    action.add_argument("--smooth", type=float, metavar="ALPHA",
+                        help="Move maDirectionParams towards the mean of linked sensors by ALPHA (0-1)")
+    action.add_argument("--propagate", nargs=2, metavar=("SENSOR", "FACTOR"),
+                        help="Scale SENSOR's maDirectionParams by FACTOR and linked sensors by a fading factor")
+    parser.add_argument("--iterations", type=int, default=1, help="Smoothing steps for --smooth (default: 1)")
+    parser.add_argument("--falloff", type=float, default=0.5,
+                        help="How much of the factor each hop keeps for --propagate (default: 0.5)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Maximum number of parallel workers (default: based on CPU count)")
+    parser.add_argument("--processes", action="store_true",
+                        help="Use a process pool instead of threads")
+    parser.add_argument("--bundles", action="store_true",
+                        help="Edit the VEH_*.BIN bundles under root in place instead of extracted files (no YAP needed)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Walk the whole tree instead of using the cached folder index")
+    selection = parser.add_argument_group("vehicle selection (files of other vehicles are not touched)")
+    selection.add_argument("--vehicle", metavar="QUERY",
+                           help="Vehicles matching an ID prefix or (fuzzy) display name, e.g. ANNIHILATOR")
+    selection.add_argument("--family", action="append", metavar="GLOB",
+                           help="Vehicle family name or glob, e.g. \"*ANNIHILATOR*\" (repeatable)")
+    selection.add_argument("--finish", action="append", choices=FINISHES, help="Finish (repeatable)")
+    selection.add_argument("--kind", action="append", choices=KINDS, help="Player or Traffic (repeatable)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Transform every file even if the manifest shows it was already done, and record nothing")
+    parser.add_argument("--all-results", action="store_true",
+                        help="List every file in the JSON output, not only failures")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Record timing spans and write them to PATH as a Chrome trace (chrome://tracing, Perfetto)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    if args.trace:
+        tracing.enable()
+
+    if args.multiply is not None:
+        transform = MultiplyDirectionParams(args.multiply)
+        transform_report = {"multiply": args.multiply}
+    elif args.smooth is not None or args.propagate is not None:
+        import sensor_np
+        import sensor_graph
+        if not sensor_np.NUMPY_AVAILABLE:
+            parser.error("--smooth and --propagate need numpy")
+        if args.smooth is not None:
+            transform = sensor_graph.SmoothDirectionParams(args.smooth, args.iterations)
+            transform_report = {"smooth": args.smooth, "iterations": args.iterations}
+        else:
+            try:
+                sensor = int(args.propagate[0])
+            except ValueError:
+                parser.error(f"invalid --propagate: SENSOR must be a sensor index, not {args.propagate[0]!r}")
+            try:
+                factor = float(args.propagate[1])
+            except ValueError:
+                parser.error(f"invalid --propagate: FACTOR must be a number, not {args.propagate[1]!r}")
+            try:
+                transform = sensor_graph.PropagateScale(sensor, factor, args.falloff)
+            except ValueError as e:
+                parser.error(f"invalid --propagate: {e}")
+            transform_report = {"propagate": {"sensor": sensor, "factor": factor, "falloff": args.falloff}}
+    else:
+        from transform import SensorTransform
+        source = args.transform
+        if args.transform_file:
+            try:
+                with open(args.transform_file, "r", encoding="utf-8") as f:
+                    source = f.read()
+            except OSError as e:
+                parser.error(f"cannot read {args.transform_file}: {e}")
+        try:
+            transform = SensorTransform(source)
+        except ValueError as e:
+            parser.error(f"invalid transform: {e}")
+        transform_report = {"script": source}
+
+    if args.bundles:
+        from bundle import find_bundles
+        filepaths = find_bundles(args.root)
+    elif args.no_index:
+        from sensor_io import find_spec_files
+        filepaths = find_spec_files(args.root)
+    else:
+        from spec_index import SpecIndex
+        filepaths = SpecIndex(args.root).refresh()
+    found = len(filepaths)
+    if args.vehicle or args.family or args.finish or args.kind:
+        from vehicles import default_index, VehicleFilter
+        vehicle_ids = [vehicle_id for vehicle_id, _ in default_index().search(args.vehicle)] if args.vehicle else None
+        vehicle_filter = VehicleFilter(families=args.family, finishes=args.finish, kinds=args.kind,
+                                       vehicle_ids=vehicle_ids)
+        filepaths = vehicle_filter.select(filepaths)
+    use_processes = args.processes or args.bundles  # Repacking is CPU-bound per bundle
+    workers = args.workers or default_workers(use_processes)
+    manifest = None
+    if not args.no_manifest:
+        # A single bundle keeps its manifest in the folder next to it
+        manifest = Manifest(os.path.dirname(os.path.abspath(args.root)) if os.path.isfile(args.root) else args.root)
+        manifest.load()
+    if args.bundles:
+        from repack import process_bundles
+        results = run_batch(filepaths, transform, max_workers=workers, use_processes=True,
+                            chunk_size=1, manifest=manifest, processor=process_bundles)
+    else:
+        results = run_batch(filepaths, transform, max_workers=workers, use_processes=args.processes, manifest=manifest)
+    summary = summarize(results)
+
+    report = {
+        "root": args.root,
+        "transform": transform_report,
+        "workers": workers,
+        "processes": use_processes,
+        "files_found": found,
+        "files": len(filepaths),
+        "summary": summary,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "results": results if args.all_results else [r for r in results
+                                                     if r["status"] not in (STATUS_OK, STATUS_SKIPPED)],
+    }
+    if tracing.enabled:
+        report["slowest_files"] = [{"filepath": filepath, "ms": round(total, 3)}
+                                   for filepath, total, _ in tracing.slowest_files(tracing.events())]
+    if args.trace:
+        tracing.export_chrome_trace(args.trace)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if summary[STATUS_FAILED] or summary[STATUS_CANCELLED] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
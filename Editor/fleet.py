@@ -0,0 +1,266 @@
+"""Fleet-wide columnar view of every StreamedDeformationSpec file in a folder.
+
+The whole folder is read in parallel, stacked into one NumPy array and turned
+into a long pandas table with one row per (file, sensor) and one column per
+sensor value, so distributions can be grouped per car or per sensor position.
+The table is cached on disk next to the folder index; reopening a folder only
+decodes the files whose size or mtime changed.
+
+With bundles=True the spec resources inside VEH_*.BIN bundles are read
+directly instead (see bundle.py), so no YAP extraction is needed; rows are
+then named "<bundle>#<resource id>" and cached per bundle.
+
+    python fleet.py <root folder> [--bundles] [--column mfRadius] [--group Car]
+
+Needs pandas and NumPy; check FLEET_AVAILABLE before calling into it.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    from tabulate import tabulate
+except ImportError:
+    tabulate = None
+
+from sensor_io import (
+    NUM_SENSORS, SENSOR_BLOCK_SIZE, SENSOR_FIELD_LAYOUT, SENSOR_POSITIONS, find_spec_files, read_sensor_block
+)
+from bundle import find_bundles, read_bundle_sensor_blocks
+from spec_index import default_cache_path
+from batch import DEFAULT_CHUNK_SIZE, default_workers
+from vehicles import default_index
+import sensor_np
+
+FLEET_AVAILABLE = pd is not None and sensor_np.NUMPY_AVAILABLE
+FLEET_CACHE_VERSION = 2
+
+# One table column per value in SENSOR_STRUCT_FORMAT: (column name, field name, item index or None)
+VALUE_COLUMNS = [(name if count == 1 else f"{name}[{item}]", name, item if count > 1 else None)
+                 for name, _, _, count in SENSOR_FIELD_LAYOUT for item in range(count)]
+
+# Text columns stored as pandas categoricals (20 rows per file share each value)
+CATEGORY_COLUMNS = ["filepath", "source", "vehicle_id", "car", "position"]
+
+# Group-by choices for the summaries: label -> table columns
+GROUPINGS = {
+    "Sensor position": ["sensor", "position"],
+    "Car": ["vehicle_id", "car"],
+}
+
+def read_chunk(filepaths):
+    """Read the sensor blocks of one chunk of files. Runs inside a worker thread.
+
+    Returns:
+        tuple: (list of blocks, list of the filepaths read successfully, list of
+        the file each block came from (the same filepaths))
+    """
+    blocks = []
+    loaded = []
+    for filepath in filepaths:
+        try:
+            block = read_sensor_block(filepath)
+        except OSError as e:
+            print(f"Error reading file {filepath}: {e}")
+            continue
+        if len(block) < SENSOR_BLOCK_SIZE:
+            print(f"Error reading file {filepath}: Unexpected end of file")
+            continue
+        blocks.append(block)
+        loaded.append(filepath)
+    return blocks, loaded, loaded
+
+def read_bundle_chunk(bundle_paths):
+    """read_chunk for bundles: every spec resource in one chunk of bundles, named as by Bundle.resource_name."""
+    blocks = []
+    names = []
+    sources = []
+    for bundle_path in bundle_paths:
+        bundle_blocks, bundle_names, _ = read_bundle_sensor_blocks([bundle_path])
+        blocks += bundle_blocks
+        names += bundle_names
+        sources += [bundle_path] * len(bundle_names)
+    return blocks, names, sources
+
+def build_table(arr, filepaths, sources=None):
+    """Turn a stacked (n_files, NUM_SENSORS) structured array into a long table.
+
+    Args:
+        arr: Array from sensor_np.stack_sensor_blocks.
+        filepaths (list): Name of each row of arr (a spec file or a bundle resource).
+        sources (list): File each row was read from; defaults to filepaths.
+
+    Returns:
+        pandas.DataFrame: One row per (file, sensor).
+    """
+    np = sensor_np.np
+    vehicles = default_index()
+    vehicle_ids = [vehicles.vehicle_id(filepath) for filepath in filepaths]
+    columns = {
+        "filepath": np.repeat(np.array(filepaths, dtype=object), NUM_SENSORS),
+        "source": np.repeat(np.array(filepaths if sources is None else sources, dtype=object), NUM_SENSORS),
+        "vehicle_id": np.repeat(np.array(vehicle_ids, dtype=object), NUM_SENSORS),
+        "car": np.repeat(np.array([vehicles.names.get(v, v) for v in vehicle_ids], dtype=object), NUM_SENSORS),
+        "sensor": np.tile(np.arange(NUM_SENSORS, dtype=np.uint8), len(filepaths)),
+        "position": np.tile(np.array(SENSOR_POSITIONS, dtype=object), len(filepaths)),
+    }
+    for column, name, item in VALUE_COLUMNS:
+        values = arr[name] if item is None else arr[name][..., item]
+        columns[column] = values.reshape(-1).astype(values.dtype.newbyteorder("="))
+    return pd.DataFrame(columns).astype({column: "category" for column in CATEGORY_COLUMNS})
+
+def load_fleet_table(filepaths, max_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, reader=read_chunk):
+    """Read and decode many spec files in parallel into one table.
+
+    Unreadable files are reported and left out.
+
+    Args:
+        reader (callable): read_chunk, or read_bundle_chunk when filepaths are bundles.
+
+    Returns:
+        pandas.DataFrame: One row per (file, sensor), see build_table.
+    """
+    chunks = [filepaths[i:i + chunk_size] for i in range(0, len(filepaths), chunk_size)]
+    blocks = []
+    loaded = []
+    sources = []
+    with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as executor:
+        for chunk_blocks, chunk_loaded, chunk_sources in executor.map(reader, chunks):
+            blocks.extend(chunk_blocks)
+            loaded.extend(chunk_loaded)
+            sources.extend(chunk_sources)
+    return build_table(sensor_np.stack_sensor_blocks(blocks), loaded, sources)
+
+def file_signature(filepath):
+    """(mtime_ns, size) of a file, or None if it cannot be stat'ed."""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class FleetCache:
+    def __init__(self, root, cache_path=None, bundles=False):
+        """Cached fleet table for one root folder.
+
+        Args:
+            root (str): Root folder of the extracted bundles.
+            cache_path (str): Where to persist the table; defaults to a pickle next to the folder index.
+            bundles (bool): The files passed to table() are VEH_*.BIN bundles rather than spec files.
+        """
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or default_cache_path(root, "fleet-bundles" if bundles else "fleet", "pkl")
+        self.reader = read_bundle_chunk if bundles else read_chunk
+        self.signatures = {}
+        self.frame = None
+        self.decoded = 0
+
+    def load(self):
+        """Load the persisted table. Returns False if there is none or it is unusable."""
+        try:
+            cached = pd.read_pickle(self.cache_path)
+        except Exception:
+            return False
+        if cached.get("version") != FLEET_CACHE_VERSION or cached.get("root") != self.root:
+            return False
+        self.signatures = cached["signatures"]
+        self.frame = cached["table"]
+        return True
+
+    def save(self):
+        """Persist the table atomically."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            pd.to_pickle({"version": FLEET_CACHE_VERSION, "root": self.root,
+                          "signatures": self.signatures, "table": self.frame}, tmp_path)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving fleet table {self.cache_path}: {e}")
+
+    def table(self, filepaths, max_workers=None):
+        """Table for exactly these files, decoding only the ones that changed since the cache was saved.
+
+        Args:
+            filepaths (list): Spec files of the folder, e.g. from SpecIndex.refresh (or bundles, see __init__).
+            max_workers (int): Reader threads used for changed files.
+
+        Returns:
+            pandas.DataFrame: One row per (file, sensor), see build_table.
+        """
+        if self.frame is None:
+            self.load()
+        signatures = {filepath: file_signature(filepath) for filepath in filepaths}
+        stale = [filepath for filepath, signature in signatures.items()
+                 if signature is None or self.signatures.get(filepath) != signature]
+        self.decoded = len(stale)
+
+        if self.frame is not None and not stale and len(signatures) == len(self.signatures):
+            return self.frame
+
+        parts = []
+        if self.frame is not None:
+            kept = self.frame["source"].isin(signatures.keys() - set(stale))
+            parts.append(self.frame[kept])
+        if stale or self.frame is None:
+            parts.append(load_fleet_table(stale, max_workers=max_workers, reader=self.reader))
+        if len(parts) == 1:
+            frame = parts[0].reset_index(drop=True)
+        else:
+            # Concatenating categoricals with different categories falls back to plain strings
+            frame = pd.concat(parts, ignore_index=True).astype({column: "category" for column in CATEGORY_COLUMNS})
+        loaded = set(frame["source"].unique())
+        self.signatures = {filepath: signature for filepath, signature in signatures.items() if filepath in loaded}
+        self.frame = frame
+        self.save()
+        return frame
+
+def summarize_field(table, column, grouping="Sensor position"):
+    """Distribution of one value column per group.
+
+    Args:
+        table (pandas.DataFrame): Fleet table.
+        column (str): Column name from VALUE_COLUMNS.
+        grouping (str): Key of GROUPINGS.
+
+    Returns:
+        pandas.DataFrame: count, min, max, mean, std and quartiles per group.
+    """
+    grouped = table.groupby(GROUPINGS[grouping], sort=True, observed=True, dropna=False)[column]
+    summary = grouped.agg(["count", "min", "max", "mean", "std", "median"])
+    summary.insert(4, "q25", grouped.quantile(0.25))
+    summary.insert(5, "q75", grouped.quantile(0.75))
+    return summary
+
+def format_summary(summary):
+    """Render a summary frame as a fixed-width text table."""
+    if tabulate is None:
+        return summary.to_string(float_format=lambda value: f"{value:.4f}")
+    return tabulate(summary.reset_index(), headers="keys", showindex=False, floatfmt=".4f")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize one sensor value over every spec file under a folder.")
+    parser.add_argument("root", help="Root folder of the extracted bundles")
+    parser.add_argument("--bundles", action="store_true",
+                        help="Read the VEH_*.BIN bundles under root instead of extracted files")
+    parser.add_argument("--column", default="maDirectionParams[0]",
+                        choices=[column for column, _, _ in VALUE_COLUMNS], help="Value to summarize")
+    parser.add_argument("--group", default="Sensor position", choices=list(GROUPINGS), help="Rows of the summary")
+    args = parser.parse_args(argv)
+    if not FLEET_AVAILABLE:
+        print("Fleet statistics need pandas and numpy")
+        return 2
+    filepaths = find_bundles(args.root) if args.bundles else find_spec_files(args.root)
+    table = FleetCache(args.root, bundles=args.bundles).table(filepaths)
+    print(f"{table['filepath'].nunique()} files")
+    print(format_summary(summarize_field(table, args.column, args.group)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
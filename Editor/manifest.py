@@ -0,0 +1,124 @@
+"""Per-file record of the batch transforms applied under a root folder.
+
+The manifest is an append-only journal (one JSON line per transformed file)
+kept in the root of the extracted tree. Each line holds the transform and the
+SHA-1 of the file's sensor block before and after it. A line is written
+before the file is patched, so after a crash a file is known to carry a
+transform only if its current hash matches the recorded "after" hash. That
+makes re-runs skip files already at the target state instead of compounding
+the edit, and resume where an interrupted run stopped.
+"""
+import hashlib
+import json
+import os
+
+from sensor_io import SENSOR_BLOCK_SIZE
+
+MANIFEST_NAME = ".at_editor_manifest.jsonl"
+RESOURCE_SEPARATOR = "#"  # Between a bundle path and a resource ID, as in bundle.Bundle.resource_name
+
+def block_hash(block):
+    return hashlib.sha1(block[:SENSOR_BLOCK_SIZE]).hexdigest()
+
+class Manifest:
+    def __init__(self, root, path=None):
+        """Manifest of one extracted tree.
+
+        Args:
+            root (str): Root folder of the extracted bundles.
+            path (str): Journal file; defaults to MANIFEST_NAME inside root.
+        """
+        self.root = os.path.abspath(root)
+        self.path = path or os.path.join(self.root, MANIFEST_NAME)
+        self.history = {}  # relative path -> list of (transform key, hash before, hash after)
+        self._resources = None  # Bundle relative path -> relative paths of its resources, built on demand
+
+    def relpath(self, filepath):
+        return os.path.relpath(os.path.abspath(filepath), self.root).replace(os.sep, "/")
+
+    def load(self):
+        """Replay the journal. Returns False if there is none yet."""
+        self._resources = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Line cut short by a crash
+                    self.history.setdefault(entry["file"], []).append(
+                        (entry["transform"], entry["before"], entry["after"]))
+        except OSError:
+            return False
+        return True
+
+    def subset(self, filepaths):
+        """Copy holding only the history of these files, cheap to hand to a worker.
+
+        For a bundle, the history of the resources inside it ("<bundle>#<id>", see
+        bundle.py) is included too.
+        """
+        if self._resources is None:
+            self._resources = {}
+            for relpath in self.history:
+                bundle_path, separator, _ = relpath.partition(RESOURCE_SEPARATOR)
+                if separator:
+                    self._resources.setdefault(bundle_path, []).append(relpath)
+        manifest = Manifest(self.root, self.path)
+        for filepath in filepaths:
+            relpath = self.relpath(filepath)
+            for key in [relpath] + self._resources.get(relpath, []):
+                history = self.history.get(key)
+                if history:
+                    manifest.history[key] = history
+        return manifest
+
+    def applied(self, filepath, current_hash):
+        """Transforms that produced the file's current contents, oldest first.
+
+        Only an unbroken chain counts: walking back from the latest entry whose
+        "after" hash is the current one, each earlier entry's "after" must be the
+        next one's "before". Edits that led back to the current contents (2x then
+        0.5x) cancel out and are dropped. Empty if the file does not match any
+        recorded state (never transformed, re-extracted, or edited by hand since).
+        """
+        history = self.history.get(self.relpath(filepath), [])
+        applied = []
+        expected = current_hash
+        found = False
+        for transform, before, after in reversed(history):
+            if after != expected:
+                if found:
+                    break
+                continue  # Recorded after the current contents, but never written (or since undone by re-extracting)
+            found = True
+            applied.append(transform)
+            expected = before
+            if before == current_hash:
+                applied = []  # These edits end where they started
+        applied.reverse()
+        return applied
+
+    def record(self, entries):
+        """Append entries to the journal in one write, before the files are patched.
+
+        Args:
+            entries (list): (filepath, transform key, hash before, hash after) tuples.
+
+        Raises:
+            OSError: If the journal cannot be written.
+        """
+        lines = []
+        for filepath, transform, before, after in entries:
+            relpath = self.relpath(filepath)
+            self.history.setdefault(relpath, []).append((transform, before, after))
+            self._resources = None
+            lines.append(json.dumps({"file": relpath, "transform": transform, "before": before, "after": after}))
+        if not lines:
+            return
+        # A single O_APPEND write keeps lines from concurrent workers from interleaving
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, ("\n".join(lines) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
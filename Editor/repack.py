@@ -0,0 +1,179 @@
+"""Write edited StreamedDeformationSpec resources back into BND2 bundles.
+
+Replaces the YAP extract -> edit -> repack round trip for sensor edits. The
+batch engine hands whole bundles to its workers (run_batch with
+processor=process_bundles), and each worker:
+
+    1. reads the bundle once and inflates only the sensor table of each spec
+       resource (see bundle.py)
+    2. runs the transform and the usual batch checks on those tables
+       (batch.screen_blocks)
+    3. inflates only the resources that changed, patches their sensor fields
+       and recompresses them
+    4. splices them into the bundle: every other byte, including the other
+       resources' compressed data, is copied through unchanged, and only the
+       changed entries' sizes and the offsets behind them are patched
+    5. writes the new bundle atomically (a temporary file, then os.replace)
+
+A changed resource's slot grows or shrinks by a multiple of the largest block
+alignment in the bundle, so everything after it keeps its alignment.
+
+    python cli.py <game folder> --bundles --multiply 2.0
+
+The command line runs bundles in a process pool, one bundle per task.
+"""
+import bisect
+import os
+import zlib
+
+from sensor_io import START_OFFSET, patch_sensor_block
+from bundle import Bundle, BundleEntry, STRUCTS, BLOCK_COUNT, ENTRY_SIZE, SIZE_MASK, SPEC_PREFIX_SIZE, BUNDLE_MAGIC
+from batch import make_result, screen_blocks, STATUS_OK, STATUS_FAILED
+from manifest import block_hash
+import tracing
+
+COMPRESSION_LEVEL = 6  # Level 9 is ~30% slower on spec resources for <1% smaller output
+MIN_ALIGNMENT = 0x10  # Smallest step a changed slot grows or shrinks by
+
+def splice_resources(bundle, data, replacements, level=COMPRESSION_LEVEL):
+    """Bytes of a bundle with the block 0 of some resources replaced.
+
+    Args:
+        bundle (Bundle): The parsed bundle (left unchanged).
+        data (bytes): Its whole original contents.
+        replacements (dict): Entry index -> new uncompressed block 0 bytes.
+        level (int): zlib level for the replaced blocks of a compressed bundle.
+
+    Returns:
+        bytearray: The new bundle.
+    """
+    header_struct, entry_struct = STRUCTS[bundle.byte_order]
+    entries = [BundleEntry(entry.index, entry.values()) for entry in bundle.entries]
+    alignment = max([MIN_ALIGNMENT] + [entry.alignment(block) for entry in entries
+                                       for block in range(BLOCK_COUNT) if entry.disk_size(block)])
+    edits = []
+    for index, resource in replacements.items():
+        entry = entries[index]
+        stored = zlib.compress(resource, level) if bundle.compressed else resource
+        old_size = entry.disk_size(0)
+        edits.append((bundle.data_offsets[0] + entry.disk_offsets[0], old_size, stored,
+                      (old_size - len(stored)) % alignment))
+        entry.sizes_and_alignments[0] = (entry.sizes_and_alignments[0] & ~SIZE_MASK) | len(resource)
+        entry.disk_sizes[0] = (entry.disk_sizes[0] & ~SIZE_MASK) | len(stored)
+    edits.sort(key=lambda edit: edit[0])
+
+    out = bytearray()
+    source = memoryview(data)
+    positions = []
+    shifts = []  # Total growth of the bundle up to and including each edit
+    cursor = 0
+    shift = 0
+    for position, old_size, stored, padding in edits:
+        out += source[cursor:position]
+        out += stored
+        out += bytes(padding)
+        cursor = position + old_size
+        shift += len(stored) + padding - old_size
+        positions.append(position)
+        shifts.append(shift)
+    out += source[cursor:]
+
+    def moved(offset):
+        """New position of what was at offset in the original bundle."""
+        edits_before = bisect.bisect_left(positions, offset)
+        return shifts[edits_before - 1] if edits_before else 0
+
+    data_offsets = [offset + moved(offset) for offset in bundle.data_offsets]
+    for entry in entries:
+        for block in range(BLOCK_COUNT):
+            position = bundle.data_offsets[block] + entry.disk_offsets[block]
+            entry.disk_offsets[block] = position + moved(position) - data_offsets[block]
+    entries_offset = bundle.entries_offset + moved(bundle.entries_offset)
+    header_struct.pack_into(out, 0, BUNDLE_MAGIC, bundle.version, bundle.platform,
+                            bundle.debug_data_offset + moved(bundle.debug_data_offset), len(entries),
+                            entries_offset, *data_offsets, bundle.flags)
+    for entry in entries:
+        entry_struct.pack_into(out, entries_offset + entry.index * ENTRY_SIZE, *entry.values())
+    return out
+
+def write_atomic(filepath, data):
+    """Write data to a temporary file next to filepath, then move it over filepath."""
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def process_bundle(filepath, transform, manifest=None):
+    """Transform the spec resources of one bundle and repack it in place.
+
+    Results are reported per resource, named as by Bundle.resource_name; a bundle
+    that cannot be read gets a single failed result under its own path.
+
+    Returns:
+        list: Result dicts (see batch.make_result).
+    """
+    try:
+        with open(filepath, "rb") as f:
+            data = f.read()
+        bundle = Bundle(filepath, data)
+        bundle.check_sensor_data()  # Before anything is written
+        prefixes = bundle.read_resources(bundle.spec_entries(), size=SPEC_PREFIX_SIZE)
+    except Exception as e:
+        return [make_result(filepath, STATUS_FAILED, error=f"Read failed: {e}")]
+
+    results = []
+    names = []
+    blocks = []
+    entries = {}
+    for entry, prefix in prefixes:
+        name = bundle.resource_name(entry)
+        if len(prefix) < SPEC_PREFIX_SIZE:
+            results.append(make_result(name, STATUS_FAILED, error="Read failed: Unexpected end of file"))
+            continue
+        names.append(name)
+        blocks.append(prefix[START_OFFSET:])
+        entries[name] = entry
+    screened, writable = screen_blocks(names, blocks, transform, manifest)
+    results += screened
+
+    replacements = {}
+    modified = {}
+    for name, block, new_block, schema in writable:
+        entry = entries[name]
+        try:
+            resource = bytearray(bundle.read_resource(entry))
+            if len(resource) < entry.size():
+                raise ValueError("Unexpected end of file")
+        except Exception as e:
+            results.append(make_result(name, STATUS_FAILED, error=f"Read failed: {e}"))
+            continue
+        modified[name] = patch_sensor_block(resource, new_block, schema)
+        if modified[name]:
+            replacements[entry.index] = bytes(resource)
+
+    if manifest is not None and modified:
+        try:
+            manifest.record([(name, transform.key, block_hash(block), block_hash(new_block))
+                             for name, block, new_block, _ in writable if name in modified])
+        except OSError as e:
+            return results + [make_result(name, STATUS_FAILED, error=f"Manifest write failed: {e}") for name in modified]
+    if replacements:
+        try:
+            with tracing.span("repack.write", "io", filepath=filepath, resources=len(replacements)):
+                write_atomic(filepath, splice_resources(bundle, data, replacements))
+        except Exception as e:
+            return results + [make_result(name, STATUS_FAILED, error=f"Write failed: {e}") for name in modified]
+    return results + [make_result(name, STATUS_OK, bytes_modified=count) for name, count in modified.items()]
+
+def process_bundles(bundle_paths, transform, manifest=None):
+    """batch.run_batch processor: process_bundle over a chunk of bundles."""
+    results = []
+    for filepath in bundle_paths:
+        with tracing.span("repack.bundle", "batch", filepath=filepath):
+            results += process_bundle(filepath, transform, manifest)
+    return results
@@ -1,14 +1,65 @@
 import os
-import copy
+import queue
+import threading
+import time
+import importlib
+from collections import deque
 import customtkinter
 from tkinter import filedialog, messagebox
-from sensor_io import read_sensor_data, write_sensor_data, SENSOR_POSITIONS, NUM_SENSORS
-from data import car_name
+from sensor_io import read_sensor_data, write_sensor_data, decode_sensor_block, Sensor, SENSOR_FIELD_LAYOUT, SENSOR_POSITIONS, NUM_SENSORS
+from spec_index import SpecIndex
+from sensor_grid import SensorGrid
+from spec_schema import CURRENT_SCHEMA, detect_schema, changes_missing_fields
+import tracing
+
+# NumPy/pandas-backed modules and the vehicle table are imported on first use, or by
+# the warm-up thread once the window is up, so they stay off the startup path.
+WARMUP_MODULES = ("vehicles", "batch", "transform", "manifest", "fleet")
+WARMUP_DELAY_MS = 200  # Let the first frames paint before warming up
+
+BATCH_POLL_MS = 100  # How often the Tk thread drains batch progress from the worker queue
+DISCOVERY_CHUNK_SIZE = 200  # Found files are handed to the UI in chunks of this size...
+DISCOVERY_FLUSH_SECONDS = 0.1  # ...or at least this often while the walk is slow
+SWITCH_LATENCY_TARGET_MS = 16  # A sensor switch should fit in one 60 Hz frame
+SWITCH_LATENCY_SAMPLES = 256  # Recent switch timings kept for inspection
+
+def format_field_value(value):
+    """Format a sensor value for display in an entry (floats to 4 decimals)."""
+    return f"{value:.4f}" if isinstance(value, float) else f"{value}"
+
+def set_entry_text(entry, text):
+    """Replace an entry's text, skipping the redraw when it already shows that text."""
+    if entry.get() != text:
+        entry.delete(0, customtkinter.END)
+        entry.insert(0, text)
+
+# One grid column per value in SENSOR_STRUCT_FORMAT: (field name, item index or None for scalars)
+GRID_COLUMNS = [(name, item if count > 1 else None)
+                for name, _, _, count in SENSOR_FIELD_LAYOUT for item in range(count)]
+
+def warm_up():
+    """Import the heavy modules and build the vehicle table. Runs on a background thread."""
+    started = time.perf_counter()
+    try:
+        for name in WARMUP_MODULES:
+            importlib.import_module(name)
+        importlib.import_module("vehicles").default_index()
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        return
+    print(f"Startup: background modules ready in {(time.perf_counter() - started) * 1000:.0f} ms")
 
 class SensorEditor:
-    def __init__(self, root):
-        """Initialize the SensorEditor with main window setup and initial variables."""
+    def __init__(self, root, started=None):
+        """Initialize the SensorEditor with main window setup and initial variables.
+
+        Args:
+            root: Main window.
+            started (float): time.perf_counter() at process start, for the time-to-interactive metric.
+        """
         self.root = root
+        self.started = started if started is not None else time.perf_counter()
+        self.time_to_interactive_ms = None
         self.root.title("Sensor Data Editor")
         self.root.geometry("1400x800")
         
@@ -20,20 +71,45 @@ class SensorEditor:
 
         self.current_filepath = ""
         self.batch_files = []
+        self.batch_folder = ""
+        self.discovered_files = []
+        self.discovery_queue = None
         self.modified_sensors = {}  # Dictionary to track unsaved changes
         self.sensors = []
-        self.original_sensors = []
+        self.current_schema = CURRENT_SCHEMA  # Sensor layout of the open file (see spec_schema)
         self.current_sensor_index = 0
         self.sensor_entries = {}
         self.sensor_buttons = []
+        self.highlighted_sensor_index = None
+        self.sensor_grid = None
+        self.sensor_grid_window = None
+        self.switch_latencies_ms = deque(maxlen=SWITCH_LATENCY_SAMPLES)
+        self.batch_thread = None
+        self.batch_queue = None
+        self.batch_cancel_event = None
+        self.batch_results = []
+        self.batch_started_ns = 0
+        self.fleet_table = None
+        self.fleet_queue = None
+        self.validation_queue = None
+        self.transform_window = None
+        self.transform_source = ""
+        self.batch_filter = None
+        self.batch_frame = None
+        self.left_frame = None
 
+        # Only the top bar exists at startup; the batch bar and the sensor panels are built on first use
         self.create_controls()
-        self.create_bottom_controls()
-        self.batch_controls_visible(False)
-        self.sensor_detail_visible(False)
+        self.root.after_idle(self.report_startup)
+        self.root.after(WARMUP_DELAY_MS, lambda: threading.Thread(target=warm_up, daemon=True).start())
+
+    def report_startup(self):
+        """Record time-to-interactive: process start until the event loop first goes idle."""
+        self.time_to_interactive_ms = (time.perf_counter() - self.started) * 1000
+        print(f"Startup: time to interactive {self.time_to_interactive_ms:.0f} ms")
         
     def create_controls(self):
-        """Create and layout the main UI controls (top bar, left sidebar, sensor detail area)."""
+        """Create and layout the top bar."""
         # Top bar
         top_frame = customtkinter.CTkFrame(self.root)
         top_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=20, pady=(10,5))
@@ -45,10 +121,17 @@ class SensorEditor:
         self.open_folder_btn = customtkinter.CTkButton(top_frame, text="Open Folder", command=self.open_folder, width=120)
         self.open_folder_btn.grid(row=0, column=1, padx=5, pady=5)
 
+        # Timing spans for I/O, batch runs and sensor switches; also on with AT_EDITOR_TRACE set
+        self.trace_var = customtkinter.BooleanVar(value=tracing.enabled)
+        self.trace_check = customtkinter.CTkCheckBox(top_frame, text="Trace", variable=self.trace_var,
+                                                     command=self.toggle_tracing, width=80)
+        self.trace_check.grid(row=0, column=2, padx=5, pady=5)
+
         self.car_name_label = customtkinter.CTkLabel(top_frame, text="", font=("Arial", 14), anchor="w")
         self.car_name_label.grid(row=0, column=3, padx=10, pady=5, sticky="e")
 
-        # Batch controls container
+    def create_batch_controls(self):
+        """Create the folder batch bar (first time a folder is opened)."""
         self.batch_frame = customtkinter.CTkFrame(self.root)
         self.batch_frame.grid(row=1, column=0, columnspan=2, sticky="ew", padx=20, pady=5)
         self.batch_frame.grid_columnconfigure(1, weight=1)
@@ -63,6 +146,41 @@ class SensorEditor:
                                                     command=self.batch_apply_multiplier, width=120)
         self.batch_apply_btn.grid(row=0, column=2, padx=5, pady=5, sticky="w")
 
+        self.batch_cancel_btn = customtkinter.CTkButton(self.batch_frame, text="Cancel", command=self.cancel_batch,
+                                                        width=120, state="disabled")
+        self.batch_cancel_btn.grid(row=0, column=3, padx=5, pady=5, sticky="w")
+
+        self.batch_processes_var = customtkinter.BooleanVar(value=False)
+        self.batch_processes_check = customtkinter.CTkCheckBox(self.batch_frame, text="Use processes",
+                                                               variable=self.batch_processes_var)
+        self.batch_processes_check.grid(row=0, column=4, padx=5, pady=5, sticky="w")
+
+        self.fleet_stats_btn = customtkinter.CTkButton(self.batch_frame, text="Fleet Stats",
+                                                       command=self.open_fleet_stats, width=120)
+        self.fleet_stats_btn.grid(row=0, column=5, padx=5, pady=5, sticky="w")
+
+        self.batch_manifest_var = customtkinter.BooleanVar(value=True)
+        self.batch_manifest_check = customtkinter.CTkCheckBox(self.batch_frame, text="Skip files already done",
+                                                              variable=self.batch_manifest_var)
+        self.batch_manifest_check.grid(row=1, column=5, padx=5, pady=(0, 5), sticky="w")
+
+        self.batch_filter_btn = customtkinter.CTkButton(self.batch_frame, text="Filter Vehicles",
+                                                        command=self.open_batch_filter, width=120)
+        self.batch_filter_btn.grid(row=0, column=6, padx=5, pady=5, sticky="w")
+
+        self.validate_btn = customtkinter.CTkButton(self.batch_frame, text="Validate",
+                                                    command=self.validate_folder, width=120)
+        self.validate_btn.grid(row=0, column=7, padx=5, pady=5, sticky="w")
+
+        self.batch_progress = customtkinter.CTkProgressBar(self.batch_frame)
+        self.batch_progress.grid(row=1, column=0, columnspan=4, padx=5, pady=(0, 5), sticky="ew")
+        self.batch_progress.set(0)
+
+        self.batch_status_label = customtkinter.CTkLabel(self.batch_frame, text="", anchor="w")
+        self.batch_status_label.grid(row=1, column=4, padx=5, pady=(0, 5), sticky="w")
+
+    def create_sensor_panels(self):
+        """Create the sensor list, the detail area and the bottom controls (first time a file is loaded)."""
         # Left sidebar
         self.left_frame = customtkinter.CTkFrame(self.root)
         self.left_frame.grid(row=2, column=0, sticky="nsw", padx=20, pady=(5,10))
@@ -75,7 +193,8 @@ class SensorEditor:
         self.right_frame = customtkinter.CTkFrame(self.root)
         self.right_frame.grid(row=2, column=1, sticky="nsew", padx=(0,20), pady=(5,10))
         self.right_frame.grid_columnconfigure(1, weight=1)
-        
+        self.create_bottom_controls()
+
     def create_bottom_controls(self):
         """Create the bottom row that holds the batch multiplier for all sensors and the Save File button.
         
@@ -99,15 +218,25 @@ class SensorEditor:
                                                    command=self.batch_multiply_all_sensors)
         bottom_batch_btn.grid(row=0, column=2, padx=5, pady=5)
         
-        # Right group: Save File button
+        # Right group: Transform script, all-sensors grid and Save File buttons
+        transform_btn = customtkinter.CTkButton(self.bottom_frame, text="Transform Script",
+                                                command=self.open_transform_window, width=120)
+        transform_btn.grid(row=0, column=1, sticky="e", padx=(20, 5), pady=5)
+
+        grid_btn = customtkinter.CTkButton(self.bottom_frame, text="All Sensors Grid", command=self.open_sensor_grid,
+                                           width=120)
+        grid_btn.grid(row=0, column=2, sticky="e", padx=5, pady=5)
+
         save_file_btn = customtkinter.CTkButton(self.bottom_frame, text="Save File", command=self.save_file, width=120)
-        save_file_btn.grid(row=0, column=1, sticky="e", padx=20, pady=5)
+        save_file_btn.grid(row=0, column=3, sticky="e", padx=(5, 20), pady=5)
         
     def batch_controls_visible(self, visible):
         """Toggle visibility of folder batch processing controls."""
         if visible:
+            if self.batch_frame is None:
+                self.create_batch_controls()
             self.batch_frame.grid()
-        else:
+        elif self.batch_frame is not None:
             self.batch_frame.grid_remove()
             
     def sensor_detail_visible(self, visible):
@@ -117,134 +246,94 @@ class SensorEditor:
             visible (bool): Whether to show or hide sensor details.
         """
         if visible:
+            if self.left_frame is None:
+                self.create_sensor_panels()
             self.left_frame.grid()
             self.right_frame.grid()
             self.bottom_frame.grid()
-        else:
+        elif self.left_frame is not None:
             self.left_frame.grid_remove()
             self.right_frame.grid_remove()
             self.bottom_frame.grid_remove()
             
-    def clear_sensor_detail(self):
-        """Clear all sensor detail widgets from the right frame."""
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
-        self.sensor_entries = {}
-        
     def load_sensor_list(self):
-        """Create and populate the list of sensor buttons in the left panel."""
-        for widget in self.sensor_scrollable_frame.winfo_children():
-            widget.destroy()
-        self.sensor_buttons = []
-        for index, sensor_name in enumerate(SENSOR_POSITIONS):
-            btn = customtkinter.CTkButton(self.sensor_scrollable_frame, text=sensor_name,
-                                          command=lambda i=index: self.on_sensor_select(i),
-                                          width=250, height=35,
-                                          fg_color=("gray75", "gray30"))  # Default unselected color
-            btn.grid(row=index, column=0, pady=(0,5), padx=5, sticky="ew")
-            self.sensor_buttons.append(btn)
-        if self.sensor_buttons:
-            self.sensor_buttons[0].configure(fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"])
-            self.current_sensor_index = 0
+        """Populate the list of sensor buttons in the left panel (built once, then reused)."""
+        if not self.sensor_buttons:
+            for index, sensor_name in enumerate(SENSOR_POSITIONS):
+                btn = customtkinter.CTkButton(self.sensor_scrollable_frame, text=sensor_name,
+                                              command=lambda i=index: self.on_sensor_select(i),
+                                              width=250, height=35,
+                                              fg_color=("gray75", "gray30"))  # Default unselected color
+                btn.grid(row=index, column=0, pady=(0,5), padx=5, sticky="ew")
+                self.sensor_buttons.append(btn)
+        self.current_sensor_index = 0
+        self.update_sensor_buttons()
         
     def update_sensor_buttons(self):
-        """Update the visual state of sensor buttons, highlighting the selected one."""
-        for i, btn in enumerate(self.sensor_buttons):
-            btn.configure(fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"] 
-                          if i == self.current_sensor_index else ("gray75", "gray30"))
-                
-    def load_sensor_details(self, index):
-        """Load and display all details for the selected sensor.
-        
-        Args:
-            index (int): Index of the sensor to display.
+        """Update the visual state of sensor buttons, highlighting the selected one.
+
+        Only the previously highlighted button and the newly selected one are reconfigured.
         """
-        self.clear_sensor_detail()
-        
-        # Use modified sensor if available, otherwise the original sensor data.
-        sensor = self.modified_sensors.get(index, self.sensors[index])
+        if self.highlighted_sensor_index == self.current_sensor_index:
+            return
+        if self.highlighted_sensor_index is not None:
+            self.sensor_buttons[self.highlighted_sensor_index].configure(fg_color=("gray75", "gray30"))
+        self.sensor_buttons[self.current_sensor_index].configure(
+            fg_color=customtkinter.ThemeManager.theme["CTkButton"]["fg_color"])
+        self.highlighted_sensor_index = self.current_sensor_index
 
+    def build_sensor_detail(self):
+        """Create the sensor detail widgets once; load_sensor_details only rewrites their values."""
         # Entry width constant for uniformity.
         ENTRY_WIDTH = 100
 
         # Title section
         title_frame = customtkinter.CTkFrame(self.right_frame)
         title_frame.grid(row=0, column=0, columnspan=7, sticky="ew", padx=20, pady=10)
-        title = customtkinter.CTkLabel(title_frame,
-                                       text=f"Sensor: {SENSOR_POSITIONS[index]} (Index {index})",
-                                       font=("Arial", 16, "bold"))
-        title.pack(pady=10)
+        self.sensor_title_label = customtkinter.CTkLabel(title_frame, text="", font=("Arial", 16, "bold"))
+        self.sensor_title_label.pack(pady=10)
 
         # Main content frame for sensor details
         content_frame = customtkinter.CTkFrame(self.right_frame)
         content_frame.grid(row=1, column=0, columnspan=7, sticky="nsew", padx=20, pady=10)
 
         # Helper function to create a row of entry fields.
-        def create_field_group(parent, row, label_text, values, entry_count):
+        def create_field_group(parent, row, label_text, entry_count):
             label = customtkinter.CTkLabel(parent, text=label_text, anchor="w")
             label.grid(row=row, column=0, sticky="w", padx=10, pady=5)
             entries = []
             for i in range(entry_count):
                 entry = customtkinter.CTkEntry(parent, width=ENTRY_WIDTH)
                 entry.grid(row=row, column=i+1, padx=5, pady=5)
-                entry.insert(0, f"{values[i]}")
                 entries.append(entry)
             return entries
 
         current_row = 0
 
         # Direction Parameters (6 floats)
-        self.sensor_entries["maDirectionParams"] = create_field_group(
-            content_frame, current_row,
-            "maDirectionParams:", 
-            [f"{x:.4f}" for x in sensor["maDirectionParams"]], 
-            6
-        )
+        self.sensor_entries["maDirectionParams"] = create_field_group(content_frame, current_row, "maDirectionParams:", 6)
         current_row += 1
 
         # Radius (float)
-        self.sensor_entries["mfRadius"] = create_field_group(
-            content_frame, current_row,
-            "mfRadius:", 
-            [f"{sensor['mfRadius']:.4f}"], 
-            1
-        )[0]
+        self.sensor_entries["mfRadius"] = create_field_group(content_frame, current_row, "mfRadius:", 1)[0]
         current_row += 1
 
         # Next Sensor (6 uint8)
-        self.sensor_entries["maNextSensor"] = create_field_group(
-            content_frame, current_row,
-            "maNextSensor:", 
-            sensor["maNextSensor"], 
-            6
-        )
+        self.sensor_entries["maNextSensor"] = create_field_group(content_frame, current_row, "maNextSensor:", 6)
         current_row += 1
 
         # Scene Index (uint8)
-        self.sensor_entries["mu8SceneIndex"] = create_field_group(
-            content_frame, current_row,
-            "mu8SceneIndex:", 
-            [sensor["mu8SceneIndex"]], 
-            1
-        )[0]
+        self.sensor_entries["mu8SceneIndex"] = create_field_group(content_frame, current_row, "mu8SceneIndex:", 1)[0]
         current_row += 1
 
         # Absorbtion Level (uint8)
         self.sensor_entries["mu8AbsorbtionLevel"] = create_field_group(
-            content_frame, current_row,
-            "mu8AbsorbtionLevel:", 
-            [sensor["mu8AbsorbtionLevel"]], 
-            1
-        )[0]
+            content_frame, current_row, "mu8AbsorbtionLevel:", 1)[0]
         current_row += 1
 
         # Next Boundary Sensor (2 uint8)
         self.sensor_entries["mau8NextBoundarySensor"] = create_field_group(
-            content_frame, current_row,
-            "mau8NextBoundarySensor:", 
-            sensor["mau8NextBoundarySensor"], 
-            2
-        )
+            content_frame, current_row, "mau8NextBoundarySensor:", 2)
         current_row += 1
 
         # Multiplier section for the current sensor only
@@ -270,24 +359,84 @@ class SensorEditor:
         for i, (text, command) in enumerate(buttons):
             btn = customtkinter.CTkButton(sensor_button_frame, text=text, command=command, width=120)
             btn.grid(row=0, column=i, padx=10, pady=10)
+
+    @tracing.traced("load_sensor_details", "ui")
+    def load_sensor_details(self, index):
+        """Load and display all details for the selected sensor.
         
+        Args:
+            index (int): Index of the sensor to display.
+        """
+        if not self.sensor_entries:
+            self.build_sensor_detail()
+        self.sensor_title_label.configure(text=f"Sensor: {SENSOR_POSITIONS[index]} (Index {index})")
+        # Use modified sensor if available, otherwise the original sensor data.
+        self.show_sensor_values(self.modified_sensors.get(index, self.sensors[index]))
+
+    def show_sensor_values(self, sensor):
+        """Write a sensor's values into the existing detail entries."""
+        for name in Sensor.FIELDS:
+            value = getattr(sensor, name)
+            entries = self.sensor_entries[name]
+            if isinstance(entries, list):
+                for entry, item in zip(entries, value):
+                    set_entry_text(entry, format_field_value(item))
+            else:
+                set_entry_text(entries, format_field_value(value))
+        
+    def read_sensor_entries(self):
+        """Parse the current sensor's entries into a sensor dict.
+
+        Entries whose text still matches what was displayed keep the exact value they
+        were rendered from, so floats are only rounded once the user really edits them.
+
+        Raises:
+            ValueError: If an entry does not hold a valid number.
+            struct.error: If a value does not fit its field.
+        """
+        shown = self.modified_sensors.get(self.current_sensor_index, self.sensors[self.current_sensor_index])
+
+        def parse(entry, shown_value, cast):
+            text = entry.get()
+            return shown_value if text == format_field_value(shown_value) else cast(text)
+
+        return Sensor.from_values(
+            maDirectionParams=tuple(parse(e, v, float) for e, v in
+                                    zip(self.sensor_entries["maDirectionParams"], shown.maDirectionParams)),
+            mfRadius=parse(self.sensor_entries["mfRadius"], shown.mfRadius, float),
+            maNextSensor=tuple(parse(e, v, int) for e, v in
+                               zip(self.sensor_entries["maNextSensor"], shown.maNextSensor)),
+            mu8SceneIndex=parse(self.sensor_entries["mu8SceneIndex"], shown.mu8SceneIndex, int),
+            mu8AbsorbtionLevel=parse(self.sensor_entries["mu8AbsorbtionLevel"], shown.mu8AbsorbtionLevel, int),
+            mau8NextBoundarySensor=tuple(parse(e, v, int) for e, v in
+                                         zip(self.sensor_entries["mau8NextBoundarySensor"],
+                                             shown.mau8NextBoundarySensor))
+        )
+
+    def store_sensor(self, index, sensor):
+        """Record sensor as a pending change, or drop the change if it matches the file byte for byte.
+
+        Args:
+            index (int): Index of the sensor.
+            sensor (Sensor): Sensor values to store.
+        """
+        if sensor == self.sensors[index]:
+            self.modified_sensors.pop(index, None)
+        else:
+            self.modified_sensors[index] = sensor
+        if self.sensor_grid is not None:
+            self.sensor_grid.refresh_row(index)
+
     def store_current_sensor_changes(self):
         """Store current sensor entry values into modified_sensors (in memory only)."""
         if not self.sensor_entries:
             return
         try:
-            sensor = {
-                "maDirectionParams": tuple(float(e.get()) for e in self.sensor_entries["maDirectionParams"]),
-                "mfRadius": float(self.sensor_entries["mfRadius"].get()),
-                "maNextSensor": tuple(int(e.get()) for e in self.sensor_entries["maNextSensor"]),
-                "mu8SceneIndex": int(self.sensor_entries["mu8SceneIndex"].get()),
-                "mu8AbsorbtionLevel": int(self.sensor_entries["mu8AbsorbtionLevel"].get()),
-                "mau8NextBoundarySensor": tuple(int(e.get()) for e in self.sensor_entries["mau8NextBoundarySensor"])
-            }
+            sensor = self.read_sensor_entries()
         except Exception as e:
             print(f"Error storing current sensor changes: {e}")
             return
-        self.modified_sensors[self.current_sensor_index] = sensor
+        self.store_sensor(self.current_sensor_index, sensor)
         
     def on_sensor_select(self, index):
         """Handle sensor selection from the list.
@@ -295,48 +444,34 @@ class SensorEditor:
         Args:
             index (int): Index of the selected sensor.
         """
+        started = time.perf_counter()
         # Before switching, store any changes made in the current sensor's entries.
         if self.sensor_entries:
             self.store_current_sensor_changes()
         self.current_sensor_index = index
         self.update_sensor_buttons()
         self.load_sensor_details(index)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.switch_latencies_ms.append(elapsed_ms)
+        if elapsed_ms > SWITCH_LATENCY_TARGET_MS:
+            print(f"Slow sensor switch to {SENSOR_POSITIONS[index]}: {elapsed_ms:.1f} ms "
+                  f"(target {SWITCH_LATENCY_TARGET_MS} ms)")
         
     def reset_sensor(self):
         """Reset current sensor values to their original state."""
         self.modified_sensors.pop(self.current_sensor_index, None)
-        sensor = self.original_sensors[self.current_sensor_index]
-        for i, e in enumerate(self.sensor_entries["maDirectionParams"]):
-            e.delete(0, customtkinter.END)
-            e.insert(0, f"{sensor['maDirectionParams'][i]:.4f}")
-        self.sensor_entries["mfRadius"].delete(0, customtkinter.END)
-        self.sensor_entries["mfRadius"].insert(0, f"{sensor['mfRadius']:.4f}")
-        for i, e in enumerate(self.sensor_entries["maNextSensor"]):
-            e.delete(0, customtkinter.END)
-            e.insert(0, f"{sensor['maNextSensor'][i]}")
-        self.sensor_entries["mu8SceneIndex"].delete(0, customtkinter.END)
-        self.sensor_entries["mu8SceneIndex"].insert(0, f"{sensor['mu8SceneIndex']}")
-        self.sensor_entries["mu8AbsorbtionLevel"].delete(0, customtkinter.END)
-        self.sensor_entries["mu8AbsorbtionLevel"].insert(0, f"{sensor['mu8AbsorbtionLevel']}")
-        for i, e in enumerate(self.sensor_entries["mau8NextBoundarySensor"]):
-            e.delete(0, customtkinter.END)
-            e.insert(0, f"{sensor['mau8NextBoundarySensor'][i]}")
+        self.show_sensor_values(self.sensors.original_sensor(self.current_sensor_index))
+        if self.sensor_grid is not None:
+            self.sensor_grid.refresh_row(self.current_sensor_index)
             
     def save_sensor(self):
         """Save current sensor values to memory (without writing to file)."""
         try:
-            sensor = {
-                "maDirectionParams": tuple(float(e.get()) for e in self.sensor_entries["maDirectionParams"]),
-                "mfRadius": float(self.sensor_entries["mfRadius"].get()),
-                "maNextSensor": tuple(int(e.get()) for e in self.sensor_entries["maNextSensor"]),
-                "mu8SceneIndex": int(self.sensor_entries["mu8SceneIndex"].get()),
-                "mu8AbsorbtionLevel": int(self.sensor_entries["mu8AbsorbtionLevel"].get()),
-                "mau8NextBoundarySensor": tuple(int(e.get()) for e in self.sensor_entries["mau8NextBoundarySensor"])
-            }
+            sensor = self.read_sensor_entries()
         except Exception as e:
             messagebox.showerror("Error", f"Invalid data: {e}")
             return
-        self.modified_sensors[self.current_sensor_index] = sensor
+        self.store_sensor(self.current_sensor_index, sensor)
         messagebox.showinfo("Saved", f"Sensor {SENSOR_POSITIONS[self.current_sensor_index]} updated in memory.")
         
     def multiply_floats(self):
@@ -356,26 +491,181 @@ class SensorEditor:
         
     def batch_multiply_all_sensors(self):
         """Multiply the direction parameters for all sensors in the opened file by the specified multiplier."""
+        import sensor_np
         try:
             factor = float(self.batch_multiplier_all_entry.get())
         except ValueError:
             messagebox.showerror("Error", "Invalid multiplier for batch operation")
             return
         
-        # Apply multiplication to every sensor (using modified version if available)
+        if sensor_np.NUMPY_AVAILABLE:
+            # One vectorized multiply over the whole sensor table
+            current = sensor_np.sensors_to_array([self.modified_sensors.get(i, self.sensors[i])
+                                                  for i in range(len(self.sensors))])
+            multiplied = sensor_np.multiply_direction_params(current, factor)
+            if sensor_np.has_non_finite(multiplied) and not sensor_np.has_non_finite(current):
+                messagebox.showerror("Error", "The multiplied values are too large to store; nothing was changed.")
+                return
+            for i, new_sensor in enumerate(sensor_np.array_to_sensors(multiplied)):
+                self.store_sensor(i, new_sensor)
+            messagebox.showinfo("Success", "Batch multiplication applied to all sensors (in memory).")
+            self.load_sensor_details(self.current_sensor_index)
+            return
+
+        # Multiply every sensor (using modified version if available), storing nothing unless all succeed
+        new_sensors = []
         for i in range(len(self.sensors)):
             sensor = self.modified_sensors.get(i, self.sensors[i])
             try:
-                new_direction_params = tuple(val * factor for val in sensor["maDirectionParams"])
+                new_sensors.append(sensor.replace(maDirectionParams=tuple(val * factor for val in sensor.maDirectionParams)))
             except Exception as e:
                 print(f"Error multiplying sensor {i} direction params: {e}")
-                continue
-            new_sensor = dict(sensor)
-            new_sensor["maDirectionParams"] = new_direction_params
-            self.modified_sensors[i] = new_sensor
+                messagebox.showerror("Error", "The multiplied values cannot be stored; nothing was changed.")
+                return
+        for i, new_sensor in enumerate(new_sensors):
+            self.store_sensor(i, new_sensor)
         messagebox.showinfo("Success", "Batch multiplication applied to all sensors (in memory).")
         self.load_sensor_details(self.current_sensor_index)
         
+    def open_transform_window(self):
+        """Open the transform script editor, applicable to the open file or the whole folder."""
+        if self.transform_window is not None:
+            self.transform_window.lift()
+            return
+        window = customtkinter.CTkToplevel(self.root)
+        window.title("Transform Script")
+        window.geometry("700x400")
+        window.grid_columnconfigure(2, weight=1)
+        window.grid_rowconfigure(0, weight=1)
+        window.protocol("WM_DELETE_WINDOW", self.close_transform_window)
+        self.transform_window = window
+
+        self.transform_textbox = customtkinter.CTkTextbox(window, font=("Consolas", 12))
+        self.transform_textbox.grid(row=0, column=0, columnspan=3, sticky="nsew", padx=10, pady=(10, 5))
+        self.transform_textbox.insert("0.0", self.transform_source or
+                                      "# e.g.\n# maDirectionParams[2] *= 1.5\n"
+                                      "# Front *: mfRadius = clamp(mfRadius * 1.2, 0.05, 2.0)\n"
+                                      "# vehicle PUS, Door *: mu8AbsorbtionLevel += 1\n")
+
+        customtkinter.CTkButton(window, text="Apply to Current File", command=self.apply_transform_to_file,
+                                width=160).grid(row=1, column=0, padx=(10, 5), pady=(5, 10), sticky="w")
+        customtkinter.CTkButton(window, text="Apply to All Files", command=self.apply_transform_to_folder,
+                                width=160).grid(row=1, column=1, padx=5, pady=(5, 10), sticky="w")
+
+    def close_transform_window(self):
+        self.transform_source = self.transform_textbox.get("0.0", "end")
+        self.transform_window.destroy()
+        self.transform_window = None
+
+    def compile_transform(self):
+        """Compile the script in the transform window, reporting errors. Returns None if invalid."""
+        from transform import SensorTransform
+        self.transform_source = self.transform_textbox.get("0.0", "end")
+        try:
+            return SensorTransform(self.transform_source)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid transform: {e}", parent=self.transform_window)
+            return None
+
+    def apply_transform_to_file(self):
+        """Run the transform over the open file's sensors, including unsaved edits (in memory only)."""
+        if not self.sensors:
+            messagebox.showwarning("No File", "Open a file first", parent=self.transform_window)
+            return
+        transform = self.compile_transform()
+        if transform is None:
+            return
+        self.store_current_sensor_changes()
+        working = decode_sensor_block(self.sensors.tobytes())
+        for index, sensor in self.modified_sensors.items():
+            working[index] = sensor
+        try:
+            new_block = transform([working.tobytes()], [self.current_filepath])[0]
+        except Exception as e:
+            messagebox.showerror("Error", f"Transform failed: {e}", parent=self.transform_window)
+            return
+        if new_block is None:
+            messagebox.showerror("Error", "Transformed values cannot be stored; nothing was changed.",
+                                 parent=self.transform_window)
+            return
+        for index, sensor in enumerate(decode_sensor_block(new_block)):
+            self.store_sensor(index, sensor)
+        self.load_sensor_details(self.current_sensor_index)
+        messagebox.showinfo("Success", "Transform applied to all sensors (in memory).", parent=self.transform_window)
+
+    def apply_transform_to_folder(self):
+        if not self.batch_files:
+            messagebox.showwarning("No Files", "Select a folder first", parent=self.transform_window)
+            return
+        if self.batch_thread is not None:
+            return
+        transform = self.compile_transform()
+        if transform is not None:
+            self.start_batch(transform)
+
+    def open_sensor_grid(self):
+        """Show every sensor and field of the open file in one editable grid window."""
+        if not self.sensors:
+            return
+        self.store_current_sensor_changes()
+        if self.sensor_grid_window is not None:
+            self.sensor_grid.refresh()
+            self.sensor_grid_window.lift()
+            return
+
+        self.sensor_grid_window = customtkinter.CTkToplevel(self.root)
+        self.sensor_grid_window.title("All Sensors")
+        self.sensor_grid_window.geometry("1300x620")
+        self.sensor_grid_window.grid_rowconfigure(0, weight=1)
+        self.sensor_grid_window.grid_columnconfigure(0, weight=1)
+        self.sensor_grid_window.protocol("WM_DELETE_WINDOW", self.close_sensor_grid)
+        column_labels = [name if item is None else f"{name}[{item}]" for name, item in GRID_COLUMNS]
+        self.sensor_grid = SensorGrid(self.sensor_grid_window, SENSOR_POSITIONS, column_labels,
+                                      self.grid_cell_text, self.grid_cell_modified, self.grid_cell_edit)
+        self.sensor_grid.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+    def close_sensor_grid(self):
+        self.sensor_grid_window.destroy()
+        self.sensor_grid_window = None
+        self.sensor_grid = None
+
+    def grid_cell_value(self, sensor, column):
+        name, item = GRID_COLUMNS[column]
+        value = getattr(sensor, name)
+        return value if item is None else value[item]
+
+    def grid_cell_text(self, row, column):
+        return format_field_value(self.grid_cell_value(self.modified_sensors.get(row, self.sensors[row]), column))
+
+    def grid_cell_modified(self, row, column):
+        """A cell is modified when its pending value differs from the file's."""
+        pending = self.modified_sensors.get(row)
+        return (pending is not None and
+                self.grid_cell_value(pending, column) != self.grid_cell_value(self.sensors[row], column))
+
+    def grid_cell_edit(self, row, column, text):
+        """Apply an edit made in the grid to modified_sensors.
+
+        Returns:
+            bool: Whether the value was valid and stored.
+        """
+        name, item = GRID_COLUMNS[column]
+        current = self.modified_sensors.get(row, self.sensors[row])
+        try:
+            value = float(text) if isinstance(self.grid_cell_value(current, column), float) else int(text)
+            if item is not None:
+                items = list(getattr(current, name))
+                items[item] = value
+                value = tuple(items)
+            sensor = current.replace(**{name: value})
+        except Exception as e:
+            messagebox.showerror("Error", f"Invalid value for {name}: {e}", parent=self.sensor_grid_window)
+            return False
+        self.store_sensor(row, sensor)
+        if row == self.current_sensor_index:
+            self.load_sensor_details(row)
+        return True
+
     def prev_sensor(self):
         """Navigate to the previous sensor in the list."""
         idx = self.current_sensor_index - 1 if self.current_sensor_index - 1 >= 0 else NUM_SENSORS - 1
@@ -387,13 +677,39 @@ class SensorEditor:
         self.on_sensor_select(idx)
         
     def save_file(self):
-        """Write all in-memory sensor changes to the current file."""
-        self.save_sensor()  # Save current sensor first
-        for idx, modified_sensor in self.modified_sensors.items():
-            self.sensors[idx] = modified_sensor
-        if write_sensor_data(self.current_filepath, self.sensors):
-            messagebox.showinfo("Saved", "All changes saved to file")
+        """Write all in-memory sensor changes to the current file.
+
+        Only sensors whose packed bytes differ from the file are passed to the writer;
+        when nothing changed the file is not opened at all.
+        """
+        if self.sensor_entries:
+            try:
+                self.store_sensor(self.current_sensor_index, self.read_sensor_entries())
+            except Exception as e:
+                messagebox.showerror("Error", f"Invalid data: {e}")
+                return
+        if not self.modified_sensors:
+            messagebox.showinfo("Saved", "No changes to save")
+            return
+        if self.current_schema is not CURRENT_SCHEMA:
+            edited = decode_sensor_block(self.sensors.tobytes())
+            for idx, modified_sensor in self.modified_sensors.items():
+                edited[idx] = modified_sensor
+            if changes_missing_fields(self.current_schema, self.sensors.tobytes(), edited.tobytes()):
+                messagebox.showerror("Error", f"This file uses the {self.current_schema.name} sensor layout; "
+                                              "only maDirectionParams can be changed")
+                return
+        # Untouched sensors are passed as None so the writer leaves them alone
+        updates = [self.modified_sensors.get(i) for i in range(len(self.sensors))]
+        modified = write_sensor_data(self.current_filepath, updates)
+        if modified is not None:
+            for idx, modified_sensor in self.modified_sensors.items():
+                self.sensors[idx] = modified_sensor
+            messagebox.showinfo("Saved", f"All changes saved to file ({modified} bytes modified)")
             self.modified_sensors.clear()
+            self.fleet_table = None
+            if self.sensor_grid is not None:
+                self.sensor_grid.refresh()
         else:
             messagebox.showerror("Error", "Failed to save file")
         
@@ -407,33 +723,174 @@ class SensorEditor:
             self.update_car_name_label(filepath)
         
     def open_folder(self):
-        """Open a folder dialog and find all sensor files for batch processing."""
+        """Open a folder dialog and find all sensor files for batch processing.
+
+        Discovery runs on a background thread. A previously indexed folder shows its
+        cached file list at once while it is re-validated; otherwise files stream into
+        the batch list as they are found, so batch runs can start before the walk ends.
+        """
         folderpath = filedialog.askdirectory(title="Select Root Folder")
         if not folderpath:
             return
-        
-        self.batch_files = []
-        for root_dir, dirs, files in os.walk(folderpath):
-            if "StreamedDeformationSpec" in dirs:
-                spec_dir = os.path.join(root_dir, "StreamedDeformationSpec")
-                for file in os.listdir(spec_dir):
-                    if file.lower().endswith(('.dat', '.bin')):
-                        self.batch_files.append(os.path.join(spec_dir, file))
+
+        index = SpecIndex(folderpath)
+        streaming = not index.load()
+        self.batch_folder = folderpath
+        self.batch_filter = None
+        self.fleet_table = None
+        if self.fleet_queue is not None:
+            self.fleet_queue = None  # Its poller sees the change and stops
+            self.fleet_stats_btn.configure(state="normal")
+        if self.validation_queue is not None:
+            self.validation_queue = None  # Its poller sees the change and stops
+            self.validate_btn.configure(state="normal")
+        self.discovered_files = []
+        self.batch_files = self.discovered_files if streaming else index.files()
         self.sensor_detail_visible(False)
         self.batch_controls_visible(True)
-        messagebox.showinfo("Files Found", f"Found {len(self.batch_files)} StreamedDeformationSpec files")
-        self.car_name_label.configure(text=f"Editing {len(self.batch_files)} StreamedDeformationSpec files in {folderpath}.")
+        self.update_batch_label(folderpath, "scanning..." if streaming else "cached, checking for changes...")
 
-    def update_car_name_label(self, filepath):
-        """Update the car name label based on the file path."""
-        parts = filepath.split('/')
-        car_id = next((part.split('_')[1] for part in parts if 'VEH_' in part and '_' in part), None)
+        self.discovery_queue = queue.Queue()
+        threading.Thread(target=self.discover_worker, args=(index, self.discovery_queue), daemon=True).start()
+        self.root.after(BATCH_POLL_MS, self.poll_folder_discovery, folderpath, self.discovery_queue, streaming)
+
+    def discover_worker(self, index, result_queue):
+        """Walk the folder off the Tk thread, sending found files in chunks."""
+        chunk = []
+        last_flush = time.perf_counter()
+        try:
+            with tracing.span("discovery.walk", "discovery", folder=index.root):
+                for filepath in index.iter_refresh():
+                    chunk.append(filepath)
+                    if len(chunk) >= DISCOVERY_CHUNK_SIZE or time.perf_counter() - last_flush > DISCOVERY_FLUSH_SECONDS:
+                        result_queue.put(chunk)
+                        chunk = []
+                        last_flush = time.perf_counter()
+        except Exception as e:
+            print(f"Error scanning folder {index.root}: {e}")
+        finally:
+            result_queue.put(chunk)
+            result_queue.put(None)  # Sentinel: the walk is over
+
+    def poll_folder_discovery(self, folderpath, result_queue, streaming):
+        """Move discovered files into the batch list and update the live file count.
+
+        Args:
+            folderpath (str): Folder being scanned.
+            result_queue (queue.Queue): Queue fed by discover_worker.
+            streaming (bool): Whether files are shown as they arrive (no cached listing).
+        """
+        if result_queue is not self.discovery_queue:
+            return  # Another folder was opened meanwhile
+        finished = False
+        try:
+            while True:
+                chunk = result_queue.get_nowait()
+                if chunk is None:
+                    finished = True
+                    break
+                self.discovered_files.extend(chunk)
+        except queue.Empty:
+            pass
+
+        if finished:
+            self.batch_files = self.discovered_files
+            self.update_batch_label(folderpath)
+        else:
+            if streaming:
+                self.update_batch_label(folderpath, "scanning...")
+            self.root.after(BATCH_POLL_MS, self.poll_folder_discovery, folderpath, result_queue, streaming)
+
+    def update_batch_label(self, folderpath, status=None):
+        """Show how many spec files the current folder batch covers."""
+        if self.batch_filter is None:
+            text = f"Editing {len(self.batch_files)} StreamedDeformationSpec files in {folderpath}."
+        else:
+            text = (f"Editing {len(self.selected_batch_files())} of {len(self.batch_files)} "
+                    f"StreamedDeformationSpec files in {folderpath} (filtered).")
+        if status:
+            text += f" ({status})"
+        self.car_name_label.configure(text=text)
+
+    def selected_batch_files(self):
+        """Files of the open folder that pass the vehicle filter (all of them without one)."""
+        if self.batch_filter is None:
+            return list(self.batch_files)
+        return self.batch_filter.select(self.batch_files)
+
+    def open_batch_filter(self):
+        """Open a window restricting folder batch runs to some vehicles, families, finishes or kinds."""
+        from vehicles import default_index, KINDS, FINISHES, VehicleFilter
+        if not self.batch_files:
+            messagebox.showwarning("No Files", "Select a folder first")
+            return
+        index = default_index()
+        families = sorted({index.classify(index.vehicle_id(filepath))[0]
+                           for filepath in self.batch_files if index.vehicle_id(filepath)})
+        current = self.batch_filter or VehicleFilter()
+
+        window = customtkinter.CTkToplevel(self.root)
+        window.title("Filter Vehicles")
+        window.geometry("520x640")
+        window.grid_columnconfigure(1, weight=1)
+        window.grid_rowconfigure(3, weight=1)
+
+        customtkinter.CTkLabel(window, text="Vehicle search:").grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+        search_entry = customtkinter.CTkEntry(window)
+        search_entry.grid(row=0, column=1, columnspan=2, padx=10, pady=(10, 5), sticky="ew")
+
+        def create_checkboxes(parent, row, labels, selected):
+            frame = customtkinter.CTkFrame(parent)
+            frame.grid(row=row, column=0, columnspan=3, padx=10, pady=5, sticky="ew")
+            variables = {}
+            for i, label in enumerate(labels):
+                variables[label] = customtkinter.BooleanVar(value=selected is None or label in selected)
+                customtkinter.CTkCheckBox(frame, text=label, variable=variables[label]).grid(
+                    row=i // 3, column=i % 3, padx=5, pady=2, sticky="w")
+            return variables
+
+        kind_vars = create_checkboxes(window, 1, KINDS, current.kinds)
+        finish_vars = create_checkboxes(window, 2, FINISHES, current.finishes)
+        family_frame = customtkinter.CTkScrollableFrame(window)
+        family_frame.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky="nsew")
+        family_vars = {}
+        for i, family in enumerate(families):
+            family_vars[family] = customtkinter.BooleanVar(
+                value=current.families is None or family.upper() in current.families)
+            customtkinter.CTkCheckBox(family_frame, text=family, variable=family_vars[family]).grid(
+                row=i, column=0, padx=5, pady=1, sticky="w")
+
+        def checked(variables):
+            """Checked labels, or None when all are checked (no restriction)."""
+            labels = [label for label, variable in variables.items() if variable.get()]
+            return None if len(labels) == len(variables) else labels
+
+        def apply():
+            query = search_entry.get().strip()
+            self.batch_filter = VehicleFilter(
+                families=checked(family_vars), finishes=checked(finish_vars), kinds=checked(kind_vars),
+                vehicle_ids=[vehicle_id for vehicle_id, _ in index.search(query)] if query else None)
+            self.update_batch_label(self.batch_folder)
+            window.destroy()
 
-        if car_id and car_id.endswith("BIN"):
-            car_id = car_id[:-3]
+        def clear():
+            self.batch_filter = None
+            self.update_batch_label(self.batch_folder)
+            window.destroy()
 
-        if car_id and car_id in car_name:
-            self.car_name_label.configure(text=f"Car: {car_name[car_id]}")
+        customtkinter.CTkButton(window, text="Apply Filter", command=apply, width=120).grid(
+            row=4, column=0, padx=10, pady=(5, 10), sticky="w")
+        customtkinter.CTkButton(window, text="Clear Filter", command=clear, width=120).grid(
+            row=4, column=1, padx=5, pady=(5, 10), sticky="w")
+
+    def update_car_name_label(self, filepath):
+        """Update the car name label based on the file path."""
+        from vehicles import default_index
+        vehicle_id, name = default_index().resolve(filepath)
+        if name:
+            self.car_name_label.configure(text=f"Car: {name}")
+        elif vehicle_id:
+            self.car_name_label.configure(text=f"Car: {vehicle_id} ({os.path.basename(filepath)})")
         else:
             filename = os.path.basename(filepath)
             self.car_name_label.configure(text=f"File: {filename}")
@@ -450,33 +907,334 @@ class SensorEditor:
         if not sensors:
             messagebox.showerror("Error", "Failed to read sensor data from file.")
             return
+        schema = detect_schema(sensors.original)
+        if schema is None:
+            messagebox.showerror("Error", "Unknown sensor layout.")
+            return
+        if schema is not CURRENT_SCHEMA and schema is not self.current_schema:
+            messagebox.showwarning("Sensor layout", f"This file uses the {schema.name} sensor layout: only "
+                                                    "maDirectionParams are meaningful and can be saved.")
+        self.current_schema = schema
+        if self.left_frame is None:
+            self.create_sensor_panels()
+            self.sensor_detail_visible(False)  # Shown by the caller
         self.sensors = sensors
-        self.original_sensors = copy.deepcopy(sensors)
         self.load_sensor_list()
         self.load_sensor_details(0)
+        if self.sensor_grid is not None:
+            self.sensor_grid.refresh()
         
     def batch_apply_multiplier(self):
-        """Apply multiplier to sensor directions in all files in batch mode (folder batch processing)."""
+        """Apply multiplier to sensor directions in all files in batch mode (folder batch processing).
+
+        The run happens on a worker pool; progress comes back through a queue polled with root.after.
+        """
+        from batch import MultiplyDirectionParams
         if not self.batch_files:
             messagebox.showwarning("No Files", "Select a folder first")
             return
+        if self.batch_thread is not None:
+            return
         try:
             multiplier = float(self.batch_multiplier_entry.get())
         except ValueError:
             messagebox.showerror("Error", "Invalid multiplier")
             return
-        success = 0
-        for filepath in self.batch_files:
-            sensors = read_sensor_data(filepath)
-            if not sensors:
-                continue
-            modified_sensors = []
-            for sensor in sensors:
-                sensor["maDirectionParams"] = tuple(val * multiplier for val in sensor["maDirectionParams"])
-                # mfRadius remains unchanged.
-                modified_sensors.append(sensor)
-            if write_sensor_data(filepath, modified_sensors):
-                success += 1
-            if filepath == self.current_filepath:
-                self.process_single_file(filepath)
-        messagebox.showinfo("Complete", f"Processed {len(self.batch_files)} files\nSuccess: {success}")
+        self.start_batch(MultiplyDirectionParams(multiplier))
+
+    def start_batch(self, transform):
+        """Run a batch transform over the selected files of the open folder on a worker pool.
+
+        Args:
+            transform (callable): Blocks-in, blocks-out transform (see batch.MultiplyDirectionParams).
+        """
+        self.batch_queue = queue.Queue()
+        self.batch_cancel_event = threading.Event()
+        self.batch_results = []
+        self.batch_started_ns = time.perf_counter_ns()
+        filepaths = self.selected_batch_files()
+        self.batch_total = len(filepaths)
+        self.batch_apply_btn.configure(state="disabled")
+        self.batch_cancel_btn.configure(state="normal")
+        self.batch_progress.set(0)
+        self.batch_status_label.configure(text=f"0 / {self.batch_total}")
+
+        self.batch_thread = threading.Thread(
+            target=self.run_batch_worker,
+            args=(filepaths, transform, self.batch_processes_var.get(),
+                  self.batch_folder if self.batch_manifest_var.get() else None),
+            daemon=True
+        )
+        self.batch_thread.start()
+        self.root.after(BATCH_POLL_MS, self.poll_batch_progress)
+
+    def run_batch_worker(self, filepaths, transform, use_processes, manifest_root):
+        """Run the batch engine off the Tk thread. Never touches widgets; only feeds the queue.
+
+        With a manifest_root, the tree's manifest is loaded so files already transformed are skipped.
+        """
+        from batch import run_batch
+        from manifest import Manifest
+        try:
+            manifest = None
+            if manifest_root:
+                manifest = Manifest(manifest_root)
+                manifest.load()
+            run_batch(filepaths, transform, use_processes=use_processes, manifest=manifest,
+                      on_result=self.batch_queue.put, cancel_event=self.batch_cancel_event)
+        except Exception as e:
+            print(f"Batch run failed: {e}")
+        finally:
+            self.batch_queue.put(None)  # Sentinel: the run is over
+
+    def poll_batch_progress(self):
+        """Drain finished results from the worker queue and update the progress display."""
+        finished = False
+        try:
+            while True:
+                result = self.batch_queue.get_nowait()
+                if result is None:
+                    finished = True
+                    break
+                self.batch_results.append(result)
+        except queue.Empty:
+            pass
+
+        done = len(self.batch_results)
+        self.batch_progress.set(done / self.batch_total if self.batch_total else 1)
+        self.batch_status_label.configure(text=f"{done} / {self.batch_total}")
+        if finished:
+            self.finish_batch()
+        else:
+            self.root.after(BATCH_POLL_MS, self.poll_batch_progress)
+
+    def cancel_batch(self):
+        """Stop scheduling new files; files already being written are allowed to finish."""
+        if self.batch_cancel_event is not None:
+            self.batch_cancel_event.set()
+            self.batch_cancel_btn.configure(state="disabled")
+            self.batch_status_label.configure(text="Cancelling...")
+
+    def finish_batch(self):
+        """Restore the batch controls and show the per-file report once a run ends."""
+        from batch import summarize, STATUS_OK, STATUS_SKIPPED
+        self.batch_thread = None
+        self.batch_apply_btn.configure(state="normal")
+        self.batch_cancel_btn.configure(state="disabled")
+        summary = summarize(self.batch_results)
+        if summary["bytes_modified"]:
+            self.fleet_table = None  # Re-validated against file mtimes on next open
+        self.batch_status_label.configure(
+            text=f"{summary[STATUS_OK]} / {self.batch_total} succeeded, {summary[STATUS_SKIPPED]} already done")
+        if any(r["filepath"] == self.current_filepath and r["status"] == STATUS_OK for r in self.batch_results):
+            self.process_single_file(self.current_filepath)
+        self.show_batch_report(self.batch_results, summary)
+
+    def show_batch_report(self, results, summary):
+        """Open a window listing every file of the last batch run with its outcome.
+
+        Args:
+            results (list): Result dicts from the batch engine.
+            summary (dict): Counts from batch.summarize.
+        """
+        from batch import STATUS_OK, STATUS_SKIPPED, STATUS_FAILED, STATUS_CANCELLED
+        report = customtkinter.CTkToplevel(self.root)
+        report.title("Batch Report")
+        report.geometry("900x500")
+        report.grid_columnconfigure(0, weight=1)
+        report.grid_rowconfigure(1, weight=1)
+
+        header = customtkinter.CTkLabel(
+            report, anchor="w",
+            text=(f"Processed {len(results)} files - Success: {summary[STATUS_OK]}, "
+                  f"Already done: {summary[STATUS_SKIPPED]}, "
+                  f"Failed: {summary[STATUS_FAILED]}, Cancelled: {summary[STATUS_CANCELLED]}, "
+                  f"Bytes modified: {summary['bytes_modified']}")
+        )
+        header.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
+
+        textbox = customtkinter.CTkTextbox(report, font=("Consolas", 12))
+        textbox.grid(row=1, column=0, sticky="nsew", padx=10, pady=(5, 10))
+        # Failures first so they are not buried under thousands of successes
+        order = {STATUS_FAILED: 0, STATUS_CANCELLED: 1, STATUS_OK: 2, STATUS_SKIPPED: 3}
+        lines = []
+        for result in sorted(results, key=lambda r: (order[r["status"]], r["filepath"])):
+            if result["error"]:
+                detail = result["error"]
+            elif result["status"] == STATUS_SKIPPED:
+                detail = "already done"
+            else:
+                detail = f"{result['bytes_modified']} bytes modified"
+            lines.append(f"{result['status'].upper():<10}{result['filepath']}  ({detail})")
+        if tracing.enabled:
+            slowest = tracing.slowest_files(tracing.events(self.batch_started_ns))
+            if slowest:
+                lines = ["Slowest files (traced):", tracing.format_slowest_files(slowest), ""] + lines
+        textbox.insert("0.0", "\n".join(lines))
+        textbox.configure(state="disabled")
+
+    def toggle_tracing(self):
+        """Start recording timing spans, or stop and save them as a Chrome trace."""
+        if self.trace_var.get():
+            tracing.clear()
+            tracing.enable()
+            return
+        tracing.enable(False)
+        trace_events = tracing.take_events()
+        if not trace_events:
+            return
+        path = filedialog.asksaveasfilename(title="Save Trace", defaultextension=".json",
+                                            initialfile=tracing.DEFAULT_TRACE_PATH,
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path and tracing.export_chrome_trace(path, trace_events):
+            print(f"Trace saved to {path} ({len(trace_events)} spans)")
+            slowest = tracing.slowest_files(trace_events)
+            if slowest:
+                print("Slowest files:")
+                print(tracing.format_slowest_files(slowest))
+
+    def validate_folder(self):
+        """Check the selected files of the open folder (see validate.py) on a background thread."""
+        import sensor_np
+        if not sensor_np.NUMPY_AVAILABLE:
+            messagebox.showerror("Error", "Validation needs numpy")
+            return
+        if not self.batch_files:
+            messagebox.showwarning("No Files", "Select a folder first")
+            return
+        if self.validation_queue is not None:
+            return  # Already running
+
+        self.validation_queue = queue.Queue()
+        self.validate_btn.configure(state="disabled")
+        self.batch_status_label.configure(text="Validating...")
+        threading.Thread(target=self.validate_worker,
+                         args=(self.selected_batch_files(), self.validation_queue), daemon=True).start()
+        self.root.after(BATCH_POLL_MS, self.poll_validation, self.validation_queue)
+
+    def validate_worker(self, filepaths, result_queue):
+        """Run the checks off the Tk thread and hand the report back through the queue."""
+        import validate
+        report = None
+        try:
+            report = validate.validate_files(filepaths)
+        except Exception as e:
+            print(f"Validation failed: {e}")
+        result_queue.put(report)
+
+    def poll_validation(self, result_queue):
+        if result_queue is not self.validation_queue:
+            return  # Another folder was opened meanwhile
+        try:
+            report = result_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(BATCH_POLL_MS, self.poll_validation, result_queue)
+            return
+
+        self.validation_queue = None
+        self.validate_btn.configure(state="normal")
+        if report is None:
+            self.batch_status_label.configure(text="")
+            messagebox.showerror("Error", "Validation failed.")
+            return
+        broken = len({issue["filepath"] for issue in report["issues"]} | set(report["fallback_layout"]))
+        self.batch_status_label.configure(text=f"{broken} / {report['files']} files with issues")
+        self.show_validation_report(report)
+
+    def show_validation_report(self, report):
+        """Open a window with the counts per rule and every issue found."""
+        import validate
+        window = customtkinter.CTkToplevel(self.root)
+        window.title("Validation Report")
+        window.geometry("900x500")
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(0, weight=1)
+        textbox = customtkinter.CTkTextbox(window, font=("Consolas", 12), wrap="none")
+        textbox.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        textbox.insert("0.0", validate.format_report(report, limit=max(len(report["issues"]), len(report["unreadable"]),
+                                                                  len(report["unknown_layout"]),
+                                                                  len(report["fallback_layout"]))))
+        textbox.configure(state="disabled")
+
+    def open_fleet_stats(self):
+        """Show per-position and per-car distributions over every file of the open folder.
+
+        The fleet table is built (or re-validated from its cache) on a background thread.
+        """
+        import fleet
+        if not fleet.FLEET_AVAILABLE:
+            messagebox.showerror("Error", "Fleet statistics need pandas and numpy")
+            return
+        if not self.batch_files:
+            messagebox.showwarning("No Files", "Select a folder first")
+            return
+        if self.fleet_table is not None:
+            self.show_fleet_stats(self.fleet_table)
+            return
+        if self.fleet_queue is not None:
+            return  # Already loading
+
+        self.fleet_queue = queue.Queue()
+        self.fleet_stats_btn.configure(state="disabled")
+        self.batch_status_label.configure(text="Loading fleet table...")
+        threading.Thread(target=self.load_fleet_worker,
+                         args=(self.batch_folder, list(self.batch_files), self.fleet_queue), daemon=True).start()
+        self.root.after(BATCH_POLL_MS, self.poll_fleet_table, self.fleet_queue)
+
+    def load_fleet_worker(self, folderpath, filepaths, result_queue):
+        """Build the fleet table off the Tk thread and hand it back through the queue."""
+        import fleet
+        table = None
+        try:
+            table = fleet.FleetCache(folderpath).table(filepaths)
+        except Exception as e:
+            print(f"Error loading fleet table for {folderpath}: {e}")
+        result_queue.put(table)
+
+    def poll_fleet_table(self, result_queue):
+        if result_queue is not self.fleet_queue:
+            return  # Another folder was opened meanwhile
+        try:
+            table = result_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(BATCH_POLL_MS, self.poll_fleet_table, result_queue)
+            return
+
+        self.fleet_queue = None
+        self.fleet_stats_btn.configure(state="normal")
+        if table is None:
+            self.batch_status_label.configure(text="")
+            messagebox.showerror("Error", "Failed to load the fleet table.")
+            return
+        self.fleet_table = table
+        self.batch_status_label.configure(text=f"Fleet table: {table['filepath'].nunique()} files")
+        self.show_fleet_stats(table)
+
+    def show_fleet_stats(self, table):
+        """Open a window summarizing one value column per sensor position or per car."""
+        import fleet
+        window = customtkinter.CTkToplevel(self.root)
+        window.title("Fleet Stats")
+        window.geometry("1100x650")
+        window.grid_columnconfigure(2, weight=1)
+        window.grid_rowconfigure(1, weight=1)
+
+        column_var = customtkinter.StringVar(value=fleet.VALUE_COLUMNS[0][0])
+        grouping_var = customtkinter.StringVar(value=next(iter(fleet.GROUPINGS)))
+        textbox = customtkinter.CTkTextbox(window, font=("Consolas", 12), wrap="none")
+        textbox.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=10, pady=(5, 10))
+
+        def update(*_):
+            summary = fleet.summarize_field(table, column_var.get(), grouping_var.get())
+            textbox.configure(state="normal")
+            textbox.delete("0.0", "end")
+            textbox.insert("0.0", fleet.format_summary(summary))
+            textbox.configure(state="disabled")
+
+        customtkinter.CTkOptionMenu(window, variable=column_var, command=update,
+                                    values=[column for column, _, _ in fleet.VALUE_COLUMNS]
+                                    ).grid(row=0, column=0, padx=(10, 5), pady=(10, 5), sticky="w")
+        customtkinter.CTkOptionMenu(window, variable=grouping_var, command=update,
+                                    values=list(fleet.GROUPINGS)
+                                    ).grid(row=0, column=1, padx=5, pady=(10, 5), sticky="w")
+        update()
@@ -0,0 +1,279 @@
+"""Sensor adjacency graph and neighbor-aware edits.
+
+maNextSensor (6 links) and mau8NextBoundarySensor (2 links) wire the 20
+sensors of a file into a graph. Its topology depends only on those link
+bytes, and most files share their wiring with many others, so each distinct
+wiring is compiled once into a Topology (neighbor lists, a row-normalized
+neighbor matrix, hop distances, link problems) and cached by its link bytes.
+
+Edits gather each file's compiled operator by its wiring and apply them all
+in one batched matrix product over the stacked files:
+
+    smooth     move each sensor's direction params towards the mean of its
+               neighbors: x + alpha * (mean(neighbors) - x), repeated
+    propagate  scale one sensor's direction params by a factor and its
+               neighbors by a factor fading with hop distance:
+               1 + (factor - 1) * falloff ** hops
+
+Neighbors are taken in both directions (a link a -> b makes a and b
+neighbors), so asymmetric wiring still smooths symmetrically. Links that are
+not a sensor index (and not NO_SENSOR) are dangling and ignored. Both edits
+read the link fields, so files of a layout without them (legacy) are failed by
+the batch instead of being edited along links that are not there.
+
+    python sensor_graph.py <root folder>   lists the distinct wirings and their link problems
+
+Needs NumPy; check sensor_np.NUMPY_AVAILABLE before calling into it.
+"""
+import sys
+
+from sensor_io import NUM_SENSORS, find_spec_files
+from spec_schema import NO_SENSOR, LINK_FIELDS
+import sensor_np
+
+np = sensor_np.np
+
+TOPOLOGY_CACHE_SIZE = 4096  # Distinct wirings kept; the cache is cleared when it fills up
+UNREACHABLE = -1
+
+class Topology:
+    """The compiled graph of one wiring (see the module docstring).
+
+    Construction only builds the adjacency and mean operator with a few array
+    operations; hop distances and the link lists for reports are computed on
+    first use.
+    """
+
+    def __init__(self, next_sensors, boundary_sensors):
+        """Compile one wiring.
+
+        Args:
+            next_sensors: (NUM_SENSORS, 6) uint8 array of maNextSensor.
+            boundary_sensors: (NUM_SENSORS, 2) uint8 array of mau8NextBoundarySensor.
+        """
+        self._link_arrays = (next_sensors, boundary_sensors)
+        targets = np.concatenate(self._link_arrays, axis=1)
+        sources = np.broadcast_to(np.arange(NUM_SENSORS)[:, None], targets.shape)
+        in_range = targets < NUM_SENSORS
+        self.linked = np.zeros((NUM_SENSORS, NUM_SENSORS), dtype=bool)  # linked[a, b]: a links to b
+        self.linked[sources[in_range], targets[in_range]] = True
+        np.fill_diagonal(self.linked, False)
+
+        self.adjacency = self.linked | self.linked.T
+        degree = self.adjacency.sum(axis=1, keepdims=True)
+        # Row-normalized: mean_operator @ x gives each sensor the mean of its neighbors (itself if isolated)
+        self.mean_operator = np.where(degree > 0, self.adjacency / np.maximum(degree, 1), np.eye(NUM_SENSORS))
+        self._hops = None
+        self._links = None
+        self._smoothing = {}
+
+    @property
+    def links(self):
+        """(sensor, field, slot, target) of every link that is not NO_SENSOR."""
+        if self._links is None:
+            self._links = [(int(sensor), field, int(slot), int(values[sensor, slot]))
+                           for field, values in zip(LINK_FIELDS, self._link_arrays)
+                           for sensor, slot in zip(*np.nonzero(values != NO_SENSOR))]
+        return self._links
+
+    @property
+    def dangling(self):
+        """Links to a sensor that does not exist."""
+        return [link for link in self.links if link[3] >= NUM_SENSORS]
+
+    @property
+    def asymmetric(self):
+        """(a, b) pairs where a links to b but b not back to a."""
+        return [(int(a), int(b)) for a, b in zip(*np.nonzero(self.linked & ~self.linked.T))]
+
+    @property
+    def neighbors(self):
+        return [np.flatnonzero(row).tolist() for row in self.adjacency]
+
+    @property
+    def hops(self):
+        """(NUM_SENSORS, NUM_SENSORS) hop counts, UNREACHABLE where disconnected.
+
+        All starting sensors advance together: each step is one boolean matrix
+        product of the frontiers with the adjacency.
+        """
+        if self._hops is None:
+            hops = np.full((NUM_SENSORS, NUM_SENSORS), UNREACHABLE, dtype=np.int16)
+            reached = np.eye(NUM_SENSORS, dtype=bool)
+            hops[reached] = 0
+            frontier = reached
+            for distance in range(1, NUM_SENSORS):
+                frontier = (frontier @ self.adjacency) & ~reached
+                if not frontier.any():
+                    break
+                hops[frontier] = distance
+                reached |= frontier
+            self._hops = hops
+        return self._hops
+
+    def smoothing_operator(self, alpha, iterations=1):
+        """Matrix applying `iterations` smoothing steps at once (cached per alpha and iterations)."""
+        key = (alpha, iterations)
+        operator = self._smoothing.get(key)
+        if operator is None:
+            step = (1 - alpha) * np.eye(NUM_SENSORS) + alpha * self.mean_operator
+            operator = self._smoothing[key] = np.linalg.matrix_power(step, iterations)
+        return operator
+
+    def propagation_scales(self, sensor, factor, falloff):
+        """Per-sensor scale for a factor applied at one sensor and fading with hop distance."""
+        hops = self.hops[sensor]
+        return np.where(hops == UNREACHABLE, 1.0, 1 + (factor - 1) * falloff ** np.maximum(hops, 0))
+
+    def issues(self):
+        """Link problems of this wiring.
+
+        Returns:
+            dict: "asymmetric" (a, b) pairs where a links to b but b not back to a, and
+            "dangling" (sensor, field, slot, value) links to a sensor that does not exist.
+        """
+        return {"asymmetric": self.asymmetric, "dangling": self.dangling}
+
+_topologies = {}
+
+def wiring_key(next_sensors, boundary_sensors):
+    return next_sensors.tobytes() + boundary_sensors.tobytes()
+
+def topology(next_sensors, boundary_sensors):
+    """Cached Topology of a wiring; files with identical link bytes share one instance."""
+    key = wiring_key(next_sensors, boundary_sensors)
+    compiled = _topologies.get(key)
+    if compiled is None:
+        if len(_topologies) >= TOPOLOGY_CACHE_SIZE:
+            _topologies.clear()
+        compiled = _topologies[key] = Topology(next_sensors, boundary_sensors)
+    return compiled
+
+def wirings(arr):
+    """Distinct wirings of a stacked (n_files, NUM_SENSORS) array.
+
+    Each file's link bytes are viewed as one opaque value, so finding the
+    distinct ones is a single 1-D sort.
+
+    Returns:
+        tuple: (list of Topology, one index into that list per file).
+    """
+    links = np.concatenate([arr[field].reshape(len(arr), -1) for field in LINK_FIELDS], axis=1)
+    keys = np.ascontiguousarray(links).view(np.dtype((np.void, links.shape[1]))).reshape(-1)
+    _, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    compiled = [topology(arr[LINK_FIELDS[0]][row], arr[LINK_FIELDS[1]][row]) for row in first_rows]
+    return compiled, inverse.reshape(-1)
+
+def group_by_wiring(arr):
+    """Group the files of a stacked (n_files, NUM_SENSORS) array by identical wiring.
+
+    Returns:
+        list: (Topology, row indices) tuples.
+    """
+    compiled, inverse = wirings(arr)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(compiled)))[:-1]
+    return list(zip(compiled, np.split(order, bounds)))
+
+def _store_direction_params(arr, values):
+    """Write float64 direction params back into arr; return a bool per file, True where some value overflowed."""
+    with np.errstate(over="ignore", invalid="ignore"):
+        converted = values.astype(arr["maDirectionParams"].dtype)
+    overflowed = (~np.isfinite(converted) & np.isfinite(values)).reshape(len(arr), -1).any(axis=1)
+    arr["maDirectionParams"] = converted
+    return overflowed
+
+def smooth_direction_params(arr, alpha=0.5, iterations=1):
+    """Smooth every file's direction params across neighbors, in place.
+
+    Returns:
+        numpy.ndarray: One bool per file, True where a value overflowed float32.
+    """
+    compiled, inverse = wirings(arr)
+    if not compiled:
+        return np.zeros(0, dtype=bool)
+    operators = np.stack([wiring.smoothing_operator(alpha, iterations) for wiring in compiled])
+    values = operators[inverse] @ arr["maDirectionParams"].astype(np.float64)
+    return _store_direction_params(arr, values)
+
+def propagate_scale(arr, sensor, factor, falloff=0.5):
+    """Scale one sensor's direction params, and its neighbors' by a fading factor, in place.
+
+    Returns:
+        numpy.ndarray: One bool per file, True where a value overflowed float32.
+    """
+    compiled, inverse = wirings(arr)
+    if not compiled:
+        return np.zeros(0, dtype=bool)
+    scales = np.stack([wiring.propagation_scales(sensor, factor, falloff) for wiring in compiled])
+    values = arr["maDirectionParams"].astype(np.float64) * scales[inverse][..., None]
+    return _store_direction_params(arr, values)
+
+class SmoothDirectionParams:
+    """Batch transform smoothing direction params across neighbors (see batch.MultiplyDirectionParams)."""
+
+    def __init__(self, alpha=0.5, iterations=1):
+        self.alpha = alpha
+        self.iterations = iterations
+        self.key = f"smooth maDirectionParams alpha {alpha!r} x{iterations}"
+        self.reads_fields = LINK_FIELDS
+
+    def __call__(self, blocks, filepaths=None):
+        arr = sensor_np.stack_sensor_blocks(blocks)
+        invalid = smooth_direction_params(arr, self.alpha, self.iterations)
+        return [None if invalid[row] else sensor_np.encode_sensor_array(arr[row]) for row in range(len(blocks))]
+
+class PropagateScale:
+    """Batch transform scaling one sensor and, fading with distance, its neighbors."""
+
+    def __init__(self, sensor, factor, falloff=0.5):
+        if not 0 <= sensor < NUM_SENSORS:
+            raise ValueError(f"sensor index must be below {NUM_SENSORS}")
+        self.sensor = sensor
+        self.factor = factor
+        self.falloff = falloff
+        self.key = f"propagate scale {factor!r} from sensor {sensor} falloff {falloff!r}"
+        self.reads_fields = LINK_FIELDS
+
+    def __call__(self, blocks, filepaths=None):
+        arr = sensor_np.stack_sensor_blocks(blocks)
+        invalid = propagate_scale(arr, self.sensor, self.factor, self.falloff)
+        return [None if invalid[row] else sensor_np.encode_sensor_array(arr[row]) for row in range(len(blocks))]
+
+def wiring_report(filepaths):
+    """Distinct wirings of many files, most common first.
+
+    Returns:
+        list: (Topology, list of filepaths) tuples.
+    """
+    arr, loaded = sensor_np.stack_sensor_files(filepaths)
+    groups = [(compiled, [loaded[row] for row in rows]) for compiled, rows in group_by_wiring(arr)]
+    return sorted(groups, key=lambda group: len(group[1]), reverse=True)
+
+def format_wiring_report(groups, limit=20):
+    files = sum(len(group_filepaths) for _, group_filepaths in groups)
+    lines = [f"{files} files, {len(groups)} distinct wirings"]
+    for number, (compiled, group_filepaths) in enumerate(groups[:limit], 1):
+        lines.append(f"Wiring {number}: {len(group_filepaths)} files, e.g. {group_filepaths[0]}")
+        if compiled.asymmetric:
+            lines.append("  asymmetric: " + ", ".join(f"{a}->{b}" for a, b in compiled.asymmetric))
+        if compiled.dangling:
+            lines.append("  dangling: " + ", ".join(f"{sensor}.{field}[{slot}]={target}"
+                                                    for sensor, field, slot, target in compiled.dangling))
+    if len(groups) > limit:
+        lines.append(f"... and {len(groups) - limit} more wirings")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python sensor_graph.py <root folder>")
+        return 2
+    if not sensor_np.NUMPY_AVAILABLE:
+        print("The sensor graph needs numpy")
+        return 2
+    print(format_wiring_report(wiring_report(find_spec_files(argv[0]))))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Spreadsheet view of every sensor and field of the open file.
+
+The grid is drawn on a single canvas and only the cells inside the visible
+viewport exist as canvas items; scrolling re-renders the viewport and an edit
+rewrites just the affected cell in place. Values, modified state and edits go
+through callbacks so the grid knows nothing about the sensor model itself.
+"""
+import tkinter
+import customtkinter
+
+ROW_HEIGHT = 26
+HEADER_HEIGHT = 30
+ROW_HEADER_WIDTH = 170
+COLUMN_WIDTH = 150
+
+# (light, dark) colour pairs picked by the current appearance mode
+COLORS = {
+    "background": ("gray92", "gray14"),
+    "header": ("gray80", "gray25"),
+    "grid": ("gray70", "gray30"),
+    "text": ("black", "gray90"),
+    "modified": ("#fff2b3", "#5c4d00"),
+    "selected": ("#9cc3ff", "#1f538d"),
+}
+
+def theme_color(name):
+    light, dark = COLORS[name]
+    return dark if customtkinter.get_appearance_mode() == "Dark" else light
+
+class SensorGrid(customtkinter.CTkFrame):
+    def __init__(self, master, row_labels, column_labels, get_text, is_modified, on_edit, **kwargs):
+        """Create the grid.
+
+        Args:
+            master: Parent widget.
+            row_labels (list): One label per row (sensor positions).
+            column_labels (list): One label per column (field names).
+            get_text (callable): (row, column) -> text shown in the cell.
+            is_modified (callable): (row, column) -> whether the cell holds an unsaved change.
+            on_edit (callable): (row, column, text) -> True if the edit was accepted.
+        """
+        super().__init__(master, **kwargs)
+        self.row_labels = row_labels
+        self.column_labels = column_labels
+        self.get_text = get_text
+        self.is_modified = is_modified
+        self.on_edit = on_edit
+        self.selected = (0, 0)
+        self.visible_cells = {}  # (row, column) -> (rectangle item, text item)
+        self.editor = None
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = customtkinter.CTkCanvas(self, highlightthickness=0, takefocus=1,
+                                              background=theme_color("background"))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        y_scroll = customtkinter.CTkScrollbar(self, orientation="vertical", command=self.yview)
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        x_scroll = customtkinter.CTkScrollbar(self, orientation="horizontal", command=self.xview)
+        x_scroll.grid(row=1, column=0, sticky="ew")
+        self.canvas.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set,
+                              scrollregion=(0, 0, ROW_HEADER_WIDTH + len(column_labels) * COLUMN_WIDTH,
+                                            HEADER_HEIGHT + len(row_labels) * ROW_HEIGHT))
+
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Double-Button-1>", lambda event: self.begin_edit())
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_units(-1))  # X11 wheel up
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_units(1))   # X11 wheel down
+        for key, (d_row, d_column) in {"<Up>": (-1, 0), "<Down>": (1, 0), "<Left>": (0, -1),
+                                       "<Right>": (0, 1), "<Tab>": (0, 1), "<Shift-Tab>": (0, -1)}.items():
+            self.canvas.bind(key, lambda event, r=d_row, c=d_column: self.move_selection(r, c))
+        self.canvas.bind("<Home>", lambda event: self.select(self.selected[0], 0))
+        self.canvas.bind("<End>", lambda event: self.select(self.selected[0], len(self.column_labels) - 1))
+        self.canvas.bind("<Return>", lambda event: self.begin_edit())
+        self.canvas.bind("<F2>", lambda event: self.begin_edit())
+        self.canvas.focus_set()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def xview(self, *args):
+        self.canvas.xview(*args)
+        self.render()
+
+    def on_mousewheel(self, event):
+        view = self.canvas.xview if event.state & 0x1 else self.canvas.yview
+        view("scroll", -1 if event.delta > 0 else 1, "units")
+        self.render()
+        return "break"
+
+    def scroll_units(self, units):
+        self.canvas.yview("scroll", units, "units")
+        self.render()
+        return "break"
+
+    def cell_bounds(self, row, column):
+        x = ROW_HEADER_WIDTH + column * COLUMN_WIDTH
+        y = HEADER_HEIGHT + row * ROW_HEIGHT
+        return x, y, x + COLUMN_WIDTH, y + ROW_HEIGHT
+
+    def visible_range(self):
+        """Rows and columns intersecting the viewport, as two ranges."""
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        first_row = max(0, int((top - HEADER_HEIGHT) // ROW_HEIGHT))
+        last_row = min(len(self.row_labels), int((top + height - HEADER_HEIGHT) // ROW_HEIGHT) + 1)
+        first_column = max(0, int((left - ROW_HEADER_WIDTH) // COLUMN_WIDTH))
+        last_column = min(len(self.column_labels), int((left + width - ROW_HEADER_WIDTH) // COLUMN_WIDTH) + 1)
+        return range(first_row, last_row), range(first_column, last_column)
+
+    def render(self):
+        """Redraw the viewport: visible cells plus the frozen row and column headers."""
+        if self.editor is not None:
+            self.end_edit(commit=True)  # The overlay entry is positioned for the old viewport
+        self.canvas.delete("all")
+        self.visible_cells = {}
+        rows, columns = self.visible_range()
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        grid_color = theme_color("grid")
+        text_color = theme_color("text")
+
+        for row in rows:
+            for column in columns:
+                x0, y0, x1, y1 = self.cell_bounds(row, column)
+                rect = self.canvas.create_rectangle(x0, y0, x1, y1, outline=grid_color,
+                                                    fill=self.cell_fill(row, column))
+                text = self.canvas.create_text(x1 - 6, (y0 + y1) / 2, anchor="e", fill=text_color,
+                                               text=self.get_text(row, column))
+                self.visible_cells[(row, column)] = (rect, text)
+
+        # Headers are drawn last, pinned to the viewport edges, so they stay on top while scrolling
+        header_color = theme_color("header")
+        for column in columns:
+            x0, _, x1, _ = self.cell_bounds(0, column)
+            self.canvas.create_rectangle(x0, top, x1, top + HEADER_HEIGHT, outline=grid_color, fill=header_color)
+            self.canvas.create_text((x0 + x1) / 2, top + HEADER_HEIGHT / 2, fill=text_color,
+                                    text=self.column_labels[column])
+        for row in rows:
+            _, y0, _, y1 = self.cell_bounds(row, 0)
+            self.canvas.create_rectangle(left, y0, left + ROW_HEADER_WIDTH, y1, outline=grid_color, fill=header_color)
+            self.canvas.create_text(left + 6, (y0 + y1) / 2, anchor="w", fill=text_color,
+                                    text=f"{row:2d}  {self.row_labels[row]}")
+        self.canvas.create_rectangle(left, top, left + ROW_HEADER_WIDTH, top + HEADER_HEIGHT,
+                                     outline=grid_color, fill=header_color)
+
+    def cell_fill(self, row, column):
+        if (row, column) == self.selected:
+            return theme_color("selected")
+        if self.is_modified(row, column):
+            return theme_color("modified")
+        return theme_color("background")
+
+    def refresh_cell(self, row, column):
+        """Update one cell in place if it is currently drawn."""
+        items = self.visible_cells.get((row, column))
+        if items is None:
+            return
+        rect, text = items
+        self.canvas.itemconfigure(rect, fill=self.cell_fill(row, column))
+        self.canvas.itemconfigure(text, text=self.get_text(row, column))
+
+    def refresh_row(self, row):
+        for column in range(len(self.column_labels)):
+            self.refresh_cell(row, column)
+
+    def refresh(self):
+        for row, column in list(self.visible_cells):
+            self.refresh_cell(row, column)
+
+    def on_click(self, event):
+        self.canvas.focus_set()
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        if event.x < ROW_HEADER_WIDTH or event.y < HEADER_HEIGHT:
+            return
+        row = int((y - HEADER_HEIGHT) // ROW_HEIGHT)
+        column = int((x - ROW_HEADER_WIDTH) // COLUMN_WIDTH)
+        if 0 <= row < len(self.row_labels) and 0 <= column < len(self.column_labels):
+            self.select(row, column)
+
+    def move_selection(self, d_row, d_column):
+        row, column = self.selected
+        self.select(min(max(row + d_row, 0), len(self.row_labels) - 1),
+                    min(max(column + d_column, 0), len(self.column_labels) - 1))
+        return "break"  # Keep Tab from moving focus out of the grid
+
+    def select(self, row, column):
+        previous = self.selected
+        self.selected = (row, column)
+        if self.ensure_visible(row, column):
+            self.render()
+        else:
+            self.refresh_cell(*previous)
+            self.refresh_cell(row, column)
+
+    def ensure_visible(self, row, column):
+        """Scroll so a cell is fully inside the viewport. Returns True if the view moved."""
+        x0, y0, x1, y1 = self.cell_bounds(row, column)
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        total_width = ROW_HEADER_WIDTH + len(self.column_labels) * COLUMN_WIDTH
+        total_height = HEADER_HEIGHT + len(self.row_labels) * ROW_HEIGHT
+        moved = False
+        if x0 - ROW_HEADER_WIDTH < left:
+            self.canvas.xview_moveto((x0 - ROW_HEADER_WIDTH) / total_width)
+            moved = True
+        elif x1 > left + width:
+            self.canvas.xview_moveto((x1 - width) / total_width)
+            moved = True
+        if y0 - HEADER_HEIGHT < top:
+            self.canvas.yview_moveto((y0 - HEADER_HEIGHT) / total_height)
+            moved = True
+        elif y1 > top + height:
+            self.canvas.yview_moveto((y1 - height) / total_height)
+            moved = True
+        return moved
+
+    def begin_edit(self):
+        """Overlay an entry on the selected cell; Enter commits, Escape cancels."""
+        if self.editor is not None:
+            return
+        row, column = self.selected
+        self.ensure_visible(row, column)
+        self.render()
+        x0, y0, x1, y1 = self.cell_bounds(row, column)
+        self.editor = tkinter.Entry(self.canvas, justify="right")
+        self.editor.insert(0, self.get_text(row, column))
+        self.editor.select_range(0, "end")
+        self.canvas.create_window(x0, y0, anchor="nw", window=self.editor,
+                                  width=x1 - x0, height=y1 - y0, tags="editor")
+        self.editor.focus_set()
+        self.editor.bind("<Return>", lambda event: self.end_edit(commit=True))
+        self.editor.bind("<Tab>", lambda event: self.end_edit(commit=True, advance=True))
+        self.editor.bind("<Escape>", lambda event: self.end_edit(commit=False))
+        self.editor.bind("<FocusOut>", lambda event: self.end_edit(commit=True))
+        return "break"
+
+    def end_edit(self, commit, advance=False):
+        if self.editor is None:
+            return "break"
+        editor, self.editor = self.editor, None
+        row, column = self.selected
+        text = editor.get()
+        editor.destroy()
+        self.canvas.delete("editor")
+        if commit and text != self.get_text(row, column) and not self.on_edit(row, column, text):
+            self.canvas.focus_set()
+            return "break"
+        self.refresh_cell(row, column)
+        self.canvas.focus_set()
+        if advance:
+            self.move_selection(0, 1)
+        return "break"
@@ -1,13 +1,30 @@
-import struct
+import mmap
+import os
+
+from spec_schema import CURRENT_SCHEMA
+from tracing import traced
 
 # Global constants
-START_OFFSET = 0x120
-SENSOR_STEP = 0x40
-NUM_SENSORS = 20
+SPEC_DIR_NAME = "StreamedDeformationSpec"
+SPEC_EXTENSIONS = (".dat", ".bin")
+
+# The sensor table layout comes from the schema registry (see spec_schema.py)
+START_OFFSET = CURRENT_SCHEMA.start_offset  # 0x120
+SENSOR_STEP = CURRENT_SCHEMA.stride  # 0x40
+NUM_SENSORS = CURRENT_SCHEMA.count  # 20
 
 # Sensor fields occupy 38 bytes:
-SENSOR_FIELDS_SIZE = 38
-SENSOR_STRUCT_FORMAT = ">6ff6BBB2B"
+SENSOR_FIELDS_SIZE = CURRENT_SCHEMA.fields_size
+SENSOR_STRUCT_FORMAT = CURRENT_SCHEMA.record_format  # ">6ff6BBB2B"
+SENSOR_PADDING_SIZE = CURRENT_SCHEMA.padding_size
+SENSOR_BLOCK_SIZE = CURRENT_SCHEMA.block_size
+
+# Precompiled struct for the sensor fields
+SENSOR_STRUCT = CURRENT_SCHEMA.record_struct
+
+# Per-field layout of SENSOR_STRUCT_FORMAT: (name, offset in record, struct, value count)
+SENSOR_FIELD_LAYOUT = CURRENT_SCHEMA.layout
+SENSOR_FIELDS = CURRENT_SCHEMA.fields
 
 SENSOR_POSITIONS = [
     "Roof Upper Left", "Roof Upper Right", "Roof Lower Right", "Roof Lower Left", "Front Lower Right",
@@ -16,78 +33,234 @@ SENSOR_POSITIONS = [
     "Rear Upper Right", "Rear Lower Middle", "Rear Upper Middle", "Rear Lower Left", "Rear Upper Left"
 ]
 
+@traced("find_spec_files", "discovery")
+def find_spec_files(folderpath):
+    """Find every StreamedDeformationSpec .dat/.bin file under folderpath."""
+    spec_files = []
+    for root_dir, dirs, files in os.walk(folderpath):
+        if SPEC_DIR_NAME in dirs:
+            spec_dir = os.path.join(root_dir, SPEC_DIR_NAME)
+            for file in os.listdir(spec_dir):
+                if file.lower().endswith(SPEC_EXTENSIONS):
+                    spec_files.append(os.path.join(spec_dir, file))
+    return spec_files
+
+def _field_property(name):
+    """Property decoding one SENSOR_FIELD_LAYOUT field straight from a sensor's buffer."""
+    offset, field_struct, count = SENSOR_FIELDS[name]
+
+    def get(self):
+        values = field_struct.unpack_from(self._buffer, self._offset + offset)
+        return values if count > 1 else values[0]
+
+    def set(self, value):
+        if count > 1:
+            field_struct.pack_into(self._buffer, self._offset + offset, *value)
+        else:
+            field_struct.pack_into(self._buffer, self._offset + offset, value)
+
+    return property(get, set)
+
+class Sensor:
+    """One sensor record, decoded on access from a buffer rather than stored as Python objects.
+
+    A sensor is either a view into a SensorFile's buffer or a standalone
+    SENSOR_FIELDS_SIZE buffer of its own (see from_values/copy). Assigning a field
+    packs it immediately, so invalid values raise struct.error at assignment time.
+    """
+    __slots__ = ("_buffer", "_offset")
+
+    FIELDS = tuple(name for name, _, _, _ in SENSOR_FIELD_LAYOUT)
+
+    def __init__(self, buffer=None, offset=0):
+        self._buffer = buffer if buffer is not None else bytearray(SENSOR_FIELDS_SIZE)
+        self._offset = offset
+
+    maDirectionParams = _field_property("maDirectionParams")
+    mfRadius = _field_property("mfRadius")
+    maNextSensor = _field_property("maNextSensor")
+    mu8SceneIndex = _field_property("mu8SceneIndex")
+    mu8AbsorbtionLevel = _field_property("mu8AbsorbtionLevel")
+    mau8NextBoundarySensor = _field_property("mau8NextBoundarySensor")
+
+    @classmethod
+    def from_values(cls, **fields):
+        """Build a standalone sensor; every field in Sensor.FIELDS must be given."""
+        sensor = cls()
+        for name in cls.FIELDS:
+            setattr(sensor, name, fields[name])
+        return sensor
+
+    def pack(self):
+        """The SENSOR_FIELDS_SIZE field bytes of this sensor (no padding)."""
+        return bytes(self._buffer[self._offset:self._offset + SENSOR_FIELDS_SIZE])
+
+    def copy(self):
+        """A standalone copy that no longer shares the source buffer."""
+        return Sensor(bytearray(self.pack()))
+
+    def replace(self, **fields):
+        """A standalone copy with some fields changed."""
+        sensor = self.copy()
+        for name, value in fields.items():
+            setattr(sensor, name, value)
+        return sensor
+
+    def __eq__(self, other):
+        return isinstance(other, Sensor) and self.pack() == other.pack()
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"Sensor({values})"
+
+class SensorFile:
+    """The sensor table of one file, backed by a single buffer.
+
+    original is an immutable bytes snapshot of the block as read (fields and padding);
+    data is the working copy that the Sensor views returned by indexing read and write.
+    """
+    __slots__ = ("original", "data")
+
+    def __init__(self, block):
+        if len(block) < SENSOR_BLOCK_SIZE:
+            raise ValueError("Unexpected end of file")
+        self.original = bytes(block[:SENSOR_BLOCK_SIZE])
+        self.data = bytearray(self.original)
+
+    def __len__(self):
+        return NUM_SENSORS
+
+    def __getitem__(self, index):
+        if not 0 <= index < NUM_SENSORS:
+            raise IndexError("sensor index out of range")
+        return Sensor(self.data, index * SENSOR_STEP)
+
+    def __setitem__(self, index, sensor):
+        """Copy a sensor's field bytes into this file's buffer (padding is untouched)."""
+        if not 0 <= index < NUM_SENSORS:
+            raise IndexError("sensor index out of range")
+        start = index * SENSOR_STEP
+        self.data[start:start + SENSOR_FIELDS_SIZE] = sensor.pack()
+
+    def __iter__(self):
+        return (Sensor(self.data, i * SENSOR_STEP) for i in range(NUM_SENSORS))
+
+    def original_sensor(self, index):
+        """Read-only view of a sensor as it was when the file was read."""
+        return Sensor(self.original, index * SENSOR_STEP)
+
+    def tobytes(self):
+        return bytes(self.data)
+
+def decode_sensor_block(data):
+    """Wrap a raw sensor block (NUM_SENSORS * SENSOR_STEP bytes) in a SensorFile.
+
+    Pure function: callers that already hold the file contents can decode
+    without touching the disk again. Fields are decoded lazily on access.
+    """
+    return SensorFile(data)
+
+@traced("read_sensor_block", "io", with_file=True)
+def read_sensor_block(filepath):
+    """Read the whole sensor region of a file in a single I/O call."""
+    with open(filepath, "rb") as f:
+        f.seek(START_OFFSET)
+        return f.read(SENSOR_BLOCK_SIZE)
+
+@traced("read_sensor_data", "io", with_file=True)
 def read_sensor_data(filepath):
-    sensors = []
     try:
-        with open(filepath, "rb") as f:
-            for i in range(NUM_SENSORS):
-                offset = START_OFFSET + i * SENSOR_STEP
-                f.seek(offset)
-                data = f.read(SENSOR_STEP)
-                if len(data) < SENSOR_STEP:
-                    raise ValueError("Unexpected end of file")
-                sensor_data = data[:SENSOR_FIELDS_SIZE]
-                padding = data[SENSOR_FIELDS_SIZE:]
-                unpacked = struct.unpack(SENSOR_STRUCT_FORMAT, sensor_data)
-                sensor = {
-                    "maDirectionParams": unpacked[0:6],
-                    "mfRadius": unpacked[6],
-                    "maNextSensor": unpacked[7:13],
-                    "mu8SceneIndex": unpacked[13],
-                    "mu8AbsorbtionLevel": unpacked[14],
-                    "mau8NextBoundarySensor": unpacked[15:17],
-                    "padding": padding
-                }
-                sensors.append(sensor)
-        return sensors
+        return decode_sensor_block(read_sensor_block(filepath))
     except Exception as e:
         print(f"Error reading file {filepath}: {e}")
         return None
 
+def _patch_record(mapped, base, record, layout=SENSOR_FIELD_LAYOUT):
+    """Patch the fields of one sensor record that differ from record; return the bytes changed."""
+    if mapped[base:base + len(record)] == record:
+        return 0
+    _, last_offset, last_struct, _ = layout[-1]
+    if last_offset + last_struct.size == len(record):  # Schema layouts have no gaps between fields
+        return _patch_bytes(mapped, base, record)
+    modified = 0
+    for _, offset, field_struct, _ in layout:
+        modified += _patch_bytes(mapped, base + offset, record[offset:offset + field_struct.size])
+    return modified
+
+def _patch_bytes(mapped, position, packed):
+    """Overwrite mapped[position:] with packed if it differs; return the number of bytes changed."""
+    end = position + len(packed)
+    current = mapped[position:end]
+    if current == packed:
+        return 0
+    mapped[position:end] = packed
+    # Bytes of the XOR that are not zero, counted in C
+    difference = int.from_bytes(current, "big") ^ int.from_bytes(packed, "big")
+    return len(packed) - difference.to_bytes(len(packed), "big").count(0)
+
+@traced("write_sensor_data", "io", with_file=True)
 def write_sensor_data(filepath, sensors):
+    """Patch sensor fields in place through a memory map of the file.
+
+    Only field bytes that differ from what is on disk are written; padding and
+    untouched fields are never copied. A None entry leaves that sensor alone.
+
+    Args:
+        filepath (str): File to patch.
+        sensors: SensorFile, or a sequence of Sensor/None indexed by sensor position.
+
+    Returns:
+        int: Number of bytes actually modified, or None on failure.
+    """
     try:
-        with open(filepath, "r+b") as f:
-            for i, sensor in enumerate(sensors):
-                offset = START_OFFSET + i * SENSOR_STEP
-                f.seek(offset)
-                
-                # Read existing sensor data to preserve unchanged values
-                data = f.read(SENSOR_STEP)
-                if len(data) < SENSOR_STEP:
-                    raise ValueError("Unexpected end of file")
-                
-                # Unpack the existing sensor data
-                unpacked = struct.unpack(SENSOR_STRUCT_FORMAT, data[:SENSOR_FIELDS_SIZE])
-                
-                # Preserve original values
-                updated_sensor = {
-                    "maDirectionParams": sensor.get("maDirectionParams", unpacked[0:6]),
-                    "mfRadius": sensor.get("mfRadius", unpacked[6]),
-                    "maNextSensor": sensor.get("maNextSensor", unpacked[7:13]),
-                    "mu8SceneIndex": sensor.get("mu8SceneIndex", unpacked[13]),
-                    "mu8AbsorbtionLevel": sensor.get("mu8AbsorbtionLevel", unpacked[14]),
-                    "mau8NextBoundarySensor": sensor.get("mau8NextBoundarySensor", unpacked[15:17]),
-                }
-
-                # Pack the updated values
-                packed = struct.pack(
-                    SENSOR_STRUCT_FORMAT,
-                    *updated_sensor["maDirectionParams"],
-                    updated_sensor["mfRadius"],
-                    *updated_sensor["maNextSensor"],
-                    updated_sensor["mu8SceneIndex"],
-                    updated_sensor["mu8AbsorbtionLevel"],
-                    *updated_sensor["mau8NextBoundarySensor"]
-                )
-
-                # Preserve original padding
-                padding = data[SENSOR_FIELDS_SIZE:]
-
-                # Seek and write the corrected data
-                f.seek(offset)
-                f.write(packed + padding)
-
-        return True
+        records = [(START_OFFSET + i * SENSOR_STEP, sensor.pack())
+                   for i, sensor in enumerate(sensors) if sensor is not None]
+        with open(filepath, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapped:
+            if len(mapped) < START_OFFSET + len(sensors) * SENSOR_STEP:
+                raise ValueError("Unexpected end of file")
+            modified = 0
+            for base, record in records:
+                modified += _patch_record(mapped, base, record)
+            if modified:
+                mapped.flush()
+        return modified
     except Exception as e:
         print(f"Error writing file {filepath}: {e}")
-        return False
+        return None
+
+@traced("write_sensor_block", "io", with_file=True)
+def write_sensor_block(filepath, data, schema=CURRENT_SCHEMA):
+    """Patch a file from a raw sensor block (e.g. one encoded by the NumPy backend).
+
+    Field bytes are compared and patched individually; the block's padding is ignored.
+    With another schema (see spec_schema.detect_schema), only that layout's fields are
+    written; data is still in the current layout, whose records start with them.
+
+    Returns:
+        int: Number of bytes actually modified, or None on failure.
+    """
+    try:
+        if len(data) < SENSOR_BLOCK_SIZE:
+            raise ValueError("Sensor block too short")
+        with open(filepath, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapped:
+            if len(mapped) < START_OFFSET + SENSOR_BLOCK_SIZE:
+                raise ValueError("Unexpected end of file")
+            modified = patch_sensor_block(mapped, data, schema)
+            if modified:
+                mapped.flush()
+        return modified
+    except Exception as e:
+        print(f"Error writing file {filepath}: {e}")
+        return None
+
+def patch_sensor_block(mapped, data, schema=CURRENT_SCHEMA):
+    """Patch the sensor table of a whole spec file held in a writable buffer (mmap, bytearray).
+
+    Same rules as write_sensor_block. Returns the number of bytes changed.
+    """
+    modified = 0
+    for i in range(NUM_SENSORS):
+        record = i * SENSOR_STEP
+        modified += _patch_record(mapped, START_OFFSET + record,
+                                  data[record:record + schema.fields_size], schema.layout)
+    return modified
@@ -0,0 +1,102 @@
+"""Optional NumPy backend for sensor tables.
+
+Decodes the sensor block into a structured array whose dtype mirrors
+SENSOR_STRUCT_FORMAT, so bulk edits over one file or a whole folder run as
+single vectorized operations. Everything here is a no-op import when NumPy is
+not installed; check NUMPY_AVAILABLE before calling into it.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sensor_io import (
+    NUM_SENSORS, SENSOR_BLOCK_SIZE, SENSOR_PADDING_SIZE,
+    SensorFile, decode_sensor_block, read_sensor_block
+)
+from spec_schema import CURRENT_SCHEMA
+
+NUMPY_AVAILABLE = np is not None
+
+NUMPY_TYPES = {"f": ">f4", "B": "u1"}  # struct format character -> NumPy type
+
+def schema_dtype(schema):
+    """Structured dtype of one record of a spec_schema layout, padding included."""
+    fields = []
+    for name, _, field_struct, count in schema.layout:
+        numpy_type = NUMPY_TYPES[field_struct.format[-1]]
+        fields.append((name, numpy_type, (count,)) if count > 1 else (name, numpy_type))
+    fields.append(("padding", f"V{schema.padding_size}"))
+    return np.dtype(fields)
+
+# Big-endian record layout, identical to SENSOR_STRUCT_FORMAT followed by the padding bytes
+SENSOR_DTYPE = schema_dtype(CURRENT_SCHEMA) if NUMPY_AVAILABLE else None
+
+def decode_sensor_array(data):
+    """Decode a raw sensor block into a writable (NUM_SENSORS,) structured array."""
+    if len(data) < SENSOR_BLOCK_SIZE:
+        raise ValueError("Unexpected end of file")
+    return np.frombuffer(data, dtype=SENSOR_DTYPE, count=NUM_SENSORS).copy()
+
+def encode_sensor_array(arr):
+    """Encode a structured sensor array back into raw block bytes."""
+    return np.ascontiguousarray(arr, dtype=SENSOR_DTYPE).tobytes()
+
+def stack_sensor_files(filepaths):
+    """Read many files into one (n_files, NUM_SENSORS) structured array.
+
+    Returns:
+        tuple: (array, list of the filepaths that were read successfully, in row order)
+    """
+    blocks = []
+    loaded = []
+    for filepath in filepaths:
+        try:
+            block = read_sensor_block(filepath)
+        except OSError as e:
+            print(f"Error reading file {filepath}: {e}")
+            continue
+        if len(block) < SENSOR_BLOCK_SIZE:
+            print(f"Error reading file {filepath}: Unexpected end of file")
+            continue
+        blocks.append(block)
+        loaded.append(filepath)
+    return stack_sensor_blocks(blocks), loaded
+
+def stack_sensor_blocks(blocks):
+    """Stack raw sensor blocks already in memory into a (n_blocks, NUM_SENSORS) structured array."""
+    data = b"".join(block[:SENSOR_BLOCK_SIZE] for block in blocks)
+    return np.frombuffer(data, dtype=SENSOR_DTYPE).reshape(len(blocks), NUM_SENSORS).copy()
+
+def sensors_to_array(sensors):
+    """Convert a SensorFile, or a list of Sensor objects, into a structured array."""
+    if isinstance(sensors, SensorFile):
+        return decode_sensor_array(sensors.data)
+    padding = bytes(SENSOR_PADDING_SIZE)
+    data = b"".join(sensor.pack() + padding for sensor in sensors)
+    return np.frombuffer(data, dtype=SENSOR_DTYPE).copy()
+
+def array_to_sensors(arr):
+    """Convert a (NUM_SENSORS,) structured array back into a SensorFile."""
+    return decode_sensor_block(encode_sensor_array(arr))
+
+def multiply_direction_params(arr, factor):
+    """Return a copy of arr with every maDirectionParams value multiplied by factor.
+
+    The product is computed in double precision and rounded once to float32, which
+    is exactly what packing a Python float with struct does, so results are
+    byte-identical to the per-sensor dict path. Works on any array shape.
+    """
+    result = arr.copy()
+    with np.errstate(over="ignore"):
+        result["maDirectionParams"] = arr["maDirectionParams"].astype(np.float64) * factor
+    return result
+
+def has_non_finite(arr):
+    """Flag inf/NaN floats, reduced over the sensor axis.
+
+    Returns one bool per file for a stacked (n_files, NUM_SENSORS) array, or a
+    single bool for one file's (NUM_SENSORS,) array.
+    """
+    finite = np.isfinite(arr["maDirectionParams"]).all(axis=-1) & np.isfinite(arr["mfRadius"])
+    return ~finite.all(axis=-1)
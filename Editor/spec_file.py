@@ -0,0 +1,177 @@
+"""Whole-file view of a StreamedDeformationSpec resource.
+
+SpecFile reads a file once into a buffer and exposes its sections as
+zero-copy memoryview slices of that buffer; nothing is decoded until asked
+for. Only the sensor table's layout is known (see spec_schema.py), so the
+sections are:
+
+    header   bytes before the sensor table (0x000-0x120)
+    sensors  the sensor table, decoded on access into Sensor views
+    data@X   the rest of the resource, split at the offsets that header
+             words point to (see SpecFile.pointers), left undecoded
+
+The sensor-only path (sensor_io.read_sensor_data and the batch engine) does
+not go through this module and reads just the sensor block as before.
+
+    python spec_file.py <file.dat>     prints the sections and header pointers
+"""
+import os
+import struct
+import sys
+
+from sensor_io import Sensor, SensorFile, START_OFFSET, SENSOR_BLOCK_SIZE, SENSOR_STEP, NUM_SENSORS
+from spec_schema import detect_schema
+
+HEADER_WORD = struct.Struct(">I")
+POINTER_ALIGNMENT = 4
+
+class SpecSection:
+    __slots__ = ("name", "offset", "size", "view")
+
+    def __init__(self, name, offset, view):
+        self.name = name
+        self.offset = offset
+        self.size = len(view)
+        self.view = view  # memoryview into the SpecFile buffer
+
+    def __repr__(self):
+        return f"SpecSection({self.name!r}, offset=0x{self.offset:X}, size=0x{self.size:X})"
+
+class SpecFile:
+    def __init__(self, data, filepath=None):
+        """Wrap the complete contents of a spec file.
+
+        Args:
+            data (bytes or bytearray): File contents; a bytearray makes the sections writable.
+            filepath (str): Where the data came from, used by save().
+
+        Raises:
+            ValueError: If the data ends before the sensor table does.
+        """
+        if len(data) < START_OFFSET + SENSOR_BLOCK_SIZE:
+            raise ValueError("Unexpected end of file")
+        self.filepath = filepath
+        self.buffer = memoryview(data)
+        self._header_words = None
+        self._sections = None
+        self._schema = None
+
+    @classmethod
+    def open(cls, filepath, writable=False):
+        """Read a whole file in one call; returns None on failure.
+
+        With writable, the sections and sensor views can be edited in place and
+        written back with save().
+        """
+        try:
+            with open(filepath, "rb") as f:
+                data = f.read()
+            return cls(bytearray(data) if writable else data, filepath)
+        except Exception as e:
+            print(f"Error reading file {filepath}: {e}")
+            return None
+
+    @property
+    def header(self):
+        return self.buffer[:START_OFFSET]
+
+    @property
+    def sensor_block(self):
+        return self.buffer[START_OFFSET:START_OFFSET + SENSOR_BLOCK_SIZE]
+
+    @property
+    def schema(self):
+        """Layout of the sensor table (see spec_schema.detect_schema)."""
+        if self._schema is None:
+            self._schema = detect_schema(self.sensor_block.tobytes())
+        return self._schema
+
+    def header_words(self):
+        """The header as big-endian 32-bit words (decoded once)."""
+        if self._header_words is None:
+            self._header_words = [word for (word,) in HEADER_WORD.iter_unpack(self.header)]
+        return self._header_words
+
+    def pointers(self):
+        """Header words that look like offsets into the file past the header.
+
+        The header's fields are not documented, so this is a heuristic: aligned
+        values pointing past the header and inside the file.
+
+        Returns:
+            list: (offset of the word in the header, value) tuples.
+        """
+        size = len(self.buffer)
+        return [(i * HEADER_WORD.size, word) for i, word in enumerate(self.header_words())
+                if START_OFFSET <= word < size and word % POINTER_ALIGNMENT == 0]
+
+    def sections(self):
+        """Every section of the file, in file order (computed once)."""
+        if self._sections is None:
+            end = START_OFFSET + SENSOR_BLOCK_SIZE
+            sections = [SpecSection("header", 0, self.header), SpecSection("sensors", START_OFFSET, self.sensor_block)]
+            bounds = sorted({end, len(self.buffer)} | {value for _, value in self.pointers() if value > end})
+            for start, stop in zip(bounds, bounds[1:]):
+                sections.append(SpecSection(f"data@0x{start:X}", start, self.buffer[start:stop]))
+            self._sections = sections
+        return self._sections
+
+    def section(self, name):
+        """Memoryview of one section by name, or None."""
+        for section in self.sections():
+            if section.name == name:
+                return section.view
+        return None
+
+    def sensor(self, index):
+        """Sensor view straight into the file buffer; assignments edit the buffer in place."""
+        if not 0 <= index < NUM_SENSORS:
+            raise IndexError("sensor index out of range")
+        return Sensor(self.buffer, START_OFFSET + index * SENSOR_STEP)
+
+    def sensors(self):
+        """The sensor table as a SensorFile (a copy, as returned by sensor_io.read_sensor_data)."""
+        return SensorFile(self.sensor_block)
+
+    def tobytes(self):
+        return self.buffer.tobytes()
+
+    def save(self, filepath=None):
+        """Write the buffer back atomically. Returns True on success."""
+        filepath = filepath or self.filepath
+        tmp_path = f"{filepath}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(self.buffer)
+            os.replace(tmp_path, filepath)
+            return True
+        except Exception as e:
+            print(f"Error writing file {filepath}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+def describe(spec_file):
+    """Text listing of a file's sections and header pointers."""
+    lines = [f"{len(spec_file.buffer)} bytes, sensor layout: {spec_file.schema.name if spec_file.schema else 'unknown'}"]
+    for section in spec_file.sections():
+        lines.append(f"  0x{section.offset:06X}  {section.size:8d}  {section.name}")
+    pointers = spec_file.pointers()
+    if pointers:
+        lines.append("Header words that look like offsets:")
+        lines += [f"  header+0x{offset:03X} -> 0x{value:X}" for offset, value in pointers]
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python spec_file.py <file.dat>")
+        return 2
+    spec_file = SpecFile.open(argv[0])
+    if spec_file is None:
+        return 1
+    print(describe(spec_file))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Persistent, incremental index of StreamedDeformationSpec files under a root folder.
+
+The index remembers, for every directory of the tree, its mtime, its
+subdirectories and (for StreamedDeformationSpec directories) its spec files.
+A directory's mtime only changes when entries are added, removed or renamed
+directly inside it, so on a rescan unchanged directories cost one stat and
+their cached listing is reused; only changed directories are read again with
+os.scandir.
+"""
+import hashlib
+import json
+import os
+
+from sensor_io import SPEC_DIR_NAME, SPEC_EXTENSIONS
+from tracing import traced
+
+INDEX_VERSION = 1
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".burnout_at_editor")
+
+def default_cache_path(root, kind="index", extension="json"):
+    """Cache file used for a root folder (one per absolute root path and kind)."""
+    key = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{kind}-{key}.{extension}")
+
+def scan_directory(path):
+    """List one directory with os.scandir.
+
+    Returns:
+        tuple: (subdirectory names to descend into, spec file names if this is a
+        StreamedDeformationSpec directory, else an empty list)
+    """
+    subdirs = []
+    spec_files = []
+    is_spec_dir = os.path.basename(path) == SPEC_DIR_NAME
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif is_spec_dir and entry.name.lower().endswith(SPEC_EXTENSIONS):
+                spec_files.append(entry.name)
+    subdirs.sort()
+    spec_files.sort()
+    return subdirs, spec_files
+
+def child_path(rel, name):
+    """Relative path of a subdirectory (cheaper than os.path.join in the hot loop)."""
+    return f"{rel}{os.sep}{name}" if rel else name
+
+class SpecIndex:
+    def __init__(self, root, cache_path=None):
+        """Index for one root folder.
+
+        Args:
+            root (str): Root folder of the extracted bundles.
+            cache_path (str): Where to persist the index; defaults to default_cache_path(root).
+        """
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path or default_cache_path(root)
+        self.dirs = {}
+        self.rescanned = 0
+
+    def load(self):
+        """Load the persisted index. Returns False if there is none or it is unusable."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get("version") != INDEX_VERSION or cached.get("root") != self.root:
+            return False
+        self.dirs = cached["dirs"]
+        return True
+
+    def save(self):
+        """Persist the index atomically."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            data = json.dumps({"version": INDEX_VERSION, "root": self.root, "dirs": self.dirs})
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving folder index {self.cache_path}: {e}")
+
+    def files(self):
+        """Spec file paths currently in the index, in walk order."""
+        spec_files = []
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            entry = self.dirs.get(rel)
+            if entry is None:
+                continue
+            if entry["spec_files"]:
+                directory = os.path.join(self.root, rel)
+                spec_files.extend(os.path.join(directory, name) for name in entry["spec_files"])
+            stack.extend(child_path(rel, name) for name in reversed(entry["subdirs"]))
+        return spec_files
+
+    def iter_refresh(self):
+        """Bring the index up to date, yielding spec file paths as directories are visited.
+
+        Only directories whose mtime changed are re-listed. The updated index is
+        saved once the generator is exhausted.
+        """
+        dirs = {}
+        self.rescanned = 0
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                entry = self.dirs.get(rel)
+                if entry is None or entry["mtime_ns"] != mtime_ns:
+                    subdirs, spec_files = scan_directory(path)
+                    entry = {"mtime_ns": mtime_ns, "subdirs": subdirs, "spec_files": spec_files}
+                    self.rescanned += 1
+            except OSError:
+                continue  # Vanished or unreadable directory; drop it from the index
+            dirs[rel] = entry
+            for name in entry["spec_files"]:
+                yield os.path.join(path, name)
+            stack.extend(child_path(rel, name) for name in reversed(entry["subdirs"]))
+        changed = self.rescanned or len(dirs) != len(self.dirs)
+        self.dirs = dirs
+        if changed:
+            self.save()
+
+    @traced("SpecIndex.refresh", "discovery")
+    def refresh(self):
+        """Bring the index up to date, re-listing only directories whose mtime changed.
+
+        Returns:
+            list: Every spec file path under the root.
+        """
+        return list(self.iter_refresh())
@@ -0,0 +1,176 @@
+"""Declarative sensor table layouts of StreamedDeformationSpec files.
+
+Each layout lists the fields of one sensor record; SensorSchema compiles it
+once into struct.Struct objects and field offsets. Two layouts are registered:
+
+    current  38 field bytes per record (>6ff6BBB2B): direction params, radius,
+             sensor links, scene index, absorbtion level and boundary links
+    legacy   24 field bytes per record (>6f): direction params only, as read
+             by Editor_Old.py
+
+Both start at 0x120 with a 0x40 stride. No version field for the sensor table
+is known, so detect_schema probes the block itself and picks the first
+registered layout that accepts it. The current layout is recognized by either
+of two signatures: every sensor link is a sensor index or NO_SENSOR, or
+mu8SceneIndex increases from each sensor to the next. A current-layout file
+with one corrupt link (or scene index) still matches the other, so it stays
+editable and validate.py reports the corruption; only blocks that match
+neither are treated as legacy, and only their direction params are edited.
+The legacy layout has no signature of its own (it accepts any block), so a
+current-layout file corrupt in both its links and its scene order reads as
+legacy too; validate.py lists every such fallback match as an issue.
+"""
+import struct
+
+NO_SENSOR = 0xFF  # Link value for "no sensor"
+
+class SensorSchema:
+    def __init__(self, name, fields, start_offset=0x120, stride=0x40, count=20, probe=None):
+        """Compile a sensor record layout.
+
+        Args:
+            name (str): Registry name.
+            fields (list): (field name, struct format character, value count) in record order.
+            start_offset (int): File offset of the first record.
+            stride (int): Bytes from one record to the next (fields plus padding).
+            count (int): Number of records.
+            probe (callable): probe(schema, block) -> bool, deciding whether a block read at
+                start_offset uses this layout; None accepts any block that is long enough.
+        """
+        self.name = name
+        self.start_offset = start_offset
+        self.stride = stride
+        self.count = count
+        self.block_size = stride * count
+        self.probe = probe
+
+        # (name, offset in record, struct, value count), the shape of sensor_io.SENSOR_FIELD_LAYOUT
+        self.layout = []
+        offset = 0
+        for field, code, value_count in fields:
+            field_struct = struct.Struct(f">{value_count if value_count > 1 else ''}{code}")
+            self.layout.append((field, offset, field_struct, value_count))
+            offset += field_struct.size
+        self.fields = {field: (offset, field_struct, value_count)
+                       for field, offset, field_struct, value_count in self.layout}
+        self.record_format = ">" + "".join(field_struct.format[1:] for _, _, field_struct, _ in self.layout)
+        self.record_struct = struct.Struct(self.record_format)
+        self.fields_size = self.record_struct.size
+        self.padding_size = stride - self.fields_size
+        if self.padding_size < 0:
+            raise ValueError(f"{name}: fields ({self.fields_size} bytes) do not fit the {stride} byte stride")
+        self._block_structs = {}
+        self._byte_offsets = {}
+        self.link_values = bytes(range(count)) + bytes([NO_SENSOR])  # Valid sensor link bytes
+
+    def block_struct(self, names, raw=False):
+        """Struct unpacking the given fields of every record of a block in a single call (cached).
+
+        Values come out record by record, in layout order within a record; with raw,
+        each field comes out as its undecoded bytes.
+        """
+        key = (frozenset(names), raw)
+        block_struct = self._block_structs.get(key)
+        if block_struct is None:
+            parts = []
+            position = 0
+            for field, offset, field_struct, _ in self.layout:
+                if field not in key[0]:
+                    continue
+                if offset > position:
+                    parts.append(f"{offset - position}x")
+                parts.append(f"{field_struct.size}s" if raw else field_struct.format[1:])
+                position = offset + field_struct.size
+            if self.stride > position:
+                parts.append(f"{self.stride - position}x")
+            block_struct = self._block_structs[key] = struct.Struct(">" + "".join(parts) * self.count)
+        return block_struct
+
+    @property
+    def fallback(self):
+        """Whether the layout has no signature and is only chosen because no other layout matched."""
+        return self.probe is None
+
+    def accepts(self, block):
+        if len(block) < self.block_size:
+            return False
+        return self.probe is None or self.probe(self, block)
+
+    def byte_offsets(self, names):
+        """Offsets within a record of every byte of the given fields (cached per names tuple)."""
+        offsets = self._byte_offsets.get(names)
+        if offsets is None:
+            offsets = self._byte_offsets[names] = [offset + i for field, offset, field_struct, _ in self.layout
+                                                   if field in names for i in range(field_struct.size)]
+        return offsets
+
+    def __repr__(self):
+        return f"SensorSchema({self.name!r}, {self.record_format!r})"
+
+LINK_FIELDS = ("maNextSensor", "mau8NextBoundarySensor")
+
+def scene_order_valid(schema, block):
+    """Probe: mu8SceneIndex increases from each sensor of the block to the next."""
+    offset = schema.fields["mu8SceneIndex"][0]
+    scenes = block[offset:schema.block_size:schema.stride]
+    return all(a < b for a, b in zip(scenes, scenes[1:]))
+
+def current_signature(schema, block):
+    """Probe of the current layout: links_valid or scene_order_valid (see the module docstring)."""
+    return links_valid(schema, block) or scene_order_valid(schema, block)
+
+def links_valid(schema, block):
+    """Probe: every sensor link of the block is a sensor index or NO_SENSOR.
+
+    Each link byte is sliced out of all records at once and the valid values are
+    deleted from it, so the probe costs a few C calls rather than a decode.
+    """
+    valid = schema.link_values
+    end = schema.block_size
+    stride = schema.stride
+    for offset in schema.byte_offsets(LINK_FIELDS):
+        if block[offset:end:stride].translate(None, valid):
+            return False
+    return True
+
+SCHEMAS = {}  # Name -> SensorSchema, in probe order
+
+def register_schema(schema):
+    """Add a layout to the registry; detect_schema tries layouts in registration order."""
+    SCHEMAS[schema.name] = schema
+    return schema
+
+CURRENT_SCHEMA = register_schema(SensorSchema("current", [
+    ("maDirectionParams", "f", 6),
+    ("mfRadius", "f", 1),
+    ("maNextSensor", "B", 6),
+    ("mu8SceneIndex", "B", 1),
+    ("mu8AbsorbtionLevel", "B", 1),
+    ("mau8NextBoundarySensor", "B", 2),
+], probe=current_signature))
+
+LEGACY_SCHEMA = register_schema(SensorSchema("legacy", [
+    ("maDirectionParams", "f", 6),
+]))
+
+def detect_schema(block):
+    """Layout of a sensor block read at 0x120, or None if no registered layout accepts it."""
+    for schema in SCHEMAS.values():
+        if schema.accepts(block):
+            return schema
+    return None
+
+def missing_fields(schema, reference=CURRENT_SCHEMA):
+    """Fields of the reference layout that schema does not have."""
+    return [field for field, _, _, _ in reference.layout if field not in schema.fields]
+
+def changes_missing_fields(schema, block, new_block, reference=CURRENT_SCHEMA):
+    """Whether new_block differs from block in reference fields that schema does not have.
+
+    Such an edit cannot be written to a file of that layout.
+    """
+    missing = missing_fields(schema, reference)
+    if not missing:
+        return False
+    block_struct = reference.block_struct(missing, raw=True)
+    return block_struct.unpack_from(block) != block_struct.unpack_from(new_block)
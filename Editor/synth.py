@@ -0,0 +1,161 @@
+"""Synthetic StreamedDeformationSpec corpus generator.
+
+Writes valid spec files (a header of START_OFFSET bytes, the sensor block in
+the SENSOR_STRUCT layout, and some trailing data) into nested trees shaped like
+extracted bundles, for benchmarks and experiments:
+
+    <root>/g<k>/VEH_<ID>_AT_BIN/StreamedDeformationSpec/<n>.dat
+    <root>/g<k>/VEH_<ID>_AT_BIN/Other/<n>.dat   (noise the discovery walk must skip)
+
+or, with --bundles, the same resources packed into BND2 bundles (see bundle.py):
+
+    <root>/g<k>/VEH_<ID>_AT.BIN
+
+    python synth.py <output folder> --vehicles 5000 --files-per-vehicle 2
+"""
+import argparse
+import os
+import random
+import sys
+import zlib
+
+from sensor_io import (
+    START_OFFSET, SENSOR_STEP, NUM_SENSORS, SENSOR_STRUCT, SENSOR_PADDING_SIZE, SPEC_DIR_NAME
+)
+from data import car_name
+from bundle import BUNDLE_MAGIC, BUNDLE_VERSION, HEADER_SIZE, ENTRY_SIZE, BLOCK_COUNT, FLAG_COMPRESSED, SPEC_TYPE_ID, STRUCTS
+
+TRAILER_SIZE = 0x200  # Bytes after the sensor block, standing in for the rest of the resource
+NO_SENSOR = 0xFF
+NOISE_TYPE_ID = 0x1  # Resource type of the non-spec resources packed into synthetic bundles
+BUNDLE_ALIGNMENT = 0x10
+
+def make_sensor_block(rng):
+    """Random but plausible sensor block: positive floats, in-range links, scene indices in order."""
+    records = []
+    for index in range(NUM_SENSORS):
+        direction_params = [round(rng.uniform(0.0, 2.0), 4) for _ in range(6)]
+        radius = round(rng.uniform(0.05, 1.0), 4)
+        next_sensors = [rng.randrange(NUM_SENSORS) if rng.random() < 0.8 else NO_SENSOR for _ in range(6)]
+        boundary = [rng.randrange(NUM_SENSORS) if rng.random() < 0.5 else NO_SENSOR for _ in range(2)]
+        record = SENSOR_STRUCT.pack(*direction_params, radius, *next_sensors, index, rng.randrange(5), *boundary)
+        records.append(record + bytes(SENSOR_PADDING_SIZE))
+    return b"".join(records)
+
+def make_spec_file(rng):
+    """Bytes of one complete synthetic spec file."""
+    return bytes(START_OFFSET) + make_sensor_block(rng) + rng.randbytes(TRAILER_SIZE)
+
+def vehicle_ids(count):
+    """count vehicle IDs: the real data.car_name IDs first, then numbered synthetic ones."""
+    ids = list(car_name)
+    return ids[:count] + [f"SYN{i:05d}" for i in range(count - len(ids))]
+
+def generate_corpus(root, vehicles=100, files_per_vehicle=2, groups=10, noise_files=1, seed=0):
+    """Write a synthetic tree.
+
+    Args:
+        root (str): Output folder (created if missing).
+        vehicles (int): Number of VEH_ folders.
+        files_per_vehicle (int): Spec files in each StreamedDeformationSpec folder.
+        groups (int): Top-level g<k> folders the vehicles are spread over.
+        noise_files (int): Non-spec .dat files per vehicle, in a sibling folder.
+        seed (int): Random seed; the same arguments always produce the same bytes.
+
+    Returns:
+        list: Paths of the spec files written.
+    """
+    rng = random.Random(seed)
+    spec_files = []
+    for i, vehicle_id in enumerate(vehicle_ids(vehicles)):
+        vehicle_dir = os.path.join(root, f"g{i % groups}", f"VEH_{vehicle_id}_AT_BIN")
+        spec_dir = os.path.join(vehicle_dir, SPEC_DIR_NAME)
+        os.makedirs(spec_dir, exist_ok=True)
+        for n in range(files_per_vehicle):
+            filepath = os.path.join(spec_dir, f"{n}.dat")
+            with open(filepath, "wb") as f:
+                f.write(make_spec_file(rng))
+            spec_files.append(filepath)
+        if noise_files:
+            other_dir = os.path.join(vehicle_dir, "Other")
+            os.makedirs(other_dir, exist_ok=True)
+            for n in range(noise_files):
+                with open(os.path.join(other_dir, f"{n}.dat"), "wb") as f:
+                    f.write(rng.randbytes(START_OFFSET + NUM_SENSORS * SENSOR_STEP))
+    return spec_files
+
+def _align(offset):
+    return -(-offset // BUNDLE_ALIGNMENT) * BUNDLE_ALIGNMENT
+
+def make_bundle(resources, compressed=True, byte_order=">"):
+    """Bytes of a BND2 bundle holding the given resources, all data in block 0.
+
+    Args:
+        resources (list): (resource id, type id, data bytes) tuples.
+        compressed (bool): zlib-compress every resource and set FLAG_COMPRESSED.
+        byte_order (str): "<" or ">", as in the struct module. Only the header and entry
+            table follow it; resources are written as given, so "<" bundles are only good
+            for checking that their sensor data is refused (see bundle.check_sensor_data).
+    """
+    header_struct, entry_struct = STRUCTS[byte_order]
+    entries_offset = HEADER_SIZE
+    data_offset = _align(entries_offset + len(resources) * ENTRY_SIZE)
+    entries = []
+    section = bytearray()
+    for resource_id, type_id, data in resources:
+        stored = zlib.compress(data) if compressed else data
+        offset = len(section)
+        section += stored + bytes(_align(len(stored)) - len(stored))
+        empty = [0] * (BLOCK_COUNT - 1)
+        entries.append(entry_struct.pack(resource_id, 0, len(data) | (4 << 28), *empty, len(stored), *empty,
+                                         offset, *empty, 0, type_id, 0, 0, 0))
+    end = data_offset + len(section)
+    header = header_struct.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 1 if byte_order == "<" else 3, 0, len(resources),
+                                entries_offset, data_offset, end, end, FLAG_COMPRESSED if compressed else 0)
+    table = b"".join(entries)
+    return (header + bytes(HEADER_SIZE - len(header)) + table
+            + bytes(data_offset - entries_offset - len(table)) + section)
+
+def generate_bundles(root, vehicles=100, files_per_vehicle=2, groups=10, noise_files=1, seed=0, compressed=True):
+    """Write one synthetic bundle per vehicle; arguments as for generate_corpus.
+
+    Returns:
+        list: Paths of the bundles written.
+    """
+    rng = random.Random(seed)
+    bundle_paths = []
+    for i, vehicle_id in enumerate(vehicle_ids(vehicles)):
+        folder = os.path.join(root, f"g{i % groups}")
+        os.makedirs(folder, exist_ok=True)
+        resources = [(rng.getrandbits(32), SPEC_TYPE_ID, make_spec_file(rng)) for _ in range(files_per_vehicle)]
+        resources += [(rng.getrandbits(32), NOISE_TYPE_ID, rng.randbytes(START_OFFSET + NUM_SENSORS * SENSOR_STEP))
+                      for _ in range(noise_files)]
+        filepath = os.path.join(folder, f"VEH_{vehicle_id}_AT.BIN")
+        with open(filepath, "wb") as f:
+            f.write(make_bundle(resources, compressed))
+        bundle_paths.append(filepath)
+    return bundle_paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic StreamedDeformationSpec tree.")
+    parser.add_argument("root", help="Output folder")
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--files-per-vehicle", type=int, default=2)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--noise-files", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bundles", action="store_true", help="Write VEH_<ID>_AT.BIN bundles instead of extracted folders")
+    parser.add_argument("--uncompressed", action="store_true", help="With --bundles, store resources uncompressed")
+    args = parser.parse_args(argv)
+    if args.bundles:
+        bundle_paths = generate_bundles(args.root, args.vehicles, args.files_per_vehicle, args.groups,
+                                        args.noise_files, args.seed, not args.uncompressed)
+        print(f"Wrote {len(bundle_paths)} bundles under {args.root}")
+        return 0
+    spec_files = generate_corpus(args.root, args.vehicles, args.files_per_vehicle, args.groups,
+                                 args.noise_files, args.seed)
+    print(f"Wrote {len(spec_files)} spec files under {args.root}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Lightweight timing spans for the I/O, discovery, batch and UI paths.
+
+Off by default. Set AT_EDITOR_TRACE to turn it on for a whole run; the trace is
+written when the process exits, to the path in the variable (or
+DEFAULT_TRACE_PATH if it is just "1"):
+
+    AT_EDITOR_TRACE=trace.json python cli.py <root folder> --multiply 2.0
+
+The GUI's "Trace" checkbox and cli.py --trace toggle it at run time. Traces
+are Chrome trace event JSON, viewable in chrome://tracing or ui.perfetto.dev.
+
+While tracing is off a traced function costs one flag check and span()
+returns a shared no-op context manager, so the hooks can stay in hot paths.
+"""
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+ENV_VAR = "AT_EDITOR_TRACE"
+DEFAULT_TRACE_PATH = "at_editor_trace.json"
+SLOWEST_FILES = 10
+
+enabled = False
+_events = []  # (name, category, start ns, end ns, pid, thread id, filepath or None, args or None)
+
+def enable(on=True):
+    """Turn span recording on or off. Spans already recorded are kept."""
+    global enabled
+    enabled = on
+
+def record(name, category, start_ns, end_ns, filepath=None, args=None):
+    _events.append((name, category, start_ns, end_ns, os.getpid(), threading.get_ident(), filepath, args))
+
+def traced(name, category, with_file=False):
+    """Decorator recording a span for each call while tracing is on.
+
+    Args:
+        name (str): Span name.
+        category (str): Chrome trace category ("io", "discovery", "batch", "ui").
+        with_file (bool): The first positional argument is a file path to attach to the span.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, category, start, time.perf_counter_ns(), args[0] if with_file and args else None)
+        return wrapper
+    return decorate
+
+class _Span:
+    __slots__ = ("name", "category", "filepath", "args", "start")
+
+    def __init__(self, name, category, filepath, args):
+        self.name = name
+        self.category = category
+        self.filepath = filepath
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.category, self.start, time.perf_counter_ns(), self.filepath, self.args)
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+def span(name, category, filepath=None, **args):
+    """Context manager timing a block while tracing is on, e.g. `with span("batch.chunk", "batch", files=32):`."""
+    return _Span(name, category, filepath, args or None) if enabled else NULL_SPAN
+
+def events(since_ns=None):
+    """Copy of the spans recorded so far, or of those started at or after since_ns (a perf_counter_ns value)."""
+    if since_ns is None:
+        return list(_events)
+    return [event for event in _events if event[2] >= since_ns]
+
+def take_events():
+    """Spans recorded so far, removing them (used to ship spans out of worker processes)."""
+    global _events
+    taken, _events = _events, []
+    return taken
+
+def add_events(new_events):
+    """Merge spans recorded elsewhere, e.g. returned by a worker process."""
+    _events.extend(new_events)
+
+def clear():
+    del _events[:]
+
+def chrome_trace(trace_events):
+    """Chrome trace event document ("X" complete events, microsecond timestamps)."""
+    converted = []
+    for name, category, start_ns, end_ns, pid, tid, filepath, args in trace_events:
+        event = {"name": name, "cat": category, "ph": "X", "ts": start_ns / 1000,
+                 "dur": (end_ns - start_ns) / 1000, "pid": pid, "tid": tid}
+        if filepath is not None or args:
+            event["args"] = dict(args or {})
+            if filepath is not None:
+                event["args"]["file"] = filepath
+        converted.append(event)
+    return {"traceEvents": converted, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path, trace_events=None):
+    """Write spans (by default all recorded ones) as a Chrome trace JSON file.
+
+    Returns:
+        bool: True on success.
+    """
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chrome_trace(_events if trace_events is None else trace_events), f)
+        return True
+    except OSError as e:
+        print(f"Error writing trace {path}: {e}")
+        return False
+
+def slowest_files(trace_events, limit=SLOWEST_FILES):
+    """Files whose spans took the longest in total.
+
+    Nested spans of the same file (read_sensor_block inside read_sensor_data) are
+    listed per name but counted once in the total.
+
+    Returns:
+        list: (filepath, total ms, {span name: ms}) tuples, slowest first.
+    """
+    per_file = {}
+    intervals = {}
+    for name, _, start_ns, end_ns, _, _, filepath, _ in trace_events:
+        if filepath is None:
+            continue
+        spans = per_file.setdefault(filepath, {})
+        spans[name] = spans.get(name, 0) + (end_ns - start_ns) / 1e6
+        intervals.setdefault(filepath, []).append((start_ns, end_ns))
+    totals = []
+    for filepath, file_intervals in intervals.items():
+        total_ns = 0
+        covered_until = None
+        for start_ns, end_ns in sorted(file_intervals):
+            if covered_until is not None and start_ns < covered_until:
+                start_ns = covered_until
+            if end_ns > start_ns:
+                total_ns += end_ns - start_ns
+                covered_until = end_ns
+        totals.append((total_ns / 1e6, filepath))
+    totals.sort(reverse=True)
+    return [(filepath, total, per_file[filepath]) for total, filepath in totals[:limit]]
+
+def format_slowest_files(rows):
+    lines = []
+    for filepath, total, spans in rows:
+        detail = ", ".join(f"{name} {ms:.2f}" for name, ms in sorted(spans.items()))
+        lines.append(f"{total:8.2f} ms  {filepath}  ({detail})")
+    return "\n".join(lines)
+
+def _export_at_exit(path):
+    if _events:
+        export_chrome_trace(path)
+
+if os.environ.get(ENV_VAR):
+    enable()
+    # Worker processes inherit the variable; only the main process writes the file
+    if multiprocessing.parent_process() is None:
+        value = os.environ[ENV_VAR]
+        atexit.register(_export_at_exit, DEFAULT_TRACE_PATH if value == "1" else value)
@@ -0,0 +1,273 @@
+"""Compiled sensor transform scripts.
+
+A script holds one statement per line (or separated by ';'); '#' starts a comment:
+
+    maDirectionParams[2] *= 1.5
+    Front *: mfRadius = clamp(mfRadius * 1.2, 0.05, 2.0)
+    vehicle PUS, Door *: mu8AbsorbtionLevel += 1
+
+A statement is an optional selector list ending in ':' followed by an
+assignment to a field, or one item of a field, with =, +=, -=, *= or /=.
+Selectors are sensor position globs matched against SENSOR_POSITIONS
+(case-insensitive), sensor indices, or "vehicle <prefix>" matched against the
+vehicle ID of the file's VEH_ folder. Positions are OR'ed with each other,
+vehicles too, and the two kinds are AND'ed. Expressions may use numbers, field
+values, + - * / ** and clamp(x, lo, hi), min(a, b, ...), max(a, b, ...), abs(x) and
+round(x). Operand shapes and argument counts are checked when a script is compiled.
+
+Scripts are parsed and compiled once; each statement then runs as a single
+vectorized NumPy operation over a whole chunk of files. Needs NumPy.
+"""
+import ast
+import fnmatch
+import re
+
+from sensor_io import NUM_SENSORS, SENSOR_FIELDS, SENSOR_POSITIONS
+from vehicles import vehicle_id_from_path
+import sensor_np
+
+np = sensor_np.np
+
+SELECTORS_RE = re.compile(r"^([^:=\[\]]*):(?!=)(.*)$")  # Leading "<selectors>:", before any '=' or '['
+ASSIGNMENT_RE = re.compile(r"^\s*(\w+)\s*(?:\[([^\]]*)\])?\s*([-+*/]?=)\s*(.+)$")
+
+AUGMENTED_OPS = {"+=": ast.Add, "-=": ast.Sub, "*=": ast.Mult, "/=": ast.Div}
+
+FUNCTIONS = {
+    "clamp": lambda x, lo, hi: np.clip(x, lo, hi),
+    "min": lambda *args: np.minimum.reduce(np.broadcast_arrays(*args)),
+    "max": lambda *args: np.maximum.reduce(np.broadcast_arrays(*args)),
+    "abs": lambda x: np.abs(x),
+    "round": lambda x: np.round(x),
+}
+ARITY = {"clamp": (3, 3), "min": (2, None), "max": (2, None), "abs": (1, 1), "round": (1, 1)}  # (min, max) arguments
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Subscript, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+)
+
+class _ItemSubscripts(ast.NodeTransformer):
+    """Rewrite field[i] to field[..., i] so items index the last axis of the stacked arrays."""
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        index = ast.Tuple(elts=[ast.Constant(Ellipsis), node.slice], ctx=ast.Load())
+        return ast.copy_location(ast.Subscript(value=node.value, slice=index, ctx=ast.Load()), node)
+
+def _check_expression(tree):
+    """Reject anything but arithmetic over fields, numbers and FUNCTIONS.
+
+    Returns:
+        set: Field names the expression reads.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"unsupported syntax: {ast.unparse(node) if isinstance(node, ast.expr) else type(node).__name__}")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError(f"unsupported constant: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"unknown function: {ast.unparse(node.func)}")
+            _check_arity(node.func.id, len(node.args))
+        if isinstance(node, ast.Subscript):
+            if not isinstance(node.value, ast.Name) or node.value.id not in SENSOR_FIELDS:
+                raise ValueError(f"only fields can be indexed: {ast.unparse(node)}")
+            _check_item(node.value.id, node.slice.value if isinstance(node.slice, ast.Constant) else None)
+        if isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+            if node.id not in SENSOR_FIELDS:
+                raise ValueError(f"unknown name: {node.id}")
+            names.add(node.id)
+    return names
+
+def _check_arity(function, count):
+    least, most = ARITY[function]
+    if count < least or (most is not None and count > most):
+        expected = str(least) if least == most else f"at least {least}"
+        raise ValueError(f"{function}() takes {expected} argument{'s' if expected != '1' else ''}, got {count}")
+
+def _width(node):
+    """Values per sensor an expression (already checked) yields: 1, or a list field's length.
+
+    Raises:
+        ValueError: If it combines lists of different lengths.
+    """
+    if isinstance(node, ast.Expression):
+        return _width(node.body)
+    if isinstance(node, ast.Name):
+        return SENSOR_FIELDS[node.id][2]
+    if isinstance(node, (ast.Constant, ast.Subscript)):
+        return 1
+    if isinstance(node, ast.UnaryOp):
+        return _width(node.operand)
+    widths = {_width(operand) for operand in ([node.left, node.right] if isinstance(node, ast.BinOp) else node.args)}
+    if len(widths - {1}) > 1:
+        raise ValueError(f"lists of different lengths in {ast.unparse(node)}")
+    return max(widths)
+
+def _check_item(field, item):
+    count = SENSOR_FIELDS[field][2]
+    if count == 1:
+        raise ValueError(f"{field} is not a list")
+    if not isinstance(item, int) or isinstance(item, bool) or not 0 <= item < count:
+        raise ValueError(f"{field} index must be an integer from 0 to {count - 1}")
+
+def _parse_selectors(text):
+    """Parse a selector list into (position mask or None, vehicle prefixes or None)."""
+    positions = None
+    vehicles = None
+    for selector in text.split(","):
+        selector = selector.strip()
+        if not selector:
+            continue
+        if selector.lower().startswith("vehicle "):
+            prefix = selector[len("vehicle "):].strip().rstrip("*").upper()
+            if not prefix:
+                raise ValueError("empty vehicle prefix")
+            vehicles = (vehicles or ()) + (prefix,)
+            continue
+        if positions is None:
+            positions = np.zeros(NUM_SENSORS, dtype=bool)
+        if selector.isdigit():
+            if int(selector) >= NUM_SENSORS:
+                raise ValueError(f"sensor index must be below {NUM_SENSORS}: {selector}")
+            positions[int(selector)] = True
+            continue
+        matched = [fnmatch.fnmatch(position.lower(), selector.lower()) for position in SENSOR_POSITIONS]
+        if not any(matched):
+            raise ValueError(f"selector matches no sensor position: {selector}")
+        positions |= matched
+    return positions, vehicles
+
+class Statement:
+    """One compiled assignment of a transform script."""
+
+    def __init__(self, text):
+        self.text = " ".join(text.split())
+        match = SELECTORS_RE.match(text)
+        selectors, assignment = match.groups() if match else ("", text)
+        match = ASSIGNMENT_RE.match(assignment)
+        if match is None:
+            raise ValueError("expected '<field> = <expression>'")
+        field, item, op, expression = match.groups()
+        if field not in SENSOR_FIELDS:
+            raise ValueError(f"unknown field: {field}")
+        self.field = field
+        self.item = None
+        if item is not None:
+            item = item.strip()
+            self.item = int(item) if item.isdigit() else item
+            _check_item(field, self.item)
+        self.positions, self.vehicles = _parse_selectors(selectors)
+
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"invalid expression: {e.msg}")
+        self.names = _check_expression(tree)
+        width = _width(tree)
+        target_width = 1 if self.item is not None else SENSOR_FIELDS[field][2]
+        if width != 1 and width != target_width:
+            target = field if self.item is None else f"{field}[{self.item}]"
+            raise ValueError(f"cannot assign {width} values per sensor to {target}"
+                             + (f" ({target_width} values)" if target_width > 1 else ""))
+        if op != "=":
+            # x op= e  ->  x op (e)
+            target = ast.Name(id=field, ctx=ast.Load())
+            if self.item is not None:
+                target = ast.Subscript(value=target, slice=ast.Constant(self.item), ctx=ast.Load())
+            tree.body = ast.BinOp(left=target, op=AUGMENTED_OPS[op](), right=tree.body)
+            self.names.add(field)
+        tree = ast.fix_missing_locations(_ItemSubscripts().visit(tree))
+        self.code = compile(tree, "<transform>", "eval")
+
+    def run(self, arr, vehicle_ids):
+        """Apply the statement in place to a (n_files, NUM_SENSORS) structured array.
+
+        Values that cannot be stored (non-finite floats, non-integral or out of range
+        bytes) are left unchanged.
+
+        Returns:
+            numpy.ndarray: One bool per file, True where some value could not be stored.
+        """
+        namespace = {name: arr[name].astype(np.float64) for name in self.names}
+        namespace.update(FUNCTIONS)
+        target = arr[self.field] if self.item is None else arr[self.field][..., self.item]
+        old = target.astype(np.float64)
+        with np.errstate(all="ignore"):
+            new = np.broadcast_to(eval(self.code, {"__builtins__": {}}, namespace), old.shape)
+
+            mask = np.ones(arr.shape, dtype=bool)
+            if self.positions is not None:
+                mask &= self.positions
+            if self.vehicles is not None:
+                mask &= np.array([vehicle_id is not None and vehicle_id.upper().startswith(self.vehicles)
+                                  for vehicle_id in vehicle_ids], dtype=bool)[:, None]
+            if old.ndim > mask.ndim:
+                mask = mask[..., None]
+            new = np.where(mask, new, old)
+
+            if target.dtype.kind == "f":
+                bad = ~np.isfinite(new.astype(target.dtype)) & np.isfinite(old)
+            else:
+                bad = (new != np.round(new)) | (new < 0) | (new > np.iinfo(target.dtype).max)
+            target[...] = np.where(bad, old, new).astype(target.dtype)
+        return bad.reshape(len(arr), -1).any(axis=1)
+
+def compile_script(source):
+    """Parse and compile a transform script.
+
+    Raises:
+        ValueError: With the offending line number if the script is invalid.
+    """
+    if not sensor_np.NUMPY_AVAILABLE:
+        raise ValueError("Transform scripts need numpy")
+    statements = []
+    for line_number, line in enumerate(source.splitlines(), 1):
+        for text in line.split("#", 1)[0].split(";"):
+            if not text.strip():
+                continue
+            try:
+                statements.append(Statement(text))
+            except ValueError as e:
+                raise ValueError(f"Line {line_number}: {e}")
+    if not statements:
+        raise ValueError("Empty transform script")
+    return statements
+
+class SensorTransform:
+    """Batch transform running a compiled script (see MultiplyDirectionParams for the protocol).
+
+    Only the source is pickled; worker processes compile it again on unpickling.
+    The key ignores comments and layout, so reformatting a script does not make
+    the manifest treat it as a new edit.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.statements = compile_script(source)
+        self.key = "; ".join(statement.text for statement in self.statements)
+
+    def __getstate__(self):
+        return {"source": self.source}
+
+    def __setstate__(self, state):
+        self.__init__(state["source"])
+
+    def apply_array(self, arr, vehicle_ids):
+        """Run every statement in place on a stacked (n_files, NUM_SENSORS) array.
+
+        Returns:
+            numpy.ndarray: One bool per file, True where some value could not be stored.
+        """
+        invalid = np.zeros(len(arr), dtype=bool)
+        for statement in self.statements:
+            invalid |= statement.run(arr, vehicle_ids)
+        return invalid
+
+    def __call__(self, blocks, filepaths=None):
+        arr = sensor_np.stack_sensor_blocks(blocks)
+        vehicle_ids = [vehicle_id_from_path(filepath) for filepath in filepaths] if filepaths else [None] * len(blocks)
+        invalid = self.apply_array(arr, vehicle_ids)
+        return [None if invalid[row] else sensor_np.encode_sensor_array(arr[row]) for row in range(len(blocks))]
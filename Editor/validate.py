@@ -0,0 +1,228 @@
+"""Sanity checks of sensor data, vectorized over many files at once.
+
+Rules, each checked per sensor:
+
+    link_range   every maNextSensor / mau8NextBoundarySensor entry is a sensor
+                 index (below NUM_SENSORS) or NO_SENSOR (0xFF)
+    non_finite   maDirectionParams and mfRadius are finite (no inf or NaN)
+    scene_order  mu8SceneIndex is greater than the previous sensor's
+
+Each file's layout is detected first (see spec_schema), and a rule only
+checks the fields that layout has: legacy files only have maDirectionParams,
+so only non_finite applies to them. A layout without a signature of its own
+(legacy) is only picked because no other layout matched, which is also what a
+current-layout file corrupt in both its links and its scene order looks like,
+so such files are listed as "fallback_layout" issues and fail the check. Files
+of no known layout are reported on their own instead of being checked.
+
+Files are stacked into one (n_files, NUM_SENSORS) array and every rule is a
+single NumPy expression over it. The batch engine runs the same rules on its
+output before writing, and rejects files an edit would break. Standalone:
+
+    python validate.py <root folder> [--json report.json] [--bundles]
+
+With --bundles, the spec resources inside the VEH_*.BIN bundles under the
+folder are checked directly (see bundle.py), without extracting them.
+
+Needs NumPy; check sensor_np.NUMPY_AVAILABLE before calling into it.
+"""
+import argparse
+import json
+import sys
+
+from sensor_io import NUM_SENSORS, SENSOR_BLOCK_SIZE, find_spec_files
+from bundle import find_bundles, stack_bundle_files
+from spec_schema import CURRENT_SCHEMA, NO_SENSOR, LINK_FIELDS, detect_schema
+import sensor_np
+
+np = sensor_np.np
+
+RULE_LINK_RANGE = "link_range"
+RULE_NON_FINITE = "non_finite"
+RULE_SCENE_ORDER = "scene_order"
+RULES = {
+    RULE_LINK_RANGE: "sensor link is neither a sensor index nor 0xFF",
+    RULE_NON_FINITE: "maDirectionParams or mfRadius is inf or NaN",
+    RULE_SCENE_ORDER: "mu8SceneIndex does not increase from the previous sensor",
+}
+FLOAT_FIELDS = ("maDirectionParams", "mfRadius")
+RULE_FIELDS = {  # Fields each rule reads; a file is checked on those its layout has
+    RULE_LINK_RANGE: LINK_FIELDS,
+    RULE_NON_FINITE: FLOAT_FIELDS,
+    RULE_SCENE_ORDER: ("mu8SceneIndex",),
+}
+READ_CHUNK_SIZE = 4096  # Files stacked at once by validate_files, bounding memory on huge trees
+
+def detect_schemas(arr):
+    """Layout of each row of a stacked array, as spec_schema.detect_schema (None if unknown)."""
+    data = arr.tobytes()
+    return [detect_schema(data[start:start + SENSOR_BLOCK_SIZE])
+            for start in range(0, len(data), SENSOR_BLOCK_SIZE)]
+
+def _field_masks(arr):
+    """Field -> (n_files, NUM_SENSORS) bool array, True where the field's values break its rule."""
+    masks = {}
+    for field in LINK_FIELDS:
+        values = arr[field]
+        masks[field] = ((values >= NUM_SENSORS) & (values != NO_SENSOR)).any(axis=-1)
+    for field in FLOAT_FIELDS:
+        finite = np.isfinite(arr[field])
+        masks[field] = ~(finite.all(axis=-1) if finite.ndim > arr.ndim else finite)
+    scene = arr["mu8SceneIndex"]
+    masks["mu8SceneIndex"] = np.zeros(arr.shape, dtype=bool)
+    masks["mu8SceneIndex"][..., 1:] = scene[..., 1:] <= scene[..., :-1]
+    return masks
+
+def check_array(arr, schemas=None):
+    """Run every rule over a stacked (n_files, NUM_SENSORS) structured array.
+
+    Args:
+        schemas (list): Layout of each row (see detect_schemas); rows are only checked
+            on the fields their layout has, and rows of unknown layout (None) not at all.
+            Defaults to the current layout for every row.
+
+    Returns:
+        dict: Rule -> (n_files, NUM_SENSORS) bool array, True where the sensor breaks the rule.
+    """
+    masks = _field_masks(arr)
+    if schemas is not None:
+        for field, mask in masks.items():
+            # The stacked array is read with the current layout's offsets, so only fields
+            # at the same place in a row's layout are checked
+            offset = CURRENT_SCHEMA.fields[field][0]
+            mask &= np.array([schema is not None and field in schema.fields and schema.fields[field][0] == offset
+                              for schema in schemas], dtype=bool).reshape((-1,) + (1,) * (mask.ndim - 1))
+    results = {}
+    for rule, fields in RULE_FIELDS.items():
+        results[rule] = np.zeros(arr.shape, dtype=bool)
+        for field in fields:
+            results[rule] |= masks[field]
+    return results
+
+def introduced_issues(old_arr, new_arr, schemas=None):
+    """Rules each file breaks after an edit that it did not break before.
+
+    Files that were already broken can still be edited, as long as the edit breaks
+    nothing new.
+
+    Args:
+        schemas (list): Layout of each file (see check_array).
+
+    Returns:
+        list: One list of rule names per file (empty when the edit is clean).
+    """
+    old_masks = check_array(old_arr, schemas)
+    new_masks = check_array(new_arr, schemas)
+    introduced = [[] for _ in range(len(new_arr))]
+    for rule, new_mask in new_masks.items():
+        for row in np.flatnonzero((new_mask & ~old_masks[rule]).any(axis=1)):
+            introduced[row].append(rule)
+    return introduced
+
+def find_issues(arr, filepaths, schemas=None):
+    """Every (file, sensor) breaking a rule.
+
+    Args:
+        schemas (list): Layout of each file (see check_array).
+
+    Returns:
+        list: {"filepath", "rule", "sensor"} dicts, grouped by rule.
+    """
+    issues = []
+    for rule, mask in check_array(arr, schemas).items():
+        for row, sensor in zip(*np.nonzero(mask)):
+            issues.append({"filepath": filepaths[row], "rule": rule, "sensor": int(sensor)})
+    return issues
+
+def stack_files(filepaths):
+    """sensor_np.stack_sensor_files, plus the paths that could not be read."""
+    arr, loaded = sensor_np.stack_sensor_files(filepaths)
+    unreadable = []
+    if len(loaded) < len(filepaths):
+        loaded_set = set(loaded)
+        unreadable = [filepath for filepath in filepaths if filepath not in loaded_set]
+    return arr, loaded, unreadable
+
+def validate_files(filepaths, chunk_size=READ_CHUNK_SIZE, stack=stack_files):
+    """Check many files.
+
+    Args:
+        stack (callable): stack(paths) -> (array, names of its rows, unreadable paths);
+            bundle.stack_bundle_files checks the spec resources of bundles instead.
+
+    Returns:
+        dict: "files" checked (and unreadable), "unreadable" paths, "unknown_layout"
+        paths (not checked), "fallback_layout" paths (read with a layout that has no
+        signature, see spec_schema), "layouts" (layout name -> file count), "issues"
+        (see find_issues) and "files_with_issues" per rule.
+    """
+    issues = []
+    unreadable = []
+    unknown_layout = []
+    fallback_layout = []
+    layouts = {}
+    checked = 0
+    for start in range(0, len(filepaths), chunk_size):
+        arr, loaded, chunk_unreadable = stack(filepaths[start:start + chunk_size])
+        checked += len(loaded)
+        unreadable += chunk_unreadable
+        schemas = detect_schemas(arr)
+        for name, schema in zip(loaded, schemas):
+            if schema is None:
+                unknown_layout.append(name)
+            else:
+                layouts[schema.name] = layouts.get(schema.name, 0) + 1
+                if schema.fallback:
+                    fallback_layout.append(name)
+        issues += find_issues(arr, loaded, schemas)
+    files_with_issues = {rule: len({issue["filepath"] for issue in issues if issue["rule"] == rule})
+                         for rule in RULES}
+    return {"files": checked + len(unreadable), "unreadable": unreadable, "unknown_layout": unknown_layout,
+            "fallback_layout": fallback_layout, "layouts": layouts, "issues": issues, "files_with_issues": files_with_issues}
+
+def format_report(report, limit=200):
+    """Text report: counts per rule, then up to limit issues."""
+    lines = [f"Checked {report['files']} files, {len(report['unreadable'])} unreadable, "
+             f"{len(report['unknown_layout'])} of unknown sensor layout (not checked), "
+             f"{len(report['fallback_layout'])} matching no layout signature."]
+    for layout, count in report["layouts"].items():
+        lines.append(f"  {layout} layout: {count} files")
+    for rule, description in RULES.items():
+        lines.append(f"  {rule:<12} {report['files_with_issues'][rule]:6d} files  ({description})")
+    for filepath in report["unreadable"][:limit]:
+        lines.append(f"UNREADABLE  {filepath}")
+    for filepath in report["unknown_layout"][:limit]:
+        lines.append(f"UNKNOWN LAYOUT  {filepath}")
+    for filepath in report["fallback_layout"][:limit]:
+        lines.append(f"NO SIGNATURE  {filepath}  (neither links nor scene order fit the current layout; read as legacy)")
+    for issue in report["issues"][:limit]:
+        lines.append(f"{issue['rule'].upper():<12}{issue['filepath']}  (sensor {issue['sensor']})")
+    hidden = len(report["issues"]) - limit
+    if hidden > 0:
+        lines.append(f"... and {hidden} more")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check every StreamedDeformationSpec file under a folder.")
+    parser.add_argument("root", help="Root folder of the extracted bundles")
+    parser.add_argument("--json", metavar="PATH", help="Also save the full report as JSON")
+    parser.add_argument("--limit", type=int, default=200, help="Issues listed in the text report (default: 200)")
+    parser.add_argument("--bundles", action="store_true",
+                        help="Check the VEH_*.BIN bundles under root instead of extracted files")
+    args = parser.parse_args(argv)
+    if not sensor_np.NUMPY_AVAILABLE:
+        print("Validation needs numpy")
+        return 2
+    if args.bundles:
+        report = validate_files(find_bundles(args.root), stack=stack_bundle_files)
+    else:
+        report = validate_files(find_spec_files(args.root))
+    print(format_report(report, args.limit))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    failed = report["issues"] or report["unreadable"] or report["unknown_layout"] or report["fallback_layout"]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
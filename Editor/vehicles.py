@@ -0,0 +1,207 @@
+"""Vehicle identification for extracted spec files.
+
+Resolves a spec file path to its vehicle ID and display name from
+data.car_name, searches vehicles by ID prefix or by (fuzzy) display name, and
+classifies them by family, finish and kind for filtered batch runs.
+
+The classification follows the naming of data.car_name: traffic IDs start
+with T (player cars with P, X or C), and a car's finishes share one display
+name followed by "Finish 1/2/3", "Gold" or "Platinum".
+"""
+import fnmatch
+import re
+
+from data import car_name
+from manifest import RESOURCE_SEPARATOR
+
+VEHICLE_DIR_RE = re.compile(r"VEH_([^_\\/]+)", re.IGNORECASE)
+FUZZY_CUTOFF = 0.75
+BUNDLE_SUFFIX = ".BIN"
+
+FINISH_RE = re.compile(r"\s+(?:Finish\s+([123])|(?:Finish\s+)?(Gold|Platin(?:um|ium)))$", re.IGNORECASE)
+TRAFFIC_NUMBER_RE = re.compile(r"_\d+$")
+
+KIND_PLAYER = "Player"
+KIND_TRAFFIC = "Traffic"
+KINDS = [KIND_PLAYER, KIND_TRAFFIC]
+FINISH_OTHER = "Other"
+FINISHES = ["Finish 1", "Finish 2", "Finish 3", "Gold", "Platinum", FINISH_OTHER]
+
+def vehicle_kind(vehicle_id):
+    return KIND_TRAFFIC if vehicle_id.startswith("T") else KIND_PLAYER
+
+def split_finish(name):
+    """Split a display name into (family, finish), e.g. "Carson ANNIHILATOR Gold" -> ("Carson ANNIHILATOR", "Gold").
+
+    Names without a finish suffix are their own family with finish FINISH_OTHER;
+    numbered traffic names ("T_US_SUV_01") drop the number instead.
+    """
+    match = FINISH_RE.search(name)
+    if match is None:
+        return TRAFFIC_NUMBER_RE.sub("", name), FINISH_OTHER
+    number, metal = match.groups()
+    finish = f"Finish {number}" if number else ("Gold" if metal.lower() == "gold" else "Platinum")
+    return name[:match.start()], finish
+
+def parent_directory(filepath):
+    """Directory part of a path with either '/' or '\\' separators."""
+    return filepath[:max(filepath.rfind("/"), filepath.rfind("\\"), 0)]
+
+def bundle_path(filepath):
+    """Bundle file of a path that is a bundle or a resource inside one ("<bundle>#<id>"), else None."""
+    path, separator, _ = filepath.rpartition(RESOURCE_SEPARATOR)
+    path = path if separator else filepath
+    return path if path.upper().endswith(BUNDLE_SUFFIX) else None
+
+class VehicleIndex:
+    def __init__(self, names=None):
+        """Lookup tables over a vehicle ID -> display name mapping.
+
+        Args:
+            names (dict): Vehicle ID -> display name; defaults to data.car_name.
+        """
+        self.names = car_name if names is None else names
+        self.upper_names = {vehicle_id: name.upper() for vehicle_id, name in self.names.items()}
+        self.words = {}  # Upper-case name word -> vehicle IDs whose name contains it
+        for vehicle_id, name in self.upper_names.items():
+            for word in re.split(r"[\s_]+", name):
+                self.words.setdefault(word, []).append(vehicle_id)
+        self.directories = {}  # Directory -> resolved vehicle ID (or None)
+        self.classes = {}  # Vehicle ID -> (family, finish, kind)
+        for vehicle_id, name in self.names.items():
+            family, finish = split_finish(name)
+            if family.upper() == "UNKNOWN":
+                family = vehicle_id
+            self.classes[vehicle_id] = (family, finish, vehicle_kind(vehicle_id))
+
+    def resolve_directory(self, directory):
+        """Vehicle ID for a directory path from its innermost VEH_<ID>... component, or None."""
+        vehicle_id = None
+        for match in reversed(VEHICLE_DIR_RE.findall(directory)):
+            candidate = match.upper()
+            stripped = candidate[:-3] if candidate.endswith("BIN") else candidate
+            if candidate in self.names:
+                return candidate
+            if stripped in self.names:
+                return stripped
+            if vehicle_id is None:
+                vehicle_id = stripped  # Unknown ID; keep the innermost one
+        return vehicle_id
+
+    def vehicle_id(self, filepath):
+        """Vehicle ID of a spec file, cached per directory.
+
+        Bundles and the resources inside them (see bundle.py) are resolved from the
+        bundle file itself, which stands where its extracted VEH_ folder would be.
+        """
+        directory = bundle_path(filepath) or parent_directory(filepath)
+        try:
+            return self.directories[directory]
+        except KeyError:
+            vehicle_id = self.directories[directory] = self.resolve_directory(directory)
+            return vehicle_id
+
+    def resolve(self, filepath):
+        """Vehicle ID and display name of a spec file.
+
+        Returns:
+            tuple: (vehicle ID or None, display name or None)
+        """
+        vehicle_id = self.vehicle_id(filepath)
+        return vehicle_id, self.names.get(vehicle_id)
+
+    def classify(self, vehicle_id):
+        """Family, finish and kind of a vehicle; unknown IDs are their own family.
+
+        Returns:
+            tuple: (family, finish, kind)
+        """
+        try:
+            return self.classes[vehicle_id]
+        except KeyError:
+            return vehicle_id, FINISH_OTHER, vehicle_kind(vehicle_id)
+
+    def search(self, query, limit=None):
+        """Find vehicles by ID prefix, display name substring, or close spelling of the name's words.
+
+        Results are ordered by match quality: ID prefix, then name substring, then fuzzy matches.
+
+        Returns:
+            list: (vehicle ID, display name) tuples.
+        """
+        query = " ".join(query.upper().split())
+        if not query:
+            return []
+        found = [vehicle_id for vehicle_id in self.names if vehicle_id.startswith(query)]
+        found += [vehicle_id for vehicle_id, name in self.upper_names.items() if query in name]
+        # Fuzzy: every query word must closely match some word of the name
+        import difflib  # Only searches need it
+        fuzzy = None
+        for query_word in query.split():
+            matches = set()
+            for word in difflib.get_close_matches(query_word, self.words, n=10, cutoff=FUZZY_CUTOFF):
+                matches.update(self.words[word])
+            fuzzy = matches if fuzzy is None else fuzzy & matches
+        found += [vehicle_id for vehicle_id in self.names if vehicle_id in fuzzy]
+        results = list(dict.fromkeys(found))
+        return [(vehicle_id, self.names[vehicle_id]) for vehicle_id in results[:limit]]
+
+class VehicleFilter:
+    def __init__(self, families=None, finishes=None, kinds=None, vehicle_ids=None):
+        """Selection of vehicles for a filtered batch run. Each criterion left as None accepts everything.
+
+        Args:
+            families (list): Family names or case-insensitive globs ("*ANNIHILATOR*").
+            finishes (list): Entries of FINISHES.
+            kinds (list): Entries of KINDS.
+            vehicle_ids (list): Exact vehicle IDs, e.g. from VehicleIndex.search.
+        """
+        self.families = [family.upper() for family in families] if families is not None else None
+        self.finishes = set(finishes) if finishes is not None else None
+        self.kinds = set(kinds) if kinds is not None else None
+        self.vehicle_ids = set(vehicle_ids) if vehicle_ids is not None else None
+
+    def matches(self, vehicle_id, index):
+        if vehicle_id is None:
+            return False
+        if self.vehicle_ids is not None and vehicle_id not in self.vehicle_ids:
+            return False
+        family, finish, kind = index.classify(vehicle_id)
+        if self.kinds is not None and kind not in self.kinds:
+            return False
+        if self.finishes is not None and finish not in self.finishes:
+            return False
+        if self.families is not None:
+            family = family.upper()
+            return any(fnmatch.fnmatchcase(family, pattern) for pattern in self.families)
+        return True
+
+    def select(self, filepaths, index=None):
+        """Subset of filepaths whose vehicle passes the filter, in the original order.
+
+        Vehicles are resolved per directory, so each VEH_ folder is classified once.
+        """
+        index = index or default_index()
+        verdicts = {}
+        selected = []
+        for filepath in filepaths:
+            vehicle_id = index.vehicle_id(filepath)
+            verdict = verdicts.get(vehicle_id)
+            if verdict is None:
+                verdict = verdicts[vehicle_id] = self.matches(vehicle_id, index)
+            if verdict:
+                selected.append(filepath)
+        return selected
+
+_default_index = None
+
+def default_index():
+    """Shared VehicleIndex over data.car_name, built on first use."""
+    global _default_index
+    if _default_index is None:
+        _default_index = VehicleIndex()
+    return _default_index
+
+def vehicle_id_from_path(filepath):
+    """Vehicle ID of a spec file from its VEH_<ID>_... folder, or None."""
+    return default_index().vehicle_id(filepath)
@@ -0,0 +1,29 @@
+import os
+import random
+import sys
+
+# The editor's modules import each other by bare name, as when run from Editor/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Editor"))
+
+from spec_schema import CURRENT_SCHEMA
+from synth import make_sensor_block
+
+LINK_OFFSET = CURRENT_SCHEMA.fields["maNextSensor"][0]
+SCENE_OFFSET = CURRENT_SCHEMA.fields["mu8SceneIndex"][0]
+
+def current_block(seed=0, bad_link=None, bad_scene=None):
+    """Synthetic current-layout sensor block, optionally with one sensor's first link or scene index broken."""
+    block = bytearray(make_sensor_block(random.Random(seed)))
+    if bad_link is not None:
+        block[bad_link * CURRENT_SCHEMA.stride + LINK_OFFSET] = 0x42
+    if bad_scene is not None:
+        block[bad_scene * CURRENT_SCHEMA.stride + SCENE_OFFSET] = 0
+    return block
+
+def legacy_block(seed=0):
+    """A current block with every sensor's link and scene bytes scrambled, so it detects as legacy."""
+    block = current_block(seed)
+    for sensor in range(CURRENT_SCHEMA.count):
+        block[sensor * CURRENT_SCHEMA.stride + LINK_OFFSET] = 0x42
+        block[sensor * CURRENT_SCHEMA.stride + SCENE_OFFSET] = 0
+    return block
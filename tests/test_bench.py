@@ -0,0 +1,6 @@
+from bench import percentile
+
+def test_percentile_uses_the_nearest_rank():
+    assert [percentile([1, 2, 3, 4, 5], p) for p in (50, 90, 99)] == [3, 5, 5]
+    assert [percentile(list(range(1, 101)), p) for p in (50, 90, 99)] == [50, 90, 99]
+    assert percentile([7], 99) == 7
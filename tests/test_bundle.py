@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from bundle import Bundle, SPEC_TYPE_ID, read_bundle_sensor_blocks
+from sensor_io import START_OFFSET, SENSOR_BLOCK_SIZE
+from synth import make_bundle, make_spec_file
+
+def write_bundle(path, byte_order=">", compressed=True):
+    spec = make_spec_file(random.Random(0))
+    path.write_bytes(make_bundle([(0x1234, SPEC_TYPE_ID, spec)], compressed, byte_order))
+    return str(path), spec
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_big_endian_sensor_blocks(tmp_path, compressed):
+    filepath, spec = write_bundle(tmp_path / "VEH_A_AT.BIN", compressed=compressed)
+    blocks = Bundle(filepath).sensor_blocks()
+    assert blocks == [(f"{filepath}#00001234", spec[START_OFFSET:START_OFFSET + SENSOR_BLOCK_SIZE])]
+
+def test_little_endian_sensor_data_is_refused(tmp_path):
+    filepath, _ = write_bundle(tmp_path / "VEH_A_AT.BIN", byte_order="<")
+    bundle = Bundle(filepath)
+    assert bundle.byte_order == "<"
+    with pytest.raises(ValueError, match="Little-endian"):
+        bundle.sensor_blocks()
+    blocks, names, unreadable = read_bundle_sensor_blocks([filepath])
+    assert (blocks, names, unreadable) == ([], [], [filepath])
@@ -0,0 +1,27 @@
+from batch import MultiplyDirectionParams
+from fleet import FleetCache
+from repack import process_bundle
+from sensor_io import NUM_SENSORS
+from synth import generate_bundles, generate_corpus
+
+def test_fleet_table_of_bundles(tmp_path):
+    bundle_paths = generate_bundles(str(tmp_path / "game"), vehicles=3, files_per_vehicle=2)
+    cache = FleetCache(str(tmp_path / "game"), cache_path=str(tmp_path / "fleet.pkl"), bundles=True)
+    table = cache.table(bundle_paths)
+    assert len(table) == 3 * 2 * NUM_SENSORS
+    assert set(table["source"].unique()) == set(bundle_paths)
+    assert table["vehicle_id"].notna().all()
+    before = table.loc[table["source"] == bundle_paths[0], "maDirectionParams[0]"].to_numpy()
+
+    process_bundle(bundle_paths[0], MultiplyDirectionParams(2.0))
+    cache = FleetCache(str(tmp_path / "game"), cache_path=str(tmp_path / "fleet.pkl"), bundles=True)
+    table = cache.table(bundle_paths)
+    assert cache.decoded == 1
+    after = table.loc[table["source"] == bundle_paths[0], "maDirectionParams[0]"].to_numpy()
+    assert (after == before * 2).all()
+
+def test_fleet_table_of_extracted_files(tmp_path):
+    filepaths = generate_corpus(str(tmp_path / "tree"), vehicles=2, files_per_vehicle=2, noise_files=0)
+    table = FleetCache(str(tmp_path / "tree"), cache_path=str(tmp_path / "fleet.pkl")).table(filepaths)
+    assert len(table) == 4 * NUM_SENSORS
+    assert (table["source"] == table["filepath"]).all()
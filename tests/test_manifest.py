@@ -0,0 +1,43 @@
+import shutil
+
+from batch import MultiplyDirectionParams, run_batch, STATUS_OK, STATUS_SKIPPED
+from manifest import Manifest
+from synth import generate_corpus
+from transform import SensorTransform
+
+def run(root, filepaths, transform):
+    manifest = Manifest(root)
+    manifest.load()
+    return [result["status"] for result in run_batch(filepaths, transform, manifest=manifest)]
+
+def make_tree(tmp_path):
+    """Four spec files, plus a pristine copy to re-extract from."""
+    root = str(tmp_path / "tree")
+    filepaths = generate_corpus(root, vehicles=2, files_per_vehicle=2, noise_files=0)
+    shutil.copytree(root, str(tmp_path / "original"))
+    return root, filepaths
+
+def restore(tmp_path, root):
+    """Re-extract: put the original files back, keeping the manifest."""
+    shutil.copytree(str(tmp_path / "original"), root, dirs_exist_ok=True)
+
+def test_edit_after_reextracting_is_not_skipped(tmp_path):
+    root, filepaths = make_tree(tmp_path)
+    assert run(root, filepaths, MultiplyDirectionParams(2.0)) == [STATUS_OK] * 4
+    restore(tmp_path, root)
+    assert run(root, filepaths, SensorTransform("mu8AbsorbtionLevel += 1")) == [STATUS_OK] * 4
+    assert run(root, filepaths, MultiplyDirectionParams(2.0)) == [STATUS_OK] * 4
+
+def test_undone_edit_is_not_skipped(tmp_path):
+    root, filepaths = make_tree(tmp_path)
+    assert run(root, filepaths, MultiplyDirectionParams(2.0)) == [STATUS_OK] * 4
+    assert run(root, filepaths, MultiplyDirectionParams(0.5)) == [STATUS_OK] * 4
+    assert run(root, filepaths, MultiplyDirectionParams(2.0)) == [STATUS_OK] * 4
+    assert run(root, filepaths, MultiplyDirectionParams(2.0)) == [STATUS_SKIPPED] * 4
+
+def test_applied_follows_the_chain(tmp_path):
+    manifest = Manifest(str(tmp_path))
+    manifest.history["f.dat"] = [("a", "h0", "h1"), ("b", "h0", "h2"), ("c", "h2", "h3"), ("d", "h3", "h4")]
+    assert manifest.applied(str(tmp_path / "f.dat"), "h3") == ["b", "c"]  # "d" was recorded but never written
+    assert manifest.applied(str(tmp_path / "f.dat"), "h1") == ["a"]
+    assert manifest.applied(str(tmp_path / "f.dat"), "h0") == []
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from batch import MultiplyDirectionParams, STATUS_FAILED, STATUS_OK
+from bundle import Bundle, SPEC_TYPE_ID
+from repack import process_bundle, splice_resources
+from sensor_io import START_OFFSET, decode_sensor_block
+from synth import NOISE_TYPE_ID, make_bundle, make_spec_file
+from transform import SensorTransform
+from vehicles import default_index
+
+def make_resources(seed=0):
+    rng = random.Random(seed)
+    return [(0x100, SPEC_TYPE_ID, make_spec_file(rng)),
+            (0x200, NOISE_TYPE_ID, rng.randbytes(0x300)),
+            (0x300, SPEC_TYPE_ID, make_spec_file(rng))]
+
+def stored_bytes(bundle, data, entry):
+    """Block 0 of a resource as it is on disk (compressed or not)."""
+    start = bundle.data_offsets[0] + entry.disk_offsets[0]
+    return data[start:start + entry.disk_size(0)]
+
+@pytest.mark.parametrize("compressed", [True, False])
+@pytest.mark.parametrize("growth", [0, 0x123, -0x45])
+def test_splice_round_trip(compressed, growth):
+    resources = make_resources()
+    data = make_bundle(resources, compressed)
+    bundle = Bundle("VEH_A_AT.BIN", data)
+    original = resources[0][2]
+    replacement = bytes(b ^ 0xFF for b in original[:len(original) + min(growth, 0)]) + bytes(max(growth, 0))
+
+    spliced = bytes(splice_resources(bundle, data, {0: replacement}))
+    new_bundle = Bundle("VEH_A_AT.BIN", spliced)
+    assert new_bundle.compressed == compressed
+    contents = [resource for _, resource in new_bundle.read_resources(new_bundle.entries)]
+    assert contents == [replacement, resources[1][2], resources[2][2]]
+    for entry, new_entry in zip(bundle.entries[1:], new_bundle.entries[1:]):
+        assert stored_bytes(new_bundle, spliced, new_entry) == stored_bytes(bundle, data, entry)
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_process_bundle_edits_only_spec_resources(tmp_path, compressed):
+    resources = make_resources()
+    path = tmp_path / "VEH_A_AT.BIN"
+    path.write_bytes(make_bundle(resources, compressed))
+    results = process_bundle(str(path), MultiplyDirectionParams(2.0))
+    assert [result["status"] for result in results] == [STATUS_OK, STATUS_OK]
+
+    bundle = Bundle(str(path))
+    contents = [resource for _, resource in bundle.read_resources(bundle.entries)]
+    assert contents[1] == resources[1][2]
+    for index in (0, 2):
+        old = decode_sensor_block(resources[index][2][START_OFFSET:])
+        new = decode_sensor_block(contents[index][START_OFFSET:])
+        for old_sensor, new_sensor in zip(old, new):
+            assert new_sensor.maDirectionParams == pytest.approx([v * 2 for v in old_sensor.maDirectionParams])
+        assert contents[index][START_OFFSET + len(new.tobytes()):] == resources[index][2][START_OFFSET + len(new.tobytes()):]
+
+def test_little_endian_bundle_is_not_written(tmp_path):
+    path = tmp_path / "VEH_A_AT.BIN"
+    data = make_bundle(make_resources(), byte_order="<")
+    path.write_bytes(data)
+    results = process_bundle(str(path), MultiplyDirectionParams(2.0))
+    assert [result["status"] for result in results] == [STATUS_FAILED]
+    assert "Little-endian" in results[0]["error"]
+    assert path.read_bytes() == data
+
+def test_vehicle_selector_matches_bundle_resources(tmp_path):
+    vehicle_id = next(iter(default_index().names))
+    path = tmp_path / f"VEH_{vehicle_id}_AT.BIN"
+    path.write_bytes(make_bundle(make_resources()))
+    assert default_index().vehicle_id(f"{path}#00000100") == vehicle_id
+    results = process_bundle(str(path), SensorTransform(f"vehicle {vehicle_id}: maDirectionParams *= 2"))
+    assert [result["bytes_modified"] > 0 for result in results] == [True, True]
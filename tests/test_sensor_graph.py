@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from batch import screen_blocks, STATUS_FAILED
+from cli import main
+from conftest import current_block, legacy_block
+from sensor_graph import (
+    PropagateScale, SmoothDirectionParams, Topology, UNREACHABLE, _store_direction_params, propagate_scale,
+    topology, wirings
+)
+from sensor_io import NUM_SENSORS
+from spec_schema import LEGACY_SCHEMA, NO_SENSOR, detect_schema
+import sensor_np
+
+@pytest.mark.parametrize("transform", [SmoothDirectionParams(0.5), PropagateScale(2, 1.5)])
+def test_neighbor_edits_fail_legacy_files(transform):
+    blocks = [bytes(current_block(0)), bytes(legacy_block(1))]
+    assert detect_schema(blocks[1]) is LEGACY_SCHEMA
+    results, writable = screen_blocks(["current.dat", "legacy.dat"], blocks, transform)
+    assert [name for name, _, _, _ in writable] == ["current.dat"]
+    assert [(result["filepath"], result["status"]) for result in results] == [("legacy.dat", STATUS_FAILED)]
+    assert "legacy layout" in results[0]["error"]
+
+@pytest.mark.parametrize("sensor", ["2.7", "x"])
+def test_propagate_sensor_must_be_an_integer(tmp_path, sensor):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--propagate", sensor, "1.5"])
+
+def chain_wiring(dangling=False):
+    """Links 0 -> 1 -> 2 -> 3 (maNextSensor) and 3 -> 2 (boundary); every other sensor is isolated."""
+    next_sensors = np.full((NUM_SENSORS, 6), NO_SENSOR, dtype=np.uint8)
+    boundary_sensors = np.full((NUM_SENSORS, 2), NO_SENSOR, dtype=np.uint8)
+    next_sensors[0, 0], next_sensors[1, 0], next_sensors[2, 0] = 1, 2, 3
+    boundary_sensors[3, 1] = 2
+    if dangling:
+        next_sensors[5, 3] = 25
+    return next_sensors, boundary_sensors
+
+def stacked(wiring, count=1):
+    """count stacked files of one wiring, direction params all 1.0 except sensor 0's 2.0."""
+    arr = sensor_np.stack_sensor_blocks([bytes(current_block(seed)) for seed in range(count)])
+    arr["maNextSensor"], arr["mau8NextBoundarySensor"] = wiring
+    arr["maDirectionParams"] = 1.0
+    arr["maDirectionParams"][:, 0] = 2.0
+    return arr
+
+def test_hops_follow_links_both_ways():
+    hops = Topology(*chain_wiring()).hops
+    assert hops[0, :4].tolist() == [0, 1, 2, 3]
+    assert hops[3, :4].tolist() == [3, 2, 1, 0]
+    assert hops[0, 4] == UNREACHABLE
+    assert hops[4, 4] == 0
+
+def test_propagation_scales_fade_with_hops():
+    scales = Topology(*chain_wiring()).propagation_scales(0, 3.0, 0.5)
+    assert scales[:4] == pytest.approx([1 + 2 * 0.5 ** hops for hops in range(4)])
+    assert (scales[4:] == 1.0).all()
+
+def test_smoothing_operator_repeats_steps_and_keeps_isolated_sensors():
+    compiled = Topology(*chain_wiring())
+    step = compiled.smoothing_operator(0.5)
+    assert compiled.smoothing_operator(0.5, 3) == pytest.approx(step @ step @ step)
+    values = np.arange(NUM_SENSORS, dtype=np.float64)
+    smoothed = step @ values
+    assert smoothed[0] == pytest.approx(0.5)  # Halfway to its only neighbor, sensor 1
+    assert smoothed[1] == pytest.approx(0.5 * 1 + 0.5 * (0 + 2) / 2)
+    assert smoothed[4:] == pytest.approx(values[4:])
+
+def test_dangling_and_asymmetric_links():
+    compiled = Topology(*chain_wiring(dangling=True))
+    assert compiled.dangling == [(5, "maNextSensor", 3, 25)]
+    assert compiled.asymmetric == [(0, 1), (1, 2)]  # 2 -> 3 is answered by 3 -> 2
+    assert compiled.neighbors[5] == []
+
+def test_store_direction_params_reports_float32_overflow():
+    arr = stacked(chain_wiring(), count=2)
+    values = arr["maDirectionParams"].astype(np.float64)
+    values[1, 0, 0] = 1e39
+    assert _store_direction_params(arr, values).tolist() == [False, True]
+    assert np.isinf(arr["maDirectionParams"][1, 0, 0])
+
+def test_wirings_group_files_with_identical_link_bytes():
+    arr = np.concatenate([stacked(chain_wiring(), 2), stacked(chain_wiring(dangling=True), 1),
+                          stacked(chain_wiring(), 1)])
+    compiled, inverse = wirings(arr)
+    assert len(compiled) == 2
+    assert inverse[0] == inverse[1] == inverse[3] != inverse[2]
+    assert compiled[inverse[0]] is topology(*chain_wiring())
+
+def test_propagate_scale_over_stacked_files():
+    arr = stacked(chain_wiring(), count=2)
+    assert not propagate_scale(arr, 1, 2.0, 0.5).any()
+    assert arr["maDirectionParams"][0, :5, 0] == pytest.approx([2.0 * 1.5, 2.0, 1.5, 1.25, 1.0])
@@ -0,0 +1,84 @@
+import os
+import random
+import struct
+
+import pytest
+
+from sensor_io import NUM_SENSORS, SENSOR_BLOCK_SIZE, START_OFFSET
+from spec_file import SpecFile
+from synth import make_spec_file
+
+DATA_START = START_OFFSET + SENSOR_BLOCK_SIZE
+POINTER = DATA_START + 0x40
+
+def write_spec_file(tmp_path, seed=0):
+    """A synthetic spec file whose first header word points into the data after the sensor table."""
+    data = bytearray(make_spec_file(random.Random(seed)))
+    struct.pack_into(">I", data, 0, POINTER)
+    path = tmp_path / "spec.dat"
+    path.write_bytes(data)
+    return str(path), bytes(data)
+
+def test_sections_are_views_of_the_file(tmp_path):
+    path, data = write_spec_file(tmp_path)
+    spec_file = SpecFile.open(path)
+    assert spec_file.pointers() == [(0, POINTER)]
+    assert [(section.name, section.offset, section.size) for section in spec_file.sections()] == [
+        ("header", 0, START_OFFSET),
+        ("sensors", START_OFFSET, SENSOR_BLOCK_SIZE),
+        (f"data@0x{DATA_START:X}", DATA_START, POINTER - DATA_START),
+        (f"data@0x{POINTER:X}", POINTER, len(data) - POINTER),
+    ]
+    for section in spec_file.sections():
+        assert isinstance(section.view, memoryview)
+        assert section.view.obj is spec_file.buffer.obj
+        assert section.view == data[section.offset:section.offset + section.size]
+    assert spec_file.section("sensors") == data[START_OFFSET:DATA_START]
+    assert spec_file.section("missing") is None
+
+def test_sensor_assignment_edits_the_buffer(tmp_path):
+    path, data = write_spec_file(tmp_path)
+    spec_file = SpecFile.open(path, writable=True)
+    sensor = spec_file.sensor(3)
+    sensor.mfRadius = 2.5
+    sensor.maDirectionParams = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert spec_file.sensors()[3].mfRadius == 2.5
+    assert list(spec_file.sensor(3).maDirectionParams) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert spec_file.sensors()[2].mfRadius == SpecFile(data).sensors()[2].mfRadius
+    with pytest.raises(IndexError):
+        spec_file.sensor(NUM_SENSORS)
+
+def test_save_leaves_the_rest_of_the_file_unchanged(tmp_path):
+    path, data = write_spec_file(tmp_path)
+    spec_file = SpecFile.open(path, writable=True)
+    spec_file.sensor(0).mfRadius = 9.0
+    assert spec_file.save()
+
+    saved = open(path, "rb").read()
+    assert len(saved) == len(data)
+    assert saved[:START_OFFSET] == data[:START_OFFSET]
+    assert saved[DATA_START:] == data[DATA_START:]
+    assert saved[START_OFFSET:DATA_START] != data[START_OFFSET:DATA_START]
+    assert SpecFile.open(path).sensor(0).mfRadius == 9.0
+    assert os.listdir(tmp_path) == ["spec.dat"]
+
+def test_read_only_open_refuses_writes(tmp_path):
+    path, data = write_spec_file(tmp_path)
+    spec_file = SpecFile.open(path)
+    with pytest.raises(TypeError):
+        spec_file.sensor(0).mfRadius = 1.0
+    with pytest.raises(TypeError):
+        spec_file.section("header")[0] = 1
+    assert spec_file.tobytes() == data
+
+def test_failed_save_removes_the_temporary_file(tmp_path, monkeypatch):
+    path, data = write_spec_file(tmp_path)
+    spec_file = SpecFile.open(path, writable=True)
+    spec_file.sensor(0).mfRadius = 9.0
+
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", fail)
+    assert not spec_file.save()
+    assert os.listdir(tmp_path) == ["spec.dat"]
+    assert open(path, "rb").read() == data
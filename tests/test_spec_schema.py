@@ -0,0 +1,11 @@
+from conftest import current_block
+from spec_schema import CURRENT_SCHEMA, LEGACY_SCHEMA, detect_schema
+
+def test_current_file_with_a_bad_link_stays_current():
+    assert detect_schema(bytes(current_block(bad_link=3))) is CURRENT_SCHEMA
+
+def test_current_file_with_a_bad_scene_index_stays_current():
+    assert detect_schema(bytes(current_block(bad_scene=3))) is CURRENT_SCHEMA
+
+def test_block_matching_neither_signature_is_legacy():
+    assert detect_schema(bytes(current_block(bad_link=3, bad_scene=3))) is LEGACY_SCHEMA
@@ -0,0 +1,80 @@
+import fnmatch
+import re
+
+import pytest
+
+from batch import MultiplyDirectionParams
+from conftest import current_block
+from sensor_io import SENSOR_POSITIONS, decode_sensor_block
+from transform import SensorTransform, Statement
+
+@pytest.mark.parametrize("text, error", [
+    ("mfRadius = maDirectionParams", "cannot assign 6 values"),
+    ("maDirectionParams[1] = maNextSensor", "cannot assign 6 values"),
+    ("maDirectionParams[1] += maNextSensor", "cannot assign 6 values"),
+    ("maNextSensor = maNextSensor + mau8NextBoundarySensor", "different lengths"),
+    ("mfRadius = round(mfRadius, 2)", "round() takes 1 argument"),
+    ("mfRadius = clamp(mfRadius)", "clamp() takes 3 arguments"),
+    ("mfRadius = max(mfRadius)", "max() takes at least 2 arguments"),
+    ("maDirectionParams[0:2] = 1", "index must be an integer"),
+    ("Front *: maDirectionParams[0:2] = 1", "index must be an integer"),
+])
+def test_invalid_statements_fail_to_compile(text, error):
+    with pytest.raises(ValueError, match=re.escape(error)):
+        Statement(text)
+
+@pytest.mark.parametrize("text", [
+    "maDirectionParams[2] *= 1.5",
+    "Front *: mfRadius = clamp(mfRadius * 1.2, 0.05, 2.0)",
+    "vehicle PUS, Door *: mu8AbsorbtionLevel += 1",
+    "maDirectionParams = maDirectionParams * mfRadius + maDirectionParams[0]",
+    "maNextSensor = min(maNextSensor, 19)",
+])
+def test_valid_statements_compile(text):
+    Statement(text)
+
+def run(script, blocks, filepaths=None):
+    return SensorTransform(script)(blocks, filepaths)
+
+def test_position_selector_changes_only_matching_sensors():
+    block = bytes(current_block())
+    front = [i for i, position in enumerate(SENSOR_POSITIONS) if fnmatch.fnmatch(position.lower(), "front *")]
+    assert front
+    old = decode_sensor_block(block)
+    new = decode_sensor_block(run("Front *: mfRadius *= 2", [block])[0])
+    for index, (old_sensor, new_sensor) in enumerate(zip(old, new)):
+        expected = old_sensor.mfRadius * 2 if index in front else old_sensor.mfRadius
+        assert new_sensor.mfRadius == pytest.approx(expected)
+
+def test_vehicle_selector_uses_the_file_paths():
+    blocks = [bytes(current_block(0)), bytes(current_block(1))]
+    filepaths = ["root/VEH_PUS01_AT.BIN/StreamedDeformationSpec/0.dat",
+                 "root/VEH_XYZ01_AT.BIN/StreamedDeformationSpec/0.dat"]
+    new_blocks = run("vehicle PUS: mu8AbsorbtionLevel += 1", blocks, filepaths)
+    assert [s.mu8AbsorbtionLevel for s in decode_sensor_block(new_blocks[0])] == \
+        [s.mu8AbsorbtionLevel + 1 for s in decode_sensor_block(blocks[0])]
+    assert new_blocks[1] == blocks[1]
+
+def test_augmented_assignments_and_clamp():
+    block = bytes(current_block())
+    old = decode_sensor_block(block)
+    new = decode_sensor_block(run("maDirectionParams[2] *= 1.5; mu8AbsorbtionLevel += 1; "
+                                  "mfRadius = clamp(mfRadius, 0.2, 0.5)", [block])[0])
+    for old_sensor, new_sensor in zip(old, new):
+        assert new_sensor.maDirectionParams[2] == pytest.approx(old_sensor.maDirectionParams[2] * 1.5)
+        assert new_sensor.maDirectionParams[:2] == old_sensor.maDirectionParams[:2]
+        assert new_sensor.mu8AbsorbtionLevel == old_sensor.mu8AbsorbtionLevel + 1
+        assert new_sensor.mfRadius == pytest.approx(min(max(old_sensor.mfRadius, 0.2), 0.5))
+
+@pytest.mark.parametrize("script", [
+    "mu8AbsorbtionLevel = 256",
+    "mu8AbsorbtionLevel = -1",
+    "mu8AbsorbtionLevel = 1.5",
+    "maDirectionParams *= 1e39",
+])
+def test_values_that_cannot_be_stored_give_none(script):
+    assert run(script, [bytes(current_block())]) == [None]
+
+def test_script_multiply_matches_multiply_direction_params():
+    blocks = [bytes(current_block(seed)) for seed in range(3)]
+    assert run("maDirectionParams *= 2.0", blocks) == MultiplyDirectionParams(2.0)(blocks)
@@ -0,0 +1,48 @@
+from conftest import current_block, legacy_block
+from sensor_io import START_OFFSET
+from validate import RULE_LINK_RANGE, RULE_NON_FINITE, RULE_SCENE_ORDER, validate_files
+import validate
+
+def write_spec(path, block):
+    path.write_bytes(bytes(START_OFFSET) + bytes(block))
+    return str(path)
+
+def test_files_matching_no_signature_fail_validation(tmp_path):
+    # Corrupt in both links and scene order: read as legacy, which accepts anything
+    block = legacy_block(0)
+    (tmp_path / "StreamedDeformationSpec").mkdir()
+    filepath = write_spec(tmp_path / "StreamedDeformationSpec" / "0.dat", block)
+    report = validate_files([filepath])
+    assert report["layouts"] == {"legacy": 1}
+    assert report["fallback_layout"] == [filepath]
+    assert report["issues"] == []
+    assert validate.main([str(tmp_path)]) == 1
+
+def test_fallback_layout_files_are_still_checked_for_their_own_fields(tmp_path):
+    block = legacy_block(0)
+    block[0:4] = b"\x7f\x80\x00\x00"  # inf in maDirectionParams
+    filepath = write_spec(tmp_path / "legacy.dat", block)
+    report = validate_files([filepath])
+    assert {issue["rule"] for issue in report["issues"]} == {RULE_NON_FINITE}
+
+def test_clean_files_pass(tmp_path):
+    (tmp_path / "StreamedDeformationSpec").mkdir()
+    write_spec(tmp_path / "StreamedDeformationSpec" / "0.dat", current_block())
+    assert validate.main([str(tmp_path)]) == 0
+
+def test_current_files_are_checked_for_every_rule(tmp_path):
+    block = current_block(bad_link=3)
+    filepath = write_spec(tmp_path / "current.dat", block)
+    report = validate_files([filepath])
+    assert report["layouts"] == {"current": 1}
+    assert {issue["rule"] for issue in report["issues"]} == {RULE_LINK_RANGE}
+    assert RULE_SCENE_ORDER in report["files_with_issues"]
+
+def test_unknown_layout_files_are_reported_apart(tmp_path, monkeypatch):
+    block = current_block(bad_link=3)
+    filepath = write_spec(tmp_path / "unknown.dat", block)
+    monkeypatch.setattr(validate, "detect_schema", lambda block: None)
+    report = validate_files([filepath])
+    assert report["unknown_layout"] == [filepath]
+    assert report["issues"] == []
+    assert report["layouts"] == {}